@@ -0,0 +1,136 @@
+"""Benchmark CSV row conversion: per-row reflection vs. precompiled converter.
+
+Run with `python -m benchmarks.bench_convert [ROWS]`; prints rows per second
+for each path side by side.
+"""
+
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields
+from time import perf_counter
+
+from fidelity.dates import parse_date
+from fidelity.reader import HistoryRecord, make_row_converter
+from fidelity.store import RecordStore
+
+
+@dataclass
+class ReflectionRecord:
+    """`HistoryRecord` as it was: `fields()` + `getattr`/`setattr` per row."""
+
+    run_date: str
+    action: str
+    symbol: str
+    description: str
+    type: str
+    quantity: float
+    price: float
+    commission: float
+    fees: float
+    accrued_interest: float
+    amount: float
+    cash_balance: float
+    settlement_date: str
+
+    t_run_date: int = field(init=False)
+    t_settlement_date: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Clean and convert field values."""
+
+        self.run_date = self.run_date.strip()
+        self.action = self.action.strip()
+        self.symbol = self.symbol.strip()
+        self.description = self.description.strip()
+
+        for f in fields(self):
+            if f.type is float:
+                value = getattr(self, f.name)
+                if isinstance(value, str):
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        value = 0.0
+                    setattr(self, f.name, value)
+
+        self.t_run_date = parse_date(self.run_date)
+        self.t_settlement_date = parse_date(self.settlement_date)
+
+
+def make_rows(count: int) -> list[list[str]]:
+    """Return `count` deterministic raw CSV rows."""
+
+    symbols = ["AAPL", "MSFT", "SPAXX", "VTI", "FXAIX", "NVDA", "T", "KO"]
+    rows = []
+    for i in range(count):
+        quantity = "" if i % 7 == 0 else str(i % 100)
+        rows.append(
+            [
+                f"{i % 12 + 1:02d}/{i % 28 + 1:02d}/{2015 + i % 10}",
+                " BUY" if i % 2 else " SELL",
+                f" {symbols[i % len(symbols)]}",
+                " SOME DESCRIPTION",
+                "Cash",
+                quantity,
+                f"{i % 500}.25",
+                "",
+                "0.01",
+                "",
+                f"-{i % 9000}.50",
+                "10000.00",
+                f"{i % 12 + 1:02d}/{i % 28 + 1:02d}/{2015 + i % 10}",
+            ]
+        )
+    return rows
+
+
+def bench(name: str, rows: list[list[str]], func: Callable[[list[list[str]]], None]) -> float:
+    """Time `func(rows)` and print rows per second."""
+
+    start = perf_counter()
+    func(rows)
+    elapsed = perf_counter() - start
+    rate = len(rows) / elapsed
+    print(f"{name:<32} {elapsed:8.3f}s {rate:14,.0f} rows/s")
+    return rate
+
+
+def reflection_path(rows: list[list[str]]) -> None:
+    """Old path: reflection-based dataclass, appended to a store."""
+
+    store = RecordStore()
+    for row in rows:
+        store.append(ReflectionRecord(*row))  # type: ignore[arg-type]
+
+
+def record_path(rows: list[list[str]]) -> None:
+    """`HistoryRecord` with explicit per-field conversion."""
+
+    store = RecordStore()
+    for row in rows:
+        store.append(HistoryRecord(*row))  # type: ignore[arg-type]
+
+
+def converter_path(rows: list[list[str]]) -> None:
+    """New path: precompiled converter straight into the store."""
+
+    store = RecordStore()
+    store.extend_values(map(make_row_converter(), rows))
+
+
+def main() -> None:
+    """Run the benchmark."""
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rows = make_rows(count)
+    parse_date.cache_clear()
+    converter_path(rows[:1000])  # warm the date cache for every path
+
+    old = bench("reflection (old)", rows, reflection_path)
+    bench("HistoryRecord", rows, record_path)
+    new = bench("make_row_converter (new)", rows, converter_path)
+    print(f"speedup: {new / old:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark float, fixed-point and `Decimal` sums over the `amount` column.
+
+Run with `python -m benchmarks.bench_fixed [ROWS]`; prints rows per second
+for running sums (the history report's balances) and group sums (the
+position report's totals) of each representation, the bytes each holds
+per value, and how far the float balance drifts from the exact one.
+"""
+
+import sys
+from collections.abc import Callable
+from decimal import Decimal
+from itertools import accumulate
+from pathlib import Path
+from tempfile import gettempdir
+from time import perf_counter
+from typing import Any
+
+from benchmarks.generate_history import write_history
+from fidelity.aggregate import (
+    FIXED_SCALE,
+    fixed_group_sums,
+    fixed_running_sums,
+    group_sums,
+    running_sums,
+    to_fixed,
+)
+from fidelity.index import ReportIndex
+from fidelity.reader import read_history_file
+
+
+def bench(name: str, rows: int, func: Callable[[], Any]) -> Any:
+    """Time `func()`, print rows per second and return its result."""
+
+    start = perf_counter()
+    result = func()
+    elapsed = perf_counter() - start
+    print(f"{name:<32} {elapsed:8.3f}s {rows / elapsed:14,.0f} rows/s")
+    return result
+
+
+def main() -> None:
+    """Run the benchmark."""
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path = Path(gettempdir()) / "fidelity-bench" / f"history-{count}.csv"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_history(path, count)
+
+    store = read_history_file(str(path))
+    index = ReportIndex(store)
+    rows = index.by_date
+    groups = [group for _, group in index.groups]
+    column = store.floats["amount"]
+    decimals = [Decimal(repr(value)) for value in column]
+    running_sums(column, rows[:1])  # import NumPy, if any, before timing
+
+    floats = bench("running sums, float", count, lambda: running_sums(column, rows))
+    fixed = bench(
+        "running sums, to_fixed + int",
+        count,
+        lambda: fixed_running_sums(to_fixed(column), rows),
+    )
+    exact = bench(
+        "running sums, Decimal",
+        count,
+        lambda: list(accumulate(decimals[row] for row in rows)),
+    )
+    bench("group sums, float", count, lambda: group_sums(column, groups))
+    ints = to_fixed(column)
+    bench("group sums, int", count, lambda: fixed_group_sums(ints, groups))
+    bench(
+        "group sums, Decimal",
+        count,
+        lambda: [sum(decimals[row] for row in group) for group in groups],
+    )
+
+    per_decimal = sys.getsizeof(decimals[0]) + 8  # object + list slot
+    print(f"bytes/value: float {column.itemsize}, int {ints.itemsize}, Decimal ~{per_decimal}")
+    assert [Decimal(total) / FIXED_SCALE for total in fixed] == exact
+    drift = max(abs(Decimal(repr(a)) - b) for a, b in zip(floats, exact, strict=True))
+    print(f"float balance drift from exact: {drift}")
+
+
+if __name__ == "__main__":
+    main()
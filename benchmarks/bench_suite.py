@@ -0,0 +1,193 @@
+"""Time reading and every report over synthetic history files of several sizes.
+
+Run with `python -m benchmarks.bench_suite [--sizes 1k,10k,100k,1M] [--output FILE]
+[--compare BASELINE]`.
+
+Input files come from `benchmarks.generate_history` and are kept in
+`--data-dir`, so later runs (and other versions of the code) time the
+very same bytes.  Each step is timed separately, best of `--repeat`:
+
+    read_history_file   parse one file into a `RecordStore`
+    read_input_files    the CLI's read, with deduplication
+    index               build the shared `ReportIndex`
+    history_report,     each report written as `jsonl` to `/dev/null`,
+    symbol_report,      i.e. computation and serialization without Rich
+    position_report
+    history_table,      the history and symbol reports rendered as
+    symbol_table        `--chunk-size` tables to `/dev/null`
+
+Results (seconds and rows/s per step and size, with the package version,
+Python and platform) are saved as JSON to `--output`.  `--compare` prints
+each step's ratio to the results in an earlier file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from collections.abc import Callable
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import rich
+
+from benchmarks.generate_history import parse_size, write_history
+from fidelity.fidelity import Fidelity
+from fidelity.index import ReportIndex
+from fidelity.reader import read_history_file
+from fidelity.writers import JsonlWriter
+
+Results = dict[str, dict[str, dict[str, float]]]  # step -> size -> measurements
+
+
+def _options(chunk_size: int = 0, exact: bool = False) -> Namespace:
+    """Return CLI options for unfiltered reports."""
+
+    return Namespace(
+        no_exclude=False,
+        symbol=None,
+        since=None,
+        until=None,
+        chunk_size=chunk_size,
+        exact=exact,
+    )
+
+
+def _best(func: Callable[[], Any], repeat: int) -> float:
+    """Return the shortest of `repeat` timings of `func()`."""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_size(path: Path, rows: int, repeat: int) -> dict[str, float]:
+    """Return seconds taken by each step over the file at `path`."""
+
+    devnull = open(os.devnull, "w", encoding="utf-8")  # noqa: SIM115
+    rich.reconfigure(file=devnull)
+    fidelity = Fidelity(_options())
+    fidelity.read_input_files([str(path)])
+
+    def report(name: str, chunk_size: int = 0) -> Callable[[], None]:
+        def run() -> None:
+            fidelity.options = _options(chunk_size)
+            if chunk_size:
+                fidelity.writer = None
+                getattr(fidelity, f"print_{name}_report")()
+            else:
+                with JsonlWriter(devnull) as fidelity.writer:
+                    getattr(fidelity, f"print_{name}_report")()
+
+        return run
+
+    def read_input_files() -> None:
+        Fidelity(_options()).read_input_files([str(path)], dedup=True)
+
+    steps: dict[str, Callable[[], Any]] = {
+        "read_history_file": lambda: read_history_file(str(path)),
+        "read_input_files": read_input_files,
+        "index": lambda: ReportIndex(fidelity.records),
+        "history_report": report("history"),
+        "symbol_report": report("symbol"),
+        "position_report": report("position"),
+        "history_table": report("history", chunk_size=4096),
+        "symbol_table": report("symbol", chunk_size=4096),
+    }
+    timings = {}
+    for step, func in steps.items():
+        timings[step] = _best(func, repeat)
+        print(
+            f"{rows:>10,} {step:<20} {timings[step]:9.3f}s {rows / timings[step]:14,.0f} rows/s"
+        )
+    devnull.close()
+    return timings
+
+
+def _version() -> str:
+    """Return the installed package version, if any."""
+
+    try:
+        return version("rlane-fidelity")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def compare(results: Results, baseline: Results) -> None:
+    """Print the time of each step relative to `baseline` (< 1 is faster)."""
+
+    print(f"\n{'rows':>10} {'step':<20} {'ratio':>9}")
+    for step, sizes in results.items():
+        for size, now in sizes.items():
+            if (then := baseline.get(step, {}).get(size)) is not None:
+                ratio = now["seconds"] / then["seconds"]
+                print(f"{int(size):>10,} {step:<20} {ratio:9.2f}")
+
+
+def main() -> None:
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description="Benchmark reading and reporting.")
+    parser.add_argument(
+        "--sizes",
+        default="1k,10k,100k,1M",
+        help="comma separated row counts, up to 10M (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timings per step; best is kept")
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "fidelity-bench",
+        help="where generated input files are kept (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("bench-results.json"),
+        help="file to save results to (default: %(default)s)",
+    )
+    parser.add_argument("--compare", type=Path, help="results file of an earlier run")
+    args = parser.parse_args()
+
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    results: Results = {}
+    for rows in map(parse_size, args.sizes.split(",")):
+        path = args.data_dir / f"history-{rows}.csv"
+        if not path.exists():
+            print(f"Generating {path}", file=sys.stderr)
+            write_history(path, rows)
+        for step, seconds in bench_size(path, rows, args.repeat).items():
+            results.setdefault(step, {})[str(rows)] = {
+                "seconds": seconds,
+                "rows_per_second": rows / seconds,
+            }
+
+    args.output.write_text(
+        json.dumps(
+            {
+                "version": _version(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"Saved results to {args.output}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text(encoding="utf-8"))["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Generate realistic, deterministic Fidelity history files for benchmarks.
+
+Run with `python -m benchmarks.generate_history ROWS PATH [--seed N]`.
+
+Files look like real downloads: two preamble lines and the column
+headings, newest transactions first, a few hundred symbols plus the
+`SPAXX` core position, a mix of trades, dividends, reinvestments,
+interest and fees (the latter with blank quantity, price, commission and
+fee cells), then a blank line and a disclaimer footer.  The same `rows`
+and `seed` always produce the same bytes.
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+__all__ = ["parse_size", "write_history"]
+
+HEADER = (
+    "Run Date,Action,Symbol,Description,Type,Quantity,Price,"
+    "Commission,Fees,Accrued Interest,Amount,Cash Balance,Settlement Date"
+)
+FOOTER = (
+    '"The data and information in this spreadsheet is provided to you solely for your use."\n'
+    '"Brokerage services are provided by Fidelity Brokerage Services LLC (FBS)."\n'
+)
+
+# Transactions are spread over these dates.
+FIRST_DATE = date(2000, 1, 3)
+LAST_DATE = date(2025, 12, 31)
+
+# Rows are written in batches of this many lines.
+BATCH_SIZE = 10_000
+
+# Kinds of transaction, and how often each occurs.
+KINDS = ("interest", "fee", "dividend", "reinvestment", "buy", "sell")
+WEIGHTS = (8, 2, 15, 10, 35, 30)
+
+# Share of trades that pay a fee; the rest leave the cell blank.
+FEE_RATE = 0.3
+
+
+def _make_symbols(rng: random.Random, count: int) -> list[str]:
+    """Return `count` distinct ticker-like symbols."""
+
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols: set[str] = set()
+    while len(symbols) < count:
+        symbols.add("".join(rng.choices(letters, k=rng.randint(1, 5))))
+    return sorted(symbols)
+
+
+def _make_row(
+    rng: random.Random, day: date, symbols: list[str], balance: float
+) -> tuple[str, float]:
+    """Return one CSV line for a transaction run on `day`, and its amount."""
+
+    run_date = day.strftime("%m/%d/%Y")
+    kind = rng.choices(KINDS, WEIGHTS)[0]
+    symbol = rng.choice(symbols)
+    name = f"{symbol} HOLDINGS INC"
+    price = round(rng.uniform(1.0, 900.0), 2)
+    quantity: float | str = ""
+    price_cell = fees = settle = ""
+
+    if kind == "interest":
+        symbol, name = "SPAXX", "FIDELITY GOVERNMENT MONEY MARKET"
+        action = "INTEREST EARNED SPAXX (Cash)"
+        amount = round(rng.uniform(0.01, 50.0), 2)
+    elif kind == "fee":
+        symbol, name = "", "No Description"
+        action = "FEE CHARGED (Cash)"
+        amount = -round(rng.uniform(1.0, 100.0), 2)
+    elif kind == "dividend":
+        action = f"DIVIDEND RECEIVED {name} ({symbol}) (Cash)"
+        amount = round(rng.uniform(0.5, 400.0), 2)
+    elif kind == "reinvestment":
+        action = f"REINVESTMENT {name} ({symbol}) (Cash)"
+        quantity = f"{rng.uniform(0.001, 5.0):.3f}"
+        price_cell = f"{price:.2f}"
+        amount = -round(float(quantity) * price, 2)
+    else:
+        shares = rng.randint(1, 500)
+        bought = kind == "buy"
+        action = f"YOU {'BOUGHT' if bought else 'SOLD'} {name} ({symbol}) (Cash)"
+        quantity = shares if bought else -shares
+        price_cell = f"{price:.2f}"
+        amount = round(-quantity * price, 2)
+        if rng.random() < FEE_RATE:
+            fees = f"{rng.uniform(0.01, 0.2):.2f}"
+        settle = (day + timedelta(days=2)).strftime("%m/%d/%Y")
+
+    line = (
+        f"{run_date}, {action}, {symbol}, {name},Cash,{quantity},{price_cell},,{fees},,"
+        f"{amount:.2f},{balance + amount:.2f},{settle}"
+    )
+    return line, amount
+
+
+def write_history(path: str | Path, rows: int, seed: int = 0) -> Path:
+    """Write a history file of `rows` transactions to `path`; return the path."""
+
+    rng = random.Random(seed)
+    symbols = _make_symbols(rng, max(10, min(rows // 50, 800)))
+    span = (LAST_DATE - FIRST_DATE).days
+    balance = 10_000.0
+
+    path = Path(path)
+    with path.open("w", encoding="utf-8", newline="") as file:
+        file.write(f"Brokerage\nAccount: Z99999999\n{HEADER}\n")
+        batch = []
+        for row in range(rows):
+            # Newest first, as downloaded.
+            day = LAST_DATE - timedelta(days=row * span // max(rows, 1))
+            line, amount = _make_row(rng, day, symbols, balance)
+            balance += amount
+            batch.append(line)
+            if len(batch) == BATCH_SIZE:
+                file.write("\n".join(batch) + "\n")
+                batch = []
+        if batch:
+            file.write("\n".join(batch) + "\n")
+        file.write("\n" + FOOTER)
+    return path
+
+
+def parse_size(text: str) -> int:
+    """Convert `1000`, `10k` or `1M` to a number of rows."""
+
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:].lower(), 1)
+    return int(text[:-1] if scale > 1 else text) * scale
+
+
+def main() -> None:
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic Fidelity history file.")
+    parser.add_argument("ROWS", type=parse_size, help="number of transactions, e.g. `10k`")
+    parser.add_argument("PATH", help="file to write")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+    write_history(args.PATH, args.ROWS, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Assign history files to accounts."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from fnmatch import fnmatch
+from pathlib import Path
+
+__all__ = ["DEFAULT_ACCOUNT", "account_for", "partition_files"]
+
+# Account of files that neither the config nor the file name places.
+DEFAULT_ACCOUNT = "default"
+
+# A Fidelity account number in a file name, e.g. `History_for_Account_Z12345678.csv`:
+# a letter and 8 digits, or 9 digits, so date stamps (`history_20240131.csv`) are not.
+_ACCOUNT_NUMBER = re.compile(r"(?<![A-Za-z0-9])([A-Z]\d{8}|\d{9})(?![0-9])")
+
+
+def account_for(filename: str, accounts: Mapping[str, str | list[str]] | None = None) -> str:
+    """Return the account of history file `filename`.
+
+    `accounts` maps account names to glob patterns (one, or a list),
+    matched against the file's name and its full path (after `~`
+    expansion); the first account with a match wins.  Otherwise the
+    account is the account number in the file name, if any, and
+    `DEFAULT_ACCOUNT` if not.
+    """
+
+    path = Path(filename).expanduser()
+    for account, patterns in (accounts or {}).items():
+        for pattern in [patterns] if isinstance(patterns, str) else patterns:
+            expanded = str(Path(pattern).expanduser())
+            if fnmatch(path.name, expanded) or fnmatch(str(path), expanded):
+                return account
+
+    if match := _ACCOUNT_NUMBER.search(path.name):
+        return match.group(1)
+    return DEFAULT_ACCOUNT
+
+
+def partition_files(
+    files: Iterable[str], accounts: Mapping[str, str | list[str]] | None = None
+) -> dict[str, list[str]]:
+    """Return `files` grouped by `account_for`, in order of first appearance."""
+
+    partitions: dict[str, list[str]] = {}
+    for filename in files:
+        partitions.setdefault(account_for(filename, accounts), []).append(filename)
+    return partitions
@@ -0,0 +1,193 @@
+"""On-disk cache of parsed Fidelity history files."""
+
+from __future__ import annotations
+
+import logging
+import os
+import stat
+import struct
+import time
+from collections.abc import Iterable
+from contextlib import suppress
+from hashlib import blake2b
+from pathlib import Path
+
+from fidelity.rollup import Rollup
+from fidelity.store import RecordStore
+
+__all__ = ["FileCache"]
+
+logger = logging.getLogger(__name__)
+
+# Entry header: magic, source size, source mtime (ns), source content digest.
+_HEADER = struct.Struct("<4sQQ16s")
+_MAGIC = b"FCE1"
+
+# Magic of a rollup entry, which has no header beyond it.
+_ROLLUP_MAGIC = b"FCR1"
+
+
+def _fingerprint(path: Path) -> tuple[int, int, bytes] | None:
+    """Return the size, mtime (ns) and content digest of `path`.
+
+    Returns None when `path` is not a regular file (e.g., `/dev/null`),
+    which is never cached.
+    """
+
+    st = path.stat()
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    digest = blake2b(path.read_bytes(), digest_size=16).digest()
+    return st.st_size, st.st_mtime_ns, digest
+
+
+class FileCache:
+    """Cache of `RecordStore`s parsed from history files.
+
+    Each source file has one entry, named after a hash of its absolute
+    path.  An entry is used only while the source's size, mtime and
+    content digest all still match; otherwise the file is parsed again and
+    the entry replaced.  Entries are `RecordStore.to_bytes` output behind
+    a small header.  A hit refreshes the entry's mtime, so `evict` drops
+    least-recently-used entries first.
+
+    The `Rollup` of a whole set of source files is kept too, in an entry
+    named after a hash of every source's path and fingerprint: any change
+    to a source names a different entry, and the stale one ages out.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int | None = None,
+        max_age: float | None = None,
+    ) -> None:
+        """Initialize cache in `directory`.
+
+        Args:
+            directory:  where entries are kept; created on first write.
+            max_bytes:  `evict` keeps the total size of entries under this.
+            max_age:    `evict` removes entries unused for this many seconds.
+        """
+
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _entry(self, path: Path) -> Path:
+        """Return the entry path for source `path`."""
+
+        name = blake2b(str(path.resolve()).encode(), digest_size=16).hexdigest()
+        return self.directory / f"{name}.bin"
+
+    def get(self, filename: str) -> RecordStore | None:
+        """Return the cached records of `filename`, or None on a miss."""
+
+        path = Path(filename)
+        entry = self._entry(path)
+        try:
+            if (fingerprint := _fingerprint(path)) is None:
+                return None
+            data = entry.read_bytes()
+            magic, size, mtime_ns, digest = _HEADER.unpack_from(data)
+            if magic != _MAGIC or (size, mtime_ns, digest) != fingerprint:
+                return None
+            records = RecordStore.from_bytes(data[_HEADER.size :])
+        except (OSError, ValueError, struct.error):
+            return None
+
+        os.utime(entry)
+        logger.debug("Cache hit for %r", filename)
+        return records
+
+    def put(self, filename: str, records: RecordStore) -> None:
+        """Save the parsed `records` of `filename`."""
+
+        path = Path(filename)
+        if (fingerprint := _fingerprint(path)) is None:
+            return
+
+        header = _HEADER.pack(_MAGIC, *fingerprint)
+        self._write(self._entry(path), header + records.to_bytes())
+
+    def _write(self, entry: Path, data: bytes) -> None:
+        """Replace `entry` with `data`; on failure, log it and carry on uncached."""
+
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            tmp.replace(entry)
+        except OSError as err:
+            logger.warning("Cannot write cache entry %s: %s", entry, err)
+            with suppress(OSError):
+                tmp.unlink(missing_ok=True)
+
+    def _rollup_entry(self, filenames: Iterable[str], tag: str) -> Path | None:
+        """Return the rollup entry path for sources `filenames`, if they can be cached.
+
+        `tag` names anything else the records read from the sources
+        depend on, such as deduplication.
+        """
+
+        key = blake2b(tag.encode(), digest_size=16)
+        for filename in sorted(filenames):
+            path = Path(filename)
+            if (fingerprint := _fingerprint(path)) is None:
+                return None
+            size, mtime_ns, digest = fingerprint
+            key.update(f"\0{path.resolve()}\0{size}\0{mtime_ns}\0".encode() + digest)
+        return self.directory / f"rollup-{key.hexdigest()}.bin"
+
+    def get_rollup(self, filenames: Iterable[str], tag: str = "") -> Rollup | None:
+        """Return the cached rollup of the records of `filenames`, or None on a miss."""
+
+        try:
+            if (entry := self._rollup_entry(filenames, tag)) is None:
+                return None
+            data = entry.read_bytes()
+            if data[: len(_ROLLUP_MAGIC)] != _ROLLUP_MAGIC:
+                return None
+            rollup = Rollup.from_bytes(data[len(_ROLLUP_MAGIC) :])
+        except (OSError, ValueError, IndexError, struct.error):
+            return None
+
+        os.utime(entry)
+        logger.debug("Cache hit for rollup of %d records", rollup.size)
+        return rollup
+
+    def put_rollup(self, filenames: Iterable[str], rollup: Rollup, tag: str = "") -> None:
+        """Save the `rollup` of the records of `filenames`."""
+
+        if (entry := self._rollup_entry(filenames, tag)) is None:
+            return
+        self._write(entry, _ROLLUP_MAGIC + rollup.to_bytes())
+
+    def clear(self) -> None:
+        """Remove all entries."""
+
+        for entry in self.directory.glob("*.bin"):
+            entry.unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """Remove entries beyond `max_age` or `max_bytes`; return the count."""
+
+        entries = sorted(
+            ((entry.stat(), entry) for entry in self.directory.glob("*.bin")),
+            key=lambda x: x[0].st_mtime,
+        )
+        total = sum(st.st_size for st, _ in entries)
+        cutoff = time.time() - self.max_age if self.max_age is not None else None
+
+        removed = 0
+        for st, entry in entries:  # oldest first
+            expired = cutoff is not None and st.st_mtime < cutoff
+            oversize = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or oversize):
+                continue
+            entry.unlink(missing_ok=True)
+            total -= st.st_size
+            removed += 1
+
+        logger.debug("Evicted %d cache entries", removed)
+        return removed
@@ -1,14 +1,53 @@
-"""Command line interface."""
+"""Command line interface.
 
+Only what is needed to parse the command line is imported up front;
+the report modules (and `rich`) are imported by `main`, so `--help`,
+`--version` and `--completion` start quickly.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from argparse import ArgumentTypeError
+from contextlib import ExitStack, suppress
 from glob import glob
 from pathlib import Path
+from typing import IO, TYPE_CHECKING
 
 from libcli import BaseCLI
 
-from fidelity.fidelity import Fidelity
+from fidelity.dates import parse_date
+
+if TYPE_CHECKING:
+    from fidelity.cache import FileCache
+    from fidelity.fidelity import Fidelity
 
 __all__ = ["FidelityCLI"]
 
+logger = logging.getLogger(__name__)
+
+
+def _date_arg(text: str) -> int:
+    """Convert a `MM/DD/YYYY` command line argument to unix time."""
+
+    try:
+        return parse_date(text)
+    except ValueError as err:
+        raise ArgumentTypeError(f"invalid date {text!r}; expected `MM/DD/YYYY`") from err
+
+
+def _count_arg(text: str) -> int:
+    """Convert a positive integer command line argument."""
+
+    try:
+        count = int(text)
+    except ValueError as err:
+        raise ArgumentTypeError(f"invalid count {text!r}; expected a positive integer") from err
+    if count < 1:
+        raise ArgumentTypeError(f"invalid count {text!r}; expected a positive integer")
+    return count
+
 
 class FidelityCLI(BaseCLI):
     """Command line-interface."""
@@ -17,6 +56,11 @@ class FidelityCLI(BaseCLI):
         "config-file": "~/.fidelity.toml",
         # distribution name, not importable package name
         "dist-name": "rlane-fidelity",
+        "cache-dir": "~/.cache/fidelity",
+        "cache-max-mb": 256,
+        "cache-max-days": 180,
+        "state-file": "~/.local/share/fidelity/state.bin",
+        "socket-file": "~/.cache/fidelity/server.sock",
     }
 
     def init_parser(self) -> None:
@@ -32,6 +76,14 @@ class FidelityCLI(BaseCLI):
     def add_arguments(self) -> None:
         """Add arguments to parser."""
 
+        self._add_input_arguments()
+        self._add_output_arguments()
+        self._add_mode_arguments()
+        self._add_config_description()
+
+    def _add_input_arguments(self) -> None:
+        """Add the datafile and filtering options."""
+
         group = self.parser.add_argument_group("Datafile options")
 
         arg = group.add_argument(
@@ -41,6 +93,35 @@ class FidelityCLI(BaseCLI):
         )
         self.add_default_to_help(arg, self.parser)
 
+        arg = group.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            metavar="N",
+            help=(
+                "Parse input files in `N` worker processes; a single large file is split "
+                "into `N` parts parsed in parallel"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        arg = group.add_argument(
+            "--keep-duplicates",
+            action="store_true",
+            help="Keep rows repeated in overlapping input files; do not deduplicate",
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        arg = group.add_argument(
+            "--stream",
+            action="store_true",
+            help=(
+                "Stream records from the input files straight into the position report, "
+                "in constant memory; print only that report"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
         group.add_argument(
             "FILES",
             nargs="*",
@@ -56,30 +137,496 @@ class FidelityCLI(BaseCLI):
         )
         self.add_default_to_help(arg, self.parser)
 
-        group = self.parser.add_argument_group(
+        group.add_argument(
+            "--symbol",
+            action="append",
+            type=str.upper,
+            help="Report only on `SYMBOL`; may be given more than once",
+        )
+
+        group.add_argument(
+            "--since",
+            type=_date_arg,
+            metavar="DATE",
+            help="Report only transactions run on or after `DATE` (`MM/DD/YYYY`)",
+        )
+
+        group.add_argument(
+            "--until",
+            type=_date_arg,
+            metavar="DATE",
+            help="Report only transactions run on or before `DATE` (`MM/DD/YYYY`)",
+        )
+
+    def _add_output_arguments(self) -> None:
+        """Add the output and summary options."""
+
+        group = self.parser.add_argument_group("Output options")
+
+        arg = group.add_argument(
+            "--chunk-size",
+            type=int,
+            default=0,
+            metavar="N",
+            help=(
+                "Print the history and symbol reports `N` rows at a time, as they are "
+                "generated, with column widths fixed up front; `0` prints each as one table"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        arg = group.add_argument(
+            "--format",
+            choices=["table", "csv", "jsonl"],
+            default="table",
+            help=(
+                "Print reports as Rich tables, or write their rows as `csv` blocks or "
+                "`jsonl` objects, unformatted"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        arg = group.add_argument(
+            "--exact",
+            action="store_true",
+            help=(
+                "Sum amounts and quantities as integer micro-units, so balances and totals "
+                "are exact instead of drifting in the last digits"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        group.add_argument(
+            "--output",
+            metavar="PATH",
+            help="Write `csv` or `jsonl` reports to `PATH` instead of stdout",
+        )
+
+        group = self.parser.add_argument_group("Summary options")
+
+        group.add_argument(
+            "--last",
+            type=_count_arg,
+            metavar="N",
+            help=(
+                "Print only the latest `N` transactions of the history report, picked "
+                "without sorting the whole history"
+            ),
+        )
+
+        group.add_argument(
+            "--top",
+            type=_count_arg,
+            metavar="N",
+            help="Print only the `N` positions with the largest absolute amounts",
+        )
+
+        arg = group.add_argument(
+            "--gains",
+            action="store_true",
+            help=(
+                "Print only the realized and unrealized gains of each lot, with lots "
+                "matched by `--lot-method`"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        arg = group.add_argument(
+            "--lot-method",
+            choices=["fifo", "lifo", "hifo"],
+            default="fifo",
+            help=(
+                "Close the oldest (`fifo`), newest (`lifo`) or highest cost (`hifo`) lots "
+                "first, for `--gains`"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        group.add_argument(
+            "--by",
+            choices=["month", "quarter", "year"],
+            help=(
+                "Print only the count, amount, fees and commission totals of each symbol "
+                "and action by calendar period; kept in the cache, so a repeated rollup "
+                "over unchanged files reads no records"
+            ),
+        )
+
+    def _add_mode_arguments(self) -> None:
+        """Add the options that choose how the input is processed."""
+
+        group = self.parser.add_argument_group("Server options")
+
+        arg = group.add_argument(
+            "--serve",
+            action="store_true",
+            help=(
+                "Keep the records of the input files in memory, reading them again as "
+                "they change, and answer `--client` queries over a Unix socket"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        arg = group.add_argument(
+            "--client",
+            action="store_true",
+            help=(
+                "Print the reports, with the given filtering, summary and output options, "
+                "from a running `--serve` process"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        group = self.parser.add_argument_group("Profiling options")
+
+        arg = group.add_argument(
+            "--timings",
+            action="store_true",
+            help=(
+                "Print the wall time, rows per second and peak traced memory of each phase "
+                "(reading, indexing, selecting, rendering) to stderr; tracing memory slows "
+                "the run down"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        group.add_argument(
+            "--profile",
+            metavar="PATH",
+            help="Profile the run with `cProfile` and save the `pstats` data to `PATH`",
+        )
+
+        group = self.parser.add_argument_group("Account options")
+
+        arg = group.add_argument(
+            "--by-account",
+            action="store_true",
+            help=(
+                "Print the reports for each account, then for all accounts merged; "
+                "see `accounts` below"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        group = self.parser.add_argument_group("Cache options")
+
+        arg = group.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Parse every input file; do not read or write the cache",
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        arg = group.add_argument(
+            "--rebuild-cache",
+            action="store_true",
+            help="Empty the cache, then parse and cache every input file",
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        group = self.parser.add_argument_group("Ingest options")
+
+        arg = group.add_argument(
+            "--ingest",
+            action="store_true",
+            help=(
+                "Merge rows of the input files not already ingested into the state file, "
+                "then report on everything ingested so far"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+        group = self.parser.add_argument_group("Watch options")
+
+        arg = group.add_argument(
+            "--watch",
+            action="store_true",
+            help=(
+                "Print the reports, then print them again whenever input files are added, "
+                "changed or removed; added files are read and their new rows merged in, "
+                "otherwise (and always with `--keep-duplicates` or `--by-account`) all files "
+                "are read again, unchanged ones from the cache"
+            ),
+        )
+        self.add_default_to_help(arg, self.parser)
+
+    def _add_config_description(self) -> None:
+        """Describe the configuration file."""
+
+        self.parser.add_argument_group(
             "Configuration File",
             self.dedent("""
     The configuration file defines these elements:
 
         `datafiles` (str):  Points to the `CSV` files to process. May
                             begin with `~`, and may contain wildcards.
+
+        `cache-dir` (str):  Where parsed input files are cached
+                            (default: `~/.cache/fidelity`).
+
+        `cache-max-mb` (int): Evict least-recently-used cache entries
+                            beyond this total size (default: `256`).
+
+        `cache-max-days` (int): Evict cache entries unused for this
+                            many days (default: `180`).
+
+        `state-file` (str): Where `--ingest` keeps the ingested history
+                            (default: `~/.local/share/fidelity/state.bin`).
+
+        `socket-file` (str): Where `--serve` listens for `--client`
+                            queries (default: `~/.cache/fidelity/server.sock`).
+
+        `accounts` (table): Maps account names to the `CSV` files, as
+                            a glob pattern or a list of them, that
+                            belong to each. Files not matched belong to
+                            the account number in their name (a letter
+                            and 8 digits, or 9 digits), if any. Each
+                            account is read and deduplicated on its
+                            own.
                 """),
         )
 
     def main(self) -> None:
         """Command line interface entry point (method)."""
 
-        # Read all `csv` files on the command line within the date range.
-        fidelity = Fidelity(self.options)
+        if self.options.client:
+            self._query()
+            return
+
+        # The state holds one deduplicated history of all accounts.
+        if self.options.ingest and (self.options.by_account or self.options.keep_duplicates):
+            self.parser.error(
+                "--ingest cannot be combined with --by-account or --keep-duplicates"
+            )
+
+        profiler = None
+        if self.options.profile:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        from fidelity.fidelity import Fidelity
+        from fidelity.timing import PhaseTimer
+        from fidelity.writers import WRITERS
+
+        timer = PhaseTimer(enabled=self.options.timings)
+        try:
+            with ExitStack() as stack:
+                writer = None
+                if self.options.format != "table":
+                    file: IO[str] = sys.stdout
+                    if self.options.output:
+                        file = stack.enter_context(
+                            open(self.options.output, "w", encoding="utf-8", newline="")
+                        )
+                    writer = stack.enter_context(WRITERS[self.options.format](file))
+                self._main(Fidelity(self.options, writer, timer))
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self.options.profile)
+            if timer.enabled:
+                timer.stop()
+                timer.print()
+
+    def _main(self, fidelity: Fidelity) -> None:
+        """Read the input files and print the reports."""
+
+        from fidelity.reader import iter_input_files
+        from fidelity.state import StateStore
+
+        files = self._input_files()
+
+        if self.options.stream:
+            fidelity.print_position_report(iter_input_files(files))
+            return
+
+        if self.options.ingest:
+            with fidelity.timer.phase("load state"):
+                state = StateStore.load(self.config["state-file"])
+            fidelity.ingest_input_files(files, state, accounts=self.config.get("accounts"))
+            with fidelity.timer.phase("save state"):
+                state.save(self.config["state-file"])
+            self._print_reports(fidelity)
+            return
+
+        cache = self._file_cache()
+        if self.options.watch:
+            with suppress(KeyboardInterrupt):
+                self._watch(fidelity, cache)
+            return
+
+        if self.options.serve:
+            self._serve(cache)
+            return
+
+        if cache is not None and self._rollup_only():
+            self._print_rollup(fidelity, files, cache)
+            return
+
+        self._read(fidelity, files, cache)
+        self._print_reports(fidelity)
+
+    def _rollup_only(self) -> bool:
+        """Return True if the only report is a rollup of whole periods of all accounts."""
+
+        options = self.options
+        return (
+            options.by is not None
+            and options.last is None
+            and options.top is None
+            and not options.gains
+            and options.since is None
+            and options.until is None
+            and not options.by_account
+        )
+
+    def _print_rollup(self, fidelity: Fidelity, files: list[str], cache: FileCache) -> None:
+        """Print the `--by` rollup of `files`, from the cache if it is there.
+
+        Otherwise the files are read and rolled up, and the rollup saved
+        in the cache for next time.  A rollup depends on how the files
+        are deduplicated and partitioned, so that is part of its key.
+        """
+
+        import json
+
+        tag = json.dumps([self.options.keep_duplicates, self.config.get("accounts")])
+        with fidelity.timer.phase("load rollup"):
+            rollup = cache.get_rollup(files, tag)
+        if rollup is None:
+            rollup = self._read(fidelity, files, cache).rollup
+            cache.put_rollup(files, rollup, tag)
+        fidelity.print_rollup_report(self.options.by, rollup)
+
+    def _input_files(self) -> list[str]:
+        """Return the files named on the command line, or by `datafiles`."""
+
         if self.options.use_datafiles and (datafiles := self.config.get("datafiles")):
-            files = glob(str(Path(datafiles).expanduser()))
-        else:
-            files = self.options.FILES
-        fidelity.read_input_files(files)
-
-        fidelity.print_history_report()
-        fidelity.print_symbol_report()
-        fidelity.print_position_report()
+            return glob(str(Path(datafiles).expanduser()))
+        return list(self.options.FILES)
+
+    def _file_cache(self) -> FileCache | None:
+        """Return the cache of parsed input files, unless `--no-cache`."""
+
+        from fidelity.cache import FileCache
+
+        if self.options.no_cache:
+            return None
+        cache = FileCache(
+            self.config["cache-dir"],
+            max_bytes=self.config["cache-max-mb"] * 2**20,
+            max_age=self.config["cache-max-days"] * 86400,
+        )
+        if self.options.rebuild_cache:
+            cache.clear()
+        return cache
+
+    def _read(self, fidelity: Fidelity, files: list[str], cache: FileCache | None) -> Fidelity:
+        """Read `files` into `fidelity`; return it.
+
+        Files are always deduplicated within their account's partition, so
+        the totals are the same with or without `--by-account`; only that
+        option keeps the partitions for reporting.
+        """
+
+        from fidelity.accounts import partition_files
+
+        options = self.options
+        fidelity.read_partitions(
+            partition_files(files, self.config.get("accounts")),
+            jobs=options.jobs,
+            cache=cache,
+            dedup=not options.keep_duplicates,
+        )
+        if not options.by_account:
+            fidelity.partitions = {}
+        if cache is not None:
+            cache.evict()
+        return fidelity
+
+    def _watch(self, fidelity: Fidelity, cache: FileCache | None) -> None:
+        """Print the reports, and again after every change to the input files.
+
+        Rows are merged into an in-memory `StateStore`, as by `--ingest`:
+        added files contribute their new rows, and the position totals and
+        report index are updated by difference.  When a file is changed or
+        removed, its old rows may be gone, so all files are read again
+        (unchanged ones from the cache).  The state holds neither kept
+        duplicates nor accounts apart, so with `--keep-duplicates` or
+        `--by-account` all files are read again on every change.
+        """
+
+        from fidelity.state import StateStore
+        from fidelity.watch import FileWatcher
+
+        options = self.options
+        accounts = self.config.get("accounts")
+        watcher = FileWatcher(self._input_files)
+        state = StateStore()
+        changes = None
+        while True:
+            if options.keep_duplicates or options.by_account:
+                self._read(fidelity, list(watcher.signatures), cache)
+            elif changes is None or changes.changed or changes.removed:
+                state = StateStore()
+                fidelity.ingest_input_files(list(watcher.signatures), state, cache, accounts)
+            else:
+                fidelity.ingest_input_files(changes.added, state, cache, accounts)
+            self._print_reports(fidelity)
+            changes = watcher.wait()
+            logger.info("Input files changed: %r", changes)
+
+    def _serve(self, cache: FileCache | None) -> None:
+        """Answer `--client` queries until interrupted."""
+
+        from fidelity.fidelity import Fidelity
+        from fidelity.server import ReportServer
+
+        def load(files: list[str]) -> Fidelity:
+            return self._read(Fidelity(self.options), files, cache)
+
+        ReportServer(self.config["socket-file"], self._input_files, load).run()
+
+    def _query(self) -> None:
+        """Print the reports from a `--serve` process."""
+
+        import json
+        import shutil
+
+        from fidelity.client import QUERY_OPTIONS, query
+
+        request = {
+            "options": {name: getattr(self.options, name) for name in QUERY_OPTIONS},
+            "width": shutil.get_terminal_size().columns,
+            "color": sys.stdout.isatty(),
+        }
+        with ExitStack() as stack:
+            output = sys.stdout.buffer
+            if self.options.output:
+                output = stack.enter_context(open(self.options.output, "wb"))
+            sys.stdout.flush()
+            try:
+                header = query(self.config["socket-file"], request, output)
+            except OSError as err:
+                self.parser.exit(1, f"{self.parser.prog}: no server: {err}\n")
+            except json.JSONDecodeError as err:
+                self.parser.exit(1, f"{self.parser.prog}: bad response from server: {err}\n")
+        if error := header.get("error"):
+            self.parser.exit(1, f"{self.parser.prog}: server: {error}\n")
+
+    def _print_reports(self, fidelity: Fidelity) -> None:
+        """Print all reports, or only the `--last`, `--top`, `--gains` and `--by` reports."""
+
+        options = self.options
+        fidelity.print_reports(
+            options.last,
+            options.top,
+            options.by_account,
+            options.lot_method if options.gains else None,
+            options.by,
+        )
 
 
 def main(args: list[str] | None = None) -> None:
@@ -0,0 +1,47 @@
+"""Thin client of a `fidelity --serve` process.
+
+Imports nothing beyond the standard library, so a query costs little
+more than interpreter startup and a round trip over the socket.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import socket
+from pathlib import Path
+from typing import Any, BinaryIO
+
+__all__ = ["QUERY_OPTIONS", "query"]
+
+# CLI options sent with a query; the server reports as they ask.
+QUERY_OPTIONS = (
+    "no_exclude",
+    "symbol",
+    "since",
+    "until",
+    "chunk_size",
+    "format",
+    "last",
+    "top",
+    "gains",
+    "lot_method",
+    "by",
+    "by_account",
+    "exact",
+)
+
+
+def query(path: str | Path, request: dict[str, Any], output: BinaryIO) -> dict[str, Any]:
+    """Send `request` to the server at socket `path`; copy its reports to `output`.
+
+    Return the response header: `{"records": N}`, or `{"error": MESSAGE}`.
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(Path(path).expanduser()))
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as response:
+            header: dict[str, Any] = json.loads(response.readline())
+            shutil.copyfileobj(response, output)
+    return header
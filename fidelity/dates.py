@@ -0,0 +1,41 @@
+"""Date conversion for Fidelity history files."""
+
+from datetime import date
+from functools import cache
+from time import mktime, strptime
+
+__all__ = ["parse_date"]
+
+
+@cache
+def parse_date(text: str) -> int:
+    """Convert a `MM/DD/YYYY` date-string to unix time; empty is 0.
+
+    Returns the same value as `int(mktime(strptime(text, "%m/%d/%Y")))`
+    (local midnight), but splits the fixed-width format by position
+    instead of going through `strptime`.  Results are memoized; an export
+    has only a few hundred distinct dates spread over many rows.
+
+    Anything that is not exactly `MM/DD/YYYY` falls back to `strptime`,
+    which also supplies the `ValueError` for malformed input.
+    """
+
+    if not text:
+        return 0
+
+    if (
+        len(text) == 10  # noqa: PLR2004
+        and text[2] == "/"
+        and text[5] == "/"
+        and text.isascii()
+        and (digits := text[0:2] + text[3:5] + text[6:10]).isdigit()
+    ):
+        month, day, year = int(digits[0:2]), int(digits[2:4]), int(digits[4:8])
+        try:
+            _ = date(year, month, day)  # validate, as strptime does
+        except ValueError:
+            pass
+        else:
+            return int(mktime((year, month, day, 0, 0, 0, 0, 0, -1)))
+
+    return int(mktime(strptime(text, "%m/%d/%Y")))
@@ -0,0 +1,63 @@
+"""Detect rows repeated across overlapping Fidelity history files."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from hashlib import blake2b
+
+from fidelity.store import RowValues
+
+__all__ = ["RowDeduplicator", "row_key"]
+
+# Number of `RowValues` items that come from the CSV file; the rest are derived.
+_CSV_VALUES = 13
+
+
+def row_key(values: RowValues, scope: str = "") -> int:
+    """Return a stable 64-bit key for a row, from all of its CSV values.
+
+    The key depends only on the row's content, so the same transaction
+    in two overlapping downloads gets the same key, in any run.  Rows of
+    another `scope` (account) get other keys; the empty scope is the key
+    of the content alone.
+    """
+
+    text = "\x1f".join(map(str, values[:_CSV_VALUES]))
+    if scope:
+        text = f"{scope}\x1e{text}"
+    return int.from_bytes(blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+class RowDeduplicator:
+    """Drop rows that an earlier source already supplied.
+
+    Keys are counted as a multiset: if a source repeats a row `n` times
+    (two identical trades on one day), only copies beyond the most any
+    earlier source had are new.  Memory is one `dict` entry per distinct
+    row key; no row is ever compared with another.
+    """
+
+    def __init__(self, seen: dict[int, int] | None = None) -> None:
+        """Initialize with counts of already `seen` row keys, if any."""
+
+        self.seen: dict[int, int] = {} if seen is None else seen
+        self.dropped = 0
+
+    def new_rows(self, rows: Iterable[RowValues], scope: str = "") -> Iterator[RowValues]:
+        """Yield the rows of one source that are not duplicates.
+
+        Rows duplicate only rows of the same `scope` (see `row_key`).  Sets
+        `dropped` to the number of duplicates skipped so far in this source.
+        """
+
+        seen = self.seen
+        counts: dict[int, int] = {}
+        self.dropped = 0
+        for values in rows:
+            key = row_key(values, scope)
+            count = counts[key] = counts.get(key, 0) + 1
+            if count > seen.get(key, 0):
+                seen[key] = count
+                yield values
+            else:
+                self.dropped += 1
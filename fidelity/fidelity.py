@@ -1,17 +1,63 @@
-"""Report generation for Fidelity transaction history."""
+"""Report generation for Fidelity transaction history.
 
+`rich` is imported only by the functions that render tables, so
+machine-readable output (and the CLI's `--help`) never loads it.
+"""
+
+from __future__ import annotations
+
+import logging
 from argparse import Namespace
+from array import array
 from collections import defaultdict
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
 from enum import Enum
+from functools import partial
+from heapq import nlargest
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from fidelity.accounts import DEFAULT_ACCOUNT, account_for
+from fidelity.aggregate import (
+    FIXED_SCALE,
+    fixed_group_sums,
+    fixed_running_sums,
+    group_sums,
+    running_sums,
+)
+from fidelity.cache import FileCache
+from fidelity.dedup import RowDeduplicator
+from fidelity.index import ReportIndex, history_key
+from fidelity.lots import LotBook, match_lots
+from fidelity.reader import HistoryRecord, iter_history_values, read_history_file
+from fidelity.rollup import ROLLUP_FIELDS, Rollup
+from fidelity.state import StateStore
+from fidelity.store import RecordStore, RecordView
+from fidelity.timing import PhaseTimer
+from fidelity.writers import ReportWriter
 
-import rich
-from rich.box import ROUNDED
-from rich.table import Column, Table
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
 
-from fidelity.reader import HistoryRecord, read_history_file
+    from fidelity.render import ChunkedTable
 
 __all__ = ["Fidelity"]
 
+logger = logging.getLogger(__name__)
+
+# Symbols left out of the history and symbol reports, unless `--no-exclude`.
+EXCLUDED_SYMBOLS = ("SPAXX",)
+
+# Values written for each row of the history and symbol reports, and the
+# position report, by a `ReportWriter`.
+REPORT_FIELDS = ("run_date", "action", "symbol", "quantity", "price", "amount", "balance")
+POSITION_FIELDS = ("symbol", "quantity", "amount", "balance")
+GAIN_FIELDS = ("symbol", "opened", "closed", "days", "quantity", "cost", "proceeds", "gain")
+
+# Seconds in a day, for holding periods.
+DAY_SECONDS = 86400
+
 
 class Style(Enum):
     """Styles for different table items."""
@@ -24,6 +70,9 @@ class Style(Enum):
 def _get_report_table(title: str) -> Table:
     """Create a Rich table for report output."""
 
+    from rich.box import ROUNDED
+    from rich.table import Column, Table
+
     return Table(
         Column("Run Date"),
         Column("Action"),
@@ -41,7 +90,42 @@ def _get_report_table(title: str) -> Table:
     )
 
 
-def _get_report_detail(rec: HistoryRecord, balance: float) -> list[str]:
+def _get_chunked_report_table(
+    title: str, store: RecordStore, chunk_size: int, console: Console | None = None
+) -> ChunkedTable:
+    """Create a table for report output that prints `chunk_size` rows at a time, to `console`.
+
+    Column widths are bounds over all of `store`, found without formatting
+    a single row: the longest distinct action and symbol, the largest
+    magnitudes, and the sum of all amounts for the balance.
+    """
+
+    from fidelity.render import ChunkedTable
+
+    def number_width(value: float) -> int:
+        return len(f"{-value:,.3f}")
+
+    floats = store.floats
+    return ChunkedTable(
+        title,
+        [
+            ("Run Date", 10, False),
+            ("Action", max(map(len, store.strings["action"].values), default=0), False),
+            ("Symbol", max(map(len, store.strings["symbol"].values), default=0), False),
+            ("Quantity", number_width(max(map(abs, floats["quantity"]), default=0)), True),
+            ("Price", number_width(max(map(abs, floats["price"]), default=0)), True),
+            ("Amount", number_width(max(map(abs, floats["amount"]), default=0)), True),
+            ("Balance", number_width(sum(map(abs, floats["amount"]))), True),
+        ],
+        chunk_size,
+        console,
+        style=Style.TABLE.value,
+        header_style=Style.HEADER.value,
+        row_style=Style.DETAIL.value,
+    )
+
+
+def _get_report_detail(rec: HistoryRecord | RecordView, balance: float) -> list[str]:
     """Format a record as a table row."""
 
     return [
@@ -55,101 +139,899 @@ def _get_report_detail(rec: HistoryRecord, balance: float) -> list[str]:
     ]
 
 
+def _get_gains_table(title: str) -> Table:
+    """Create a Rich table for the gains report."""
+
+    from rich.box import ROUNDED
+    from rich.table import Column, Table
+
+    return Table(
+        Column("Symbol"),
+        Column("Opened"),
+        Column("Closed"),
+        Column("Days", justify="right"),
+        Column("Quantity", justify="right"),
+        Column("Cost", justify="right"),
+        Column("Proceeds", justify="right"),
+        Column("Gain", justify="right"),
+        title=title,
+        title_style=Style.TABLE.value,
+        box=ROUNDED,
+        style=Style.TABLE.value,
+        header_style=Style.HEADER.value,
+        row_styles=[Style.DETAIL.value],
+    )
+
+
+def _get_gain_detail(values: Sequence[Any]) -> list[str]:
+    """Format the `GAIN_FIELDS` values of a lot as a table row."""
+
+    symbol, opened, closed, days, *numbers = values
+    return [
+        symbol,
+        opened,
+        closed,
+        "" if days is None else f"{days:,}",
+        *(f"{number:,.3f}" for number in numbers),
+    ]
+
+
+def _get_rollup_table(title: str) -> Table:
+    """Create a Rich table for the rollup report."""
+
+    from rich.box import ROUNDED
+    from rich.table import Column, Table
+
+    return Table(
+        Column("Period"),
+        Column("Symbol"),
+        Column("Action"),
+        Column("Count", justify="right"),
+        Column("Amount", justify="right"),
+        Column("Fees", justify="right"),
+        Column("Commission", justify="right"),
+        title=title,
+        title_style=Style.TABLE.value,
+        box=ROUNDED,
+        style=Style.TABLE.value,
+        header_style=Style.HEADER.value,
+        row_styles=[Style.DETAIL.value],
+    )
+
+
+def _to_fixed(value: float) -> int:
+    """Return `value` in fixed point; see `aggregate.to_fixed`."""
+    return round(value * FIXED_SCALE)
+
+
+def _log_read(filename: str, count: int, elapsed: float, duplicates: int = 0) -> None:
+    """Log the number of records read from `filename` and the time taken."""
+
+    logger.info(
+        "Read %d records from %r in %.3fs; removed %d duplicates",
+        count,
+        filename,
+        elapsed,
+        duplicates,
+    )
+
+
+def _read_timed(
+    filename: str, cache: FileCache | None = None, jobs: int = 1
+) -> tuple[RecordStore, float]:
+    """Read `filename`; return its records and the seconds it took."""
+
+    start = perf_counter()
+    records = read_history_file(filename, cache, jobs)
+    return records, perf_counter() - start
+
+
+def _read_partition(
+    files: list[str],
+    jobs: int = 1,
+    cache: FileCache | None = None,
+    dedup: bool = False,
+    timer: PhaseTimer | None = None,
+) -> RecordStore:
+    """Read the files of one account; see `Fidelity.read_input_files`."""
+
+    fidelity = Fidelity(Namespace(), timer=timer)
+    fidelity.read_input_files(files, jobs, cache, dedup)
+    return fidelity.records
+
+
 class Fidelity:
     """Report generator for Fidelity transaction history."""
 
     options: Namespace
-    records: list[HistoryRecord]
+    _records: RecordStore
+    _index: ReportIndex | None
+    _positions: dict[str, list[float]] | None
+    _rollup: Rollup | None
+    writer: ReportWriter | None
+    timer: PhaseTimer
+    account: str | None
+    console: Console | None
+    partitions: dict[str, RecordStore]
 
-    def __init__(self, options: Namespace) -> None:
-        """Initialize with CLI options."""
+    def __init__(
+        self,
+        options: Namespace,
+        writer: ReportWriter | None = None,
+        timer: PhaseTimer | None = None,
+        account: str | None = None,
+        console: Console | None = None,
+    ) -> None:
+        """Initialize with CLI options.
+
+        Reports go to `writer`, if given, instead of tables.  Reading,
+        indexing, selecting and rendering are measured by `timer`, if given.
+        Reports on a single `account` are titled, and named, after it.
+        Tables are printed to `console`, if given, instead of the global one.
+        """
 
         self.options = options
-        self.records = []
+        self.writer = writer
+        self.timer = timer if timer is not None else PhaseTimer(enabled=False)
+        self.account = account
+        self.console = console
+        self.partitions = {}
+        self._records = RecordStore()
+        self._index = None
+        self._positions = None
+        self._rollup = None
+
+    @property
+    def records(self) -> RecordStore:
+        """All loaded transaction records."""
+        return self._records
+
+    @records.setter
+    def records(self, records: Iterable[HistoryRecord | RecordView]) -> None:
+        if not isinstance(records, RecordStore):
+            records = RecordStore.from_records(records)
+        self._records = records
+        self._positions = None
+        self._rollup = None
+
+    @property
+    def index(self) -> ReportIndex:
+        """Sort orders and filtered views of `records`, shared by the reports.
+
+        Built on first use and rebuilt whenever `records` has changed;
+        rows appended since it was built are merged in instead.
+        """
+
+        if self._index is not None and self._index.can_update(self._records):
+            with self.timer.phase("update index") as phase:
+                phase.rows = len(self._records) - self._index.size
+                self._index.update()
+        elif self._index is None or not self._index.is_current(self._records):
+            with self.timer.phase("index") as phase:
+                self._index = ReportIndex(self._records)
+                phase.rows = len(self._records)
+        return self._index
+
+    @property
+    def rollup(self) -> Rollup:
+        """Totals of `records` by month, symbol and action, for the rollup report.
+
+        Summed in one pass on first use, and again only once `records`
+        has changed.
+        """
+
+        if self._rollup is None or self._rollup.size != len(self._records):
+            with self.timer.phase("rollup") as phase:
+                self._rollup = Rollup.from_store(self._records)
+                phase.rows = len(self._records)
+        return self._rollup
+
+    def _filters(self) -> dict[str, Any]:
+        """Return the `--symbol`, `--since` and `--until` selection."""
+
+        return {
+            "symbols": self.options.symbol,
+            "since": self.options.since,
+            "until": self.options.until,
+        }
+
+    def _exclude(self) -> Collection[str]:
+        """Return symbols to leave out of the history and symbol reports."""
+
+        return () if self.options.no_exclude else EXCLUDED_SYMBOLS
+
+    def _wanted(self, rec: HistoryRecord | RecordView) -> bool:
+        """Return True if `rec` passes the `--symbol`/`--since`/`--until` filters."""
+
+        options = self.options
+        return (
+            (options.symbol is None or rec.symbol in options.symbol)
+            and (options.since is None or rec.t_run_date >= options.since)
+            and (options.until is None or rec.t_run_date <= options.until)
+        )
+
+    def _title(self, title: str) -> str:
+        """Return table `title`, naming the account if there is one."""
+        return title if self.account is None else f"{title}: {self.account}"
+
+    def _report_name(self, name: str) -> str:
+        """Return writer report `name`, naming the account if there is one."""
+        return name if self.account is None else f"{name}:{self.account}"
+
+    def _scan_rows(self, exclude: Collection[str] = ()) -> Iterator[int]:
+        """Yield the rows passing the filters, less `exclude`, in store order.
+
+        A linear pass over the symbol and date columns, for selections
+        that do not need the sorted `index`.
+        """
+
+        options = self.options
+        store = self.records
+        column = store.strings["symbol"]
+        skip = {column.lookup[s] for s in exclude if s in column.lookup}
+        keep = None
+        if options.symbol is not None:
+            keep = {column.lookup[s] for s in options.symbol if s in column.lookup}
+        since, until = options.since, options.until
+
+        for row, (code, t_run_date) in enumerate(
+            zip(column.codes, store.ints["t_run_date"], strict=True)
+        ):
+            if (
+                code not in skip
+                and (keep is None or code in keep)
+                and (since is None or t_run_date >= since)
+                and (until is None or t_run_date <= until)
+            ):
+                yield row
+
+    def _column(self, name: str) -> Sequence[float]:
+        """Return float column `name`; in fixed point with `--exact`."""
 
-    def read_input_files(self, files: list[str]) -> None:
-        """Read transaction records from CSV files."""
+        if self.options.exact:
+            return self.records.fixed(name)
+        return self.records.floats[name]
+
+    def _running_sums(self, rows: array[int]) -> Iterable[float]:
+        """Return the running totals of `amount` over `rows`; exact with `--exact`.
+
+        Exact totals are accumulated as integers and converted once each.
+        """
+
+        if self.options.exact:
+            totals = fixed_running_sums(self.records.fixed("amount"), rows)
+            return (total / FIXED_SCALE for total in totals)
+        return running_sums(self.records.floats["amount"], rows)
+
+    def _group_sums(self, name: str, groups: Sequence[array[int]]) -> Sequence[float]:
+        """Return totals of column `name` over `groups`; in fixed point with `--exact`."""
+
+        if self.options.exact:
+            return fixed_group_sums(self.records.fixed(name), groups)
+        return group_sums(self.records.floats[name], groups)
+
+    def _has_index(self) -> bool:
+        """Return True if the `index` is built, and current."""
+        return self._index is not None and self._index.is_current(self._records)
+
+    def _last_rows(self, count: int) -> list[tuple[int, float]]:
+        """Return `(row, balance)` for the last `count` rows of the history report.
+
+        Unless the `index` is already built (as it stays, in a server), the
+        rows are picked with `nlargest` in one pass over the selection, in
+        O(n log count), without sorting the history.  Each `balance` is the
+        total of the selection less the amounts of later rows, in fixed
+        point, so it is exact: the `--exact` report's balance.
+        """
+
+        amount = self.records.fixed("amount")
+
+        with self.timer.phase("select last") as phase:
+            if self._has_index():
+                selected = self.index.select_history(**self._filters(), exclude=self._exclude())
+                total = sum(map(amount.__getitem__, selected))
+                rows = selected[max(len(selected) - count, 0) :][::-1] if count > 0 else []
+            else:
+                total = 0
+                selected = array("q")
+                for row in self._scan_rows(self._exclude()):
+                    total += amount[row]
+                    selected.append(row)
+                rows = nlargest(count, selected, key=self._history_key())
+            phase.rows = len(rows)
+
+        last = []
+        for row in rows:
+            last.append((row, total / FIXED_SCALE))
+            total -= amount[row]
+        return last[::-1]
+
+    def _history_key(self) -> Callable[[int], int]:
+        """Return the `ReportIndex` sort key of a row, `(t_run_date, symbol, row)`, as an int."""
+
+        date_key, size = history_key(self.records), max(len(self.records), 1)
+
+        def key(row: int) -> int:
+            return date_key(row) * size + row
+
+        return key
+
+    def _report_table(self, title: str) -> Table | ChunkedTable:
+        """Return a table for the history or symbol report.
+
+        With `--chunk-size`, rows are printed as they are added, in chunks;
+        otherwise they are collected into one Rich table.
+        """
+
+        title = self._title(title)
+        if self.options.chunk_size:
+            return _get_chunked_report_table(
+                title, self.records, self.options.chunk_size, self.console
+            )
+        return _get_report_table(title)
+
+    def _print_table(self, table: Table | ChunkedTable) -> None:
+        """Print what is left of a table from `_report_table`."""
+
+        import rich
+        from rich.table import Table
+
+        with self.timer.phase("render") as phase:
+            if isinstance(table, Table):
+                phase.rows = table.row_count
+                if self.console is not None:
+                    self.console.print(table)
+                else:
+                    rich.print(table)
+            else:
+                table.close()
+
+    def read_input_files(
+        self,
+        files: list[str],
+        jobs: int = 1,
+        cache: FileCache | None = None,
+        dedup: bool = False,
+    ) -> None:
+        """Read transaction records from CSV files.
+
+        With `jobs` > 1 the files are parsed in a pool of that many worker
+        processes; results are merged in `files` order, so the records end
+        up exactly as a serial read would leave them.  A single file is
+        split into parts parsed in parallel instead; see
+        `read_history_parallel`.  Unchanged files are loaded from `cache`,
+        if given.
+
+        With `dedup`, rows that an earlier file already supplied (as when
+        a yearly and a monthly download overlap) are dropped, by hashed
+        row key; see `RowDeduplicator`.
+        """
+
+        self._positions = None
+        dedup_rows = RowDeduplicator() if dedup else None
+        with self.timer.phase("read input files") as phase:
+            size = len(self.records)
+            if jobs > 1 and len(files) > 1:
+                from concurrent.futures import ProcessPoolExecutor
+
+                read = partial(_read_timed, cache=cache)
+                with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+                    self._merge_input_files(files, pool.map(read, files), dedup_rows)
+            elif cache is not None or jobs > 1:
+                read = partial(_read_timed, cache=cache, jobs=jobs)
+                self._merge_input_files(files, map(read, files), dedup_rows)
+            else:
+                # Stream rows straight into `self.records`; no per-file store.
+                for filename in files:
+                    with self.timer.phase(f"parse {filename}") as file_phase:
+                        start, count = perf_counter(), len(self.records)
+                        rows = iter_history_values(filename)
+                        if dedup_rows is not None:
+                            rows = dedup_rows.new_rows(rows)
+                        self.records.extend_values(rows)
+                        duplicates = dedup_rows.dropped if dedup_rows is not None else 0
+                        count = len(self.records) - count + duplicates
+                        file_phase.rows = count
+                    _log_read(filename, count, perf_counter() - start, duplicates)
+            phase.rows = len(self.records) - size
+
+    def read_partitions(
+        self,
+        partitions: dict[str, list[str]],
+        jobs: int = 1,
+        cache: FileCache | None = None,
+        dedup: bool = False,
+    ) -> None:
+        """Read the files of each account into a partition of its own.
+
+        `partitions` maps accounts to their files (see `partition_files`).
+        Each account is read, and deduplicated, independently of the others:
+        identical rows in two accounts are two transactions.  With `jobs` > 1
+        and several accounts, accounts are read in a pool of worker
+        processes.  Unchanged files are loaded from `cache`, so a new
+        download for one account parses only that file.
+
+        The records become all partitions merged, in `partitions` order (or
+        the one partition itself); `for_account` reports on one of them.
+        """
+
+        with self.timer.phase("read partitions") as phase:
+            if jobs > 1 and len(partitions) > 1:
+                from concurrent.futures import ProcessPoolExecutor
+
+                read = partial(_read_partition, cache=cache, dedup=dedup)
+                with ProcessPoolExecutor(max_workers=min(jobs, len(partitions))) as pool:
+                    stores = list(pool.map(read, partitions.values()))
+            else:
+                stores = []
+                for account, files in partitions.items():
+                    with self.timer.phase(f"account {account}"):
+                        stores.append(_read_partition(files, jobs, cache, dedup, self.timer))
+
+            self.partitions = dict(zip(partitions, stores, strict=True))
+            if len(stores) == 1:
+                records = stores[0]
+            else:
+                records = RecordStore()
+                for store in stores:
+                    records.extend(store)
+            self.records = records
+            phase.rows = len(records)
+
+    def for_account(self, account: str) -> Fidelity:
+        """Return a report generator over the partition of `account`."""
+
+        fidelity = Fidelity(self.options, self.writer, self.timer, account, self.console)
+        fidelity.records = self.partitions[account]
+        return fidelity
+
+    def ingest_input_files(
+        self,
+        files: list[str],
+        state: StateStore,
+        cache: FileCache | None = None,
+        accounts: Mapping[str, str | list[str]] | None = None,
+    ) -> None:
+        """Merge the new rows of CSV files into `state`, and report from it.
+
+        Rows already in `state` from an overlapping earlier download of the
+        same account (see `account_for`, with `accounts`) are skipped; the
+        records become everything ingested so far and the position report
+        uses the state's running totals.  Unchanged files are loaded from
+        `cache`, if given.
+        """
 
         for filename in files:
-            self.records.extend(read_history_file(filename))
+            start = perf_counter()
+            with self.timer.phase(f"ingest {filename}") as phase:
+                if cache is None:
+                    rows = iter_history_values(filename)
+                else:
+                    rows = read_history_file(filename, cache).iter_values()
+                # Files of no known account keep the keys of unscoped state files.
+                account = account_for(filename, accounts)
+                added, duplicates = state.ingest(
+                    rows, "" if account == DEFAULT_ACCOUNT else account
+                )
+                phase.rows = added + duplicates
+            logger.info(
+                "Ingested %d new records from %r in %.3fs; %d already present",
+                added,
+                filename,
+                perf_counter() - start,
+                duplicates,
+            )
+
+        self.records = state.records
+        self._positions = state.positions
+
+    def _merge_input_files(
+        self,
+        files: list[str],
+        results: Iterable[tuple[RecordStore, float]],
+        dedup_rows: RowDeduplicator | None = None,
+    ) -> None:
+        """Append each file's records, in order, logging the time taken."""
+
+        for filename, (records, elapsed) in zip(files, results, strict=True):
+            with self.timer.phase(f"merge {filename}") as phase:
+                phase.rows = len(records)
+                if dedup_rows is None:
+                    self.records.extend(records)
+                    duplicates = 0
+                else:
+                    self.records.extend_values(dedup_rows.new_rows(records.iter_values()))
+                    duplicates = dedup_rows.dropped
+            _log_read(filename, len(records), elapsed, duplicates)
+
+    def _history_rows(self) -> Iterator[tuple[int, float]]:
+        """Yield `(row, balance)` for each row of the history report."""
+
+        index = self.index
+        with self.timer.phase("select history") as phase:
+            rows = index.select_history(**self._filters(), exclude=self._exclude())
+            phase.rows = len(rows)
+        yield from zip(rows, self._running_sums(rows), strict=True)
 
-    def print_history_report(self) -> None:
-        """Print history report sorted by date."""
+    def _symbol_rows(self) -> Iterator[tuple[int, int, float]]:
+        """Yield `(group, row, balance)` for each row of the symbol report.
 
-        table = _get_report_table("History Report")
-        records = self._get_history_records()
-        balance = 0.0
+        `group` numbers the symbols from 0; `balance` restarts at each.
+        """
 
-        for rec in sorted(records, key=lambda x: (x.t_run_date, x.symbol)):
-            balance += rec.amount
-            table.add_row(*_get_report_detail(rec, balance))
+        index = self.index
+        with self.timer.phase("select groups") as phase:
+            groups = index.select_groups(**self._filters(), exclude=self._exclude())
+            phase.rows = sum(len(rows) for _, rows in groups)
+        for group, (_, rows) in enumerate(groups):
+            for row, balance in zip(rows, self._running_sums(rows), strict=True):
+                yield group, row, balance
 
-        rich.print(table)
+    def _report_values(self, rows: Iterable[tuple[int, float]]) -> Iterator[tuple[Any, ...]]:
+        """Return the `REPORT_FIELDS` values of `(row, balance)` pairs, unformatted."""
+
+        strings, floats = self.records.strings, self.records.floats
+        run_date, action, symbol = strings["run_date"], strings["action"], strings["symbol"]
+        quantity, price, amount = floats["quantity"], floats["price"], floats["amount"]
+        for row, balance in rows:
+            yield (
+                run_date[row],
+                action[row],
+                symbol[row],
+                quantity[row],
+                price[row],
+                amount[row],
+                balance,
+            )
+
+    def print_history_report(self, last: int | None = None) -> None:
+        """Print history report sorted by date; only its `last` rows, if given.
+
+        See `_last_rows`.
+        """
+
+        with self.timer.phase("history report") as phase:
+            rows = self._history_rows() if last is None else iter(self._last_rows(last))
+            if self.writer is not None:
+                values = self._report_values(rows)
+                name = self._report_name("history")
+                phase.rows = self.writer.write_report(name, REPORT_FIELDS, values)
+                return
+
+            table = self._report_table("History Report")
+            store = self.records
+            for row, balance in rows:
+                table.add_row(*_get_report_detail(RecordView(store, row), balance))
+            phase.rows = table.row_count
+
+            self._print_table(table)
 
     def print_symbol_report(self) -> None:
         """Print report grouped by symbol."""
 
-        table = _get_report_table("Symbol Report")
-        records = self._get_history_records()
-        last_symbol = None
-        balance = 0.0
+        with self.timer.phase("symbol report") as phase:
+            if self.writer is not None:
+                values = self._report_values((row, bal) for _, row, bal in self._symbol_rows())
+                name = self._report_name("symbol")
+                phase.rows = self.writer.write_report(name, REPORT_FIELDS, values)
+                return
+
+            table = self._report_table("Symbol Report")
+            store = self.records
+            last = 0
+            for group, row, balance in self._symbol_rows():
+                if group != last:
+                    table.add_section()
+                    last = group
+                table.add_row(*_get_report_detail(RecordView(store, row), balance))
+            phase.rows = table.row_count
+
+            self._print_table(table)
+
+    def _gain_rows(self, method: str) -> Iterator[tuple[int, tuple[Any, ...]]]:
+        """Yield `(group, values)`, by symbol, for each row of the gains report.
+
+        `group` numbers the symbols from 0 and `values` are `GAIN_FIELDS`.
+        Each symbol's lots are matched in one pass over its rows, in date
+        order from the start of the history: the lots a sale closes may be
+        older than `--since`, which only limits the sales reported.  Sold
+        lots come first, in order of sale, then open ones, valued at the
+        symbol's last price in the history (it holds no quotes) and held
+        until the latest run date of any symbol.
+        """
+
+        options = self.options
+        exact = options.exact
+        scale = FIXED_SCALE if exact else 1
+        store = self.records
+        t_run_date, run_date = store.ints["t_run_date"], store.strings["run_date"]
+        quantity, amount = self._column("quantity"), self._column("amount")
+        price = store.floats["price"]
+
+        groups = self.index.select_groups(options.symbol, None, options.until, self._exclude())
+        with self.timer.phase("match lots") as phase:
+            books = [LotBook(method, exact) for _ in groups]
+            matched = [
+                match_lots(book, rows, t_run_date, quantity, amount)
+                for book, (_, rows) in zip(books, groups, strict=True)
+            ]
+            phase.rows = sum(len(rows) for _, rows in groups)
+        as_of = max((t_run_date[rows[-1]] for _, rows in groups), default=0)
+
+        def days(opened: int, closed: int) -> int:
+            return round((closed - t_run_date[opened]) / DAY_SECONDS)
+
+        for group, ((symbol, rows), gains, book) in enumerate(
+            zip(groups, matched, books, strict=True)
+        ):
+            for gain in gains:
+                closed = t_run_date[gain.closed]
+                if options.since is not None and closed < options.since:
+                    continue
+                cost, proceeds = gain.cost / scale, gain.proceeds / scale
+                yield (
+                    group,
+                    (
+                        symbol,
+                        run_date[gain.opened] if gain.opened >= 0 else "",
+                        run_date[gain.closed],
+                        days(gain.opened, closed) if gain.opened >= 0 else None,
+                        gain.quantity / scale,
+                        cost,
+                        proceeds,
+                        proceeds - cost,
+                    ),
+                )
+
+            last_price = next((price[row] for row in reversed(rows) if price[row]), 0.0)
+            for lot in book.lots:
+                shares, cost = lot.quantity / scale, lot.cost / scale
+                value = shares * last_price
+                yield (
+                    group,
+                    (
+                        symbol,
+                        run_date[lot.row],
+                        "",
+                        days(lot.row, as_of),
+                        shares,
+                        cost,
+                        value,
+                        value - cost,
+                    ),
+                )
+
+    def print_gains_report(self, method: str = "fifo") -> None:
+        """Print realized and unrealized gains by lot, matching sales to lots by `method`.
+
+        See `_gain_rows` and `lots.LOT_METHODS`.
+        """
+
+        with self.timer.phase("gains report") as phase:
+            rows = self._gain_rows(method)
+            if self.writer is not None:
+                name = self._report_name("gains")
+                lots = (values for _, values in rows)
+                phase.rows = self.writer.write_report(name, GAIN_FIELDS, lots)
+                return
+
+            table = _get_gains_table(self._title("Gains Report"))
+            last = 0
+            for group, values in rows:
+                if group != last:
+                    table.add_section()
+                    last = group
+                table.add_row(*_get_gain_detail(values))
+            phase.rows = table.row_count
+
+            self._print_table(table)
 
-        for rec in sorted(records, key=lambda x: (x.symbol, x.t_run_date)):
-            if last_symbol is not None and last_symbol != rec.symbol:
-                balance = 0.0
-                table.add_section()
-            last_symbol = rec.symbol
-            balance += rec.amount
-            table.add_row(*_get_report_detail(rec, balance))
+    def print_rollup_report(self, by: str, rollup: Rollup | None = None) -> None:
+        """Print totals by `by` period (see `rollup.PERIODS`), symbol and action.
 
-        rich.print(table)
+        Totals are merged from `rollup` if given (e.g. from the cache), or
+        else from the `rollup` property, by symbol: no record is read for
+        `--symbol`.  Only `--since` and `--until`, which may cut periods
+        short, sum the selected records again.
+        """
 
-    def print_position_report(self) -> None:
-        """Print position summary with totals per symbol."""
+        options = self.options
+        with self.timer.phase("rollup report") as phase:
+            if options.since is not None or options.until is not None:
+                with self.timer.phase("rollup") as scan:
+                    rollup = Rollup.from_store(self.records, self._scan_rows())
+                    scan.rows = rollup.size
+            elif rollup is None:
+                rollup = self.rollup
+            rows = rollup.select(by, options.symbol, self._exclude())
 
+            if self.writer is not None:
+                name = self._report_name("rollup")
+                phase.rows = self.writer.write_report(name, ROLLUP_FIELDS, rows)
+                return
+
+            table = _get_rollup_table(self._title(f"Rollup Report by {by.title()}"))
+            last = None
+            for period, symbol, action, count, *money in rows:
+                if last is not None and period != last:
+                    table.add_section()
+                last = period
+                table.add_row(
+                    period,
+                    symbol,
+                    action.lower(),
+                    f"{count:,}",
+                    *(f"{total:,.3f}" for total in money),
+                )
+            phase.rows = table.row_count
+
+            self._print_table(table)
+
+    def _position_totals(
+        self, records: Iterable[HistoryRecord | RecordView] | None = None, scan: bool = False
+    ) -> dict[str, dict[str, float]]:
+        """Return `quantity`, `amount` and `balance` totals by symbol, of `records` or all.
+
+        A stream of `records` (such as `iter_input_files`) is summed in one
+        pass, in constant memory.  Loaded records are summed by `group_sums`
+        over the index's symbol groups or, with `scan`, in one pass in store
+        order without building the index.  Unfiltered totals after
+        `ingest_input_files` come straight from the state.  With `--exact`,
+        sums are in fixed point, converted at the end.  `balance` runs over
+        symbols in sorted order.
+        """
+
+        exact = self.options.exact
+        zero = 0 if exact else 0.0
         symbols: dict[str, dict[str, float]] = defaultdict(
             lambda: {  # key=symbol
-                "quantity": 0.0,
-                "amount": 0.0,
-                "balance": 0.0,
+                "quantity": zero,
+                "amount": zero,
+                "balance": zero,
             }
         )
 
-        balance = 0.0
-        for rec in sorted(self.records, key=lambda x: x.symbol):
-            symbols[rec.symbol]["quantity"] += rec.quantity
-            symbols[rec.symbol]["amount"] += rec.amount
-            balance += rec.amount
-            symbols[rec.symbol]["balance"] = balance
-
-        table = Table(
-            Column("Symbol"),
-            Column("Quantity", justify="right"),
-            Column("Amount", justify="right"),
-            Column("Balance", justify="right"),
-            title="Position Report",
-            title_style=Style.TABLE.value,
-            box=ROUNDED,
-            style=Style.TABLE.value,
-            header_style=Style.HEADER.value,
-            row_styles=[Style.DETAIL.value],
-        )
+        if (
+            records is None
+            and self._positions is not None
+            and not exact
+            and not any(self._filters().values())
+        ):
+            for symbol, (quantity_total, amount_total) in self._positions.items():
+                symbols[symbol]["quantity"] = quantity_total
+                symbols[symbol]["amount"] = amount_total
+        elif records is None and scan:
+            column = self.records.strings["symbol"]
+            codes, values = column.codes, column.values
+            quantity, amount = self._column("quantity"), self._column("amount")
+            for row in self._scan_rows():
+                data = symbols[values[codes[row]]]
+                data["quantity"] += quantity[row]
+                data["amount"] += amount[row]
+        elif records is None:
+            groups = self.index.select_groups(**self._filters())
+            selected = [rows for _, rows in groups]
+            for (symbol, _), quantity_total, amount_total in zip(
+                groups,
+                self._group_sums("quantity", selected),
+                self._group_sums("amount", selected),
+                strict=True,
+            ):
+                symbols[symbol]["quantity"] = quantity_total
+                symbols[symbol]["amount"] = amount_total
+        else:
+            units = _to_fixed if exact else float
+            for rec in filter(self._wanted, records):
+                data = symbols[rec.symbol]
+                data["quantity"] += units(rec.quantity)
+                data["amount"] += units(rec.amount)
+
+        balance = zero
+        for symbol in sorted(symbols):
+            balance += symbols[symbol]["amount"]
+            symbols[symbol]["balance"] = balance
+
+        if exact:
+            symbols = {
+                symbol: {name: total / FIXED_SCALE for name, total in data.items()}
+                for symbol, data in symbols.items()
+            }
+        return dict(sorted(symbols.items()))
+
+    def print_position_report(
+        self, records: Iterable[HistoryRecord | RecordView] | None = None, top: int | None = None
+    ) -> None:
+        """Print position summary with totals per symbol, from `records` if given.
+
+        With `top`, print only that many positions with the largest
+        absolute amounts, largest first, picked with `nlargest`; loaded
+        records are then summed without building the `index`, unless it
+        is already built.  See `_position_totals`.
+        """
 
-        for symbol, data in symbols.items():
-            table.add_row(
-                symbol,
-                f"{data['quantity']:,.3f}",
-                f"{data['amount']:,.3f}",
-                f"{data['balance']:,.3f}",
+        with self.timer.phase("position report") as phase:
+            symbols = self._position_totals(
+                records, scan=top is not None and not self._has_index()
             )
+            if top is not None:
+                symbols = dict(
+                    nlargest(top, symbols.items(), key=lambda item: abs(item[1]["amount"]))
+                )
+
+            if self.writer is not None:
+                values = (
+                    (symbol, data["quantity"], data["amount"], data["balance"])
+                    for symbol, data in symbols.items()
+                )
+                name = self._report_name("position")
+                phase.rows = self.writer.write_report(name, POSITION_FIELDS, values)
+                return
+
+            from rich.box import ROUNDED
+            from rich.table import Column, Table
+
+            table = Table(
+                Column("Symbol"),
+                Column("Quantity", justify="right"),
+                Column("Amount", justify="right"),
+                Column("Balance", justify="right"),
+                title=self._title("Position Report"),
+                title_style=Style.TABLE.value,
+                box=ROUNDED,
+                style=Style.TABLE.value,
+                header_style=Style.HEADER.value,
+                row_styles=[Style.DETAIL.value],
+            )
+
+            for symbol, data in symbols.items():
+                table.add_row(
+                    symbol,
+                    f"{data['quantity']:,.3f}",
+                    f"{data['amount']:,.3f}",
+                    f"{data['balance']:,.3f}",
+                )
+
+            phase.rows = table.row_count
+
+            self._print_table(table)
+
+    def print_reports(
+        self,
+        last: int | None = None,
+        top: int | None = None,
+        by_account: bool = False,
+        gains: str | None = None,
+        by: str | None = None,
+    ) -> None:
+        """Print all reports, or only the `last` and `top` summaries, gains and rollup.
+
+        The gains report, with lots matched by method `gains`, and the
+        rollup report by period `by` are printed only when asked for.  With
+        `by_account`, print the reports for each partition first, then for
+        all records merged.
+        """
+
+        if by_account:
+            for account in self.partitions:
+                self.for_account(account).print_reports(last, top, gains=gains, by=by)
 
-        rich.print(table)
+        if last is None and top is None and gains is None and by is None:
+            self.print_history_report()
+            self.print_symbol_report()
+            self.print_position_report()
+            return
 
-    def _get_history_records(self) -> list[HistoryRecord]:
-        """Return records, optionally filtering out SPAXX."""
+        if last is not None:
+            self.print_history_report(last=last)
+        if top is not None:
+            self.print_position_report(top=top)
+        if gains is not None:
+            self.print_gains_report(gains)
+        if by is not None:
+            self.print_rollup_report(by)
 
-        if self.options.no_exclude:
-            return self.records
+    def _get_history_records(self) -> list[RecordView]:
+        """Return records by date, optionally filtering out SPAXX."""
 
-        records = [x for x in self.records if x.symbol not in ["SPAXX"]]
-        return records
+        rows = self.index.select_history(**self._filters(), exclude=self._exclude())
+        return [RecordView(self.records, row) for row in rows]
@@ -0,0 +1,218 @@
+"""Shared sort orders, per-symbol and per-date indexes over a `RecordStore`."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Collection
+from heapq import merge
+
+from fidelity.store import RecordStore, StringColumn
+
+__all__ = ["ReportIndex", "history_key", "symbol_ranks"]
+
+# `(symbol, rows)`; rows are row numbers in date order.
+Group = tuple[str, "array[int]"]
+
+
+def _insert_sorted(rows: array[int], new: list[int], key: Callable[[int], int]) -> array[int]:
+    """Return `rows` with `new` rows inserted; both are in `key` order.
+
+    Each new row is placed by bisection, after any rows with an equal key,
+    and the runs between them are copied as slices: O(k log n) key lookups
+    plus copying, where a merge would look up every key.
+    """
+
+    merged = array("q")
+    lo = 0
+    for row in new:
+        hi = bisect_right(rows, key(row), lo=lo, key=key)
+        merged.extend(rows[lo:hi])
+        merged.append(row)
+        lo = hi
+    merged.extend(rows[lo:])
+    return merged
+
+
+def symbol_ranks(symbols: StringColumn) -> list[int]:
+    """Return the rank of each code of `symbols` in sorted symbol order."""
+
+    rank = [0] * len(symbols.values)
+    for position, code in enumerate(sorted(range(len(rank)), key=symbols.values.__getitem__)):
+        rank[code] = position
+    return rank
+
+
+def history_key(store: RecordStore, rank: list[int] | None = None) -> Callable[[int], int]:
+    """Return the `by_date` sort key of a row of `store`: `(t_run_date, symbol)` as one int.
+
+    `rank` is the `symbol_ranks` of the store's symbols (default: ranked
+    now); ranks are in `[0, len(rank))`, which keeps the two parts apart.
+    """
+
+    column = store.strings["symbol"]
+    if rank is None:
+        rank = symbol_ranks(column)
+    t_run_date, codes, width = store.ints["t_run_date"], column.codes, max(len(rank), 1)
+
+    def key(row: int) -> int:
+        return t_run_date[row] * width + rank[codes[row]]
+
+    return key
+
+
+class ReportIndex:
+    """Row orderings and lookups shared by all reports.
+
+    Built once per set of loaded records, instead of each report sorting
+    (and filtering) the records on its own:
+
+        by_date:    every row, ordered by `(t_run_date, symbol)`.
+        groups:     `(symbol, rows)` for every symbol, in symbol order;
+                    each `rows` is in `by_date` order, so together they
+                    are the `(symbol, t_run_date)` ordering.
+        symbols:    symbol to its `rows`.
+
+    Only `by_date` is an actual sort, on a single integer key; `groups`
+    is bucketed from it in one linear pass.  Both sorts are stable, so
+    ties keep input order, exactly like `sorted` on the records would.
+
+    Every `rows` array is in date order, so `select_history` and
+    `select_groups` find a date range by bisection and pick symbols by
+    lookup; their cost follows the number of matching rows, not the
+    size of the history.
+
+    Rows appended to the store later are added by `update`, without
+    sorting the rows already indexed again.
+    """
+
+    def __init__(self, store: RecordStore) -> None:
+        """Build index over `store`."""
+
+        self.store = store
+        self.size = len(store)
+        self._t_run_date = store.ints["t_run_date"]
+        self._rank_symbols()
+        self.by_date = array("q", sorted(range(self.size), key=self._keys.__getitem__))
+
+        codes = store.strings["symbol"].codes
+        buckets: dict[int, array[int]] = {}
+        for row in self.by_date:
+            code = codes[row]
+            if (bucket := buckets.get(code)) is None:
+                bucket = buckets[code] = array("q")
+            bucket.append(row)
+        self._set_groups(buckets)
+
+    def _rank_symbols(self) -> None:
+        """Rank the symbols, and key every row by `(t_run_date, symbol)`."""
+
+        self._rank = symbol_ranks(self.store.strings["symbol"])
+        self._keys = array("q", map(history_key(self.store, self._rank), range(self.size)))
+
+    def _set_groups(self, buckets: dict[int, array[int]]) -> None:
+        """Set `groups` and `symbols` from the rows of each symbol code."""
+
+        values = self.store.strings["symbol"].values
+        self.groups: list[Group] = [
+            (values[code], buckets[code]) for code in sorted(buckets, key=self._rank.__getitem__)
+        ]
+        self.symbols = dict(self.groups)
+
+    def is_current(self, store: RecordStore) -> bool:
+        """Return True if this index still describes `store`."""
+
+        return store is self.store and len(store) == self.size
+
+    def can_update(self, store: RecordStore) -> bool:
+        """Return True if `store` only has rows appended since this index was built."""
+
+        return store is self.store and len(store) > self.size
+
+    def update(self) -> None:
+        """Add the rows appended to the store since this index was built.
+
+        Only the new rows are sorted; they are then merged into `by_date`
+        and into the groups of their symbols in linear passes.  A symbol
+        seen for the first time shifts the ranks, so then every row's key
+        is recomputed, but nothing is re-sorted.  The result is the index
+        a full build would make.
+        """
+
+        store = self.store
+        start, self.size = self.size, len(store)
+        column = store.strings["symbol"]
+        if len(column.values) == len(self._rank):
+            self._keys.extend(map(history_key(store, self._rank), range(start, self.size)))
+        else:
+            self._rank_symbols()
+
+        key = self._keys.__getitem__
+        new_rows = sorted(range(start, self.size), key=key)
+        self.by_date = _insert_sorted(self.by_date, new_rows, key)
+
+        codes = column.codes
+        added: dict[int, list[int]] = {}
+        for row in new_rows:
+            added.setdefault(codes[row], []).append(row)
+        buckets = {column.lookup[symbol]: rows for symbol, rows in self.groups}
+        for code, rows in added.items():
+            if (bucket := buckets.get(code)) is None:
+                buckets[code] = array("q", rows)
+            else:
+                buckets[code] = _insert_sorted(bucket, rows, key)
+        self._set_groups(buckets)
+
+    def date_range(self, rows: array[int], since: int | None, until: int | None) -> array[int]:
+        """Return the part of date-ordered `rows` within `[since, until]`."""
+
+        if since is None and until is None:
+            return rows
+        key = self._t_run_date.__getitem__
+        lo = 0 if since is None else bisect_left(rows, since, key=key)
+        hi = len(rows) if until is None else bisect_right(rows, until, key=key)
+        return rows[lo:hi]
+
+    def select_groups(
+        self,
+        symbols: Collection[str] | None = None,
+        since: int | None = None,
+        until: int | None = None,
+        exclude: Collection[str] = (),
+    ) -> list[Group]:
+        """Return `(symbol, rows)` groups, in symbol order, for a selection.
+
+        Keeps `symbols` (default all) less `exclude`, and rows with run
+        dates within `[since, until]`.  Groups left empty are dropped.
+        """
+
+        if symbols is None:
+            groups = self.groups
+        else:
+            groups = [(s, self.symbols[s]) for s in sorted(set(symbols)) if s in self.symbols]
+
+        selected = []
+        for symbol, rows in groups:
+            if symbol not in exclude and (rows := self.date_range(rows, since, until)):
+                selected.append((symbol, rows))
+        return selected
+
+    def select_history(
+        self,
+        symbols: Collection[str] | None = None,
+        since: int | None = None,
+        until: int | None = None,
+        exclude: Collection[str] = (),
+    ) -> array[int]:
+        """Return rows in `by_date` order, restricted as by `select_groups`."""
+
+        if symbols is not None:
+            groups = self.select_groups(symbols, since, until, exclude)
+            return array("q", merge(*(rows for _, rows in groups), key=self._keys.__getitem__))
+
+        rows = self.date_range(self.by_date, since, until)
+        column = self.store.strings["symbol"]
+        if excluded := {column.lookup[s] for s in exclude if s in column.lookup}:
+            codes = column.codes
+            rows = array("q", (row for row in rows if codes[row] not in excluded))
+        return rows
@@ -0,0 +1,168 @@
+"""Match sales against the lots they close, for realized and unrealized gains."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from heapq import heappop, heappush
+from typing import NamedTuple
+
+__all__ = ["LOT_METHODS", "Gain", "Lot", "LotBook", "match_lots"]
+
+# Lots a sale closes first: oldest, newest, or highest cost per share.
+LOT_METHODS = ("fifo", "lifo", "hifo")
+
+# Float quantities left over from matching below this are rounding noise.
+_EPSILON = 1e-9
+
+
+class Lot:
+    """Shares bought by one transaction and not sold yet."""
+
+    __slots__ = ("cost", "quantity", "row")
+
+    def __init__(self, row: int, quantity: float, cost: float) -> None:
+        """Initialize lot opened by record `row`."""
+
+        self.row = row
+        self.quantity = quantity
+        self.cost = cost
+
+
+class Gain(NamedTuple):
+    """Part of a lot closed by a sale.
+
+    `opened` and `closed` are the rows of the buy and the sale; `opened`
+    is -1 for shares sold without a lot to match (unknown cost).
+    """
+
+    opened: int
+    closed: int
+    quantity: float
+    cost: float
+    proceeds: float
+
+
+class LotBook:
+    """Open lots of one symbol, closed by sales in `method` order.
+
+    `fifo` and `lifo` keep the lots in a deque and `hifo` in a heap, so
+    each match takes O(1) or O(log n) time and matching a symbol's
+    transactions takes time linear in their number (`hifo`: n log n).
+
+    Quantities and money may be floats, or integer micro-units with
+    `exact` (see `aggregate.to_fixed`): a partly sold lot's cost is then
+    prorated with integer division, and the parts still add up to the
+    whole, exactly.
+    """
+
+    def __init__(self, method: str = "fifo", exact: bool = False) -> None:
+        """Initialize empty book."""
+
+        if method not in LOT_METHODS:
+            raise ValueError(f"unknown lot method {method!r}")
+        self.method = method
+        self.exact = exact
+        self._lots: deque[Lot] = deque()
+        self._heap: list[tuple[float, int, Lot]] = []
+
+    def _prorate(self, value: float, part: float, whole: float) -> float:
+        """Return the share of `value` that `part` is of `whole`."""
+
+        if self.exact:
+            return (int(value) * int(part) + int(whole) // 2) // int(whole)
+        return value * part / whole
+
+    def open(self, row: int, quantity: float, cost: float) -> None:
+        """Add a lot of `quantity` shares bought by record `row` for `cost`."""
+
+        lot = Lot(row, quantity, cost)
+        if self.method == "hifo":
+            heappush(self._heap, (-cost / quantity, row, lot))
+        else:
+            self._lots.append(lot)
+
+    def _next(self) -> Lot | None:
+        """Return the lot the next sale closes, if any."""
+
+        if self.method == "hifo":
+            return self._heap[0][2] if self._heap else None
+        if not self._lots:
+            return None
+        return self._lots[0] if self.method == "fifo" else self._lots[-1]
+
+    def _drop(self) -> None:
+        """Remove the lot `_next` returned."""
+
+        if self.method == "hifo":
+            heappop(self._heap)
+        elif self.method == "fifo":
+            self._lots.popleft()
+        else:
+            self._lots.pop()
+
+    def close(self, row: int, quantity: float, proceeds: float) -> Iterator[Gain]:
+        """Sell `quantity` shares for `proceeds` in record `row`; yield the lots closed."""
+
+        epsilon = 0 if self.exact else _EPSILON
+        while quantity > epsilon and (lot := self._next()) is not None:
+            if lot.quantity - quantity > epsilon:
+                sold, cost = quantity, self._prorate(lot.cost, quantity, lot.quantity)
+                lot.quantity -= sold
+                lot.cost -= cost
+            else:
+                sold, cost = lot.quantity, lot.cost
+                self._drop()
+            if quantity - sold > epsilon:
+                part = self._prorate(proceeds, sold, quantity)
+            else:
+                part = proceeds
+            yield Gain(lot.row, row, sold, cost, part)
+            quantity -= sold
+            proceeds -= part
+
+        if quantity > epsilon:
+            yield Gain(-1, row, quantity, 0 if self.exact else 0.0, proceeds)
+
+    @property
+    def lots(self) -> list[Lot]:
+        """Return the open lots, oldest first."""
+
+        if self.method == "hifo":
+            return sorted((lot for _, _, lot in self._heap), key=lambda lot: lot.row)
+        return list(self._lots)
+
+
+def match_lots(
+    book: LotBook,
+    rows: Iterable[int],
+    t_run_date: Sequence[int],
+    quantity: Sequence[float],
+    amount: Sequence[float],
+) -> list[Gain]:
+    """Return the lots of `book` closed by the sales among `rows` of its symbol.
+
+    `rows` are in date order.  Rows with positive quantities open lots
+    costing `-amount`; negative quantities close them for proceeds of
+    `amount`; rows without a quantity (dividends, fees) are skipped.  The
+    sales of a day are matched after its buys, whatever their order in
+    the file, so shares bought and sold on the same day match.  The lots
+    left open stay in `book`.
+    """
+
+    gains: list[Gain] = []
+    sales: list[int] = []
+    day = None
+    for row in rows:
+        if t_run_date[row] != day:
+            for sale in sales:
+                gains.extend(book.close(sale, -quantity[sale], amount[sale]))
+            sales.clear()
+            day = t_run_date[row]
+        if quantity[row] > 0:
+            book.open(row, quantity[row], -amount[row])
+        elif quantity[row] < 0:
+            sales.append(row)
+    for sale in sales:
+        gains.extend(book.close(sale, -quantity[sale], amount[sale]))
+    return gains
@@ -1,10 +1,51 @@
 """CSV reader for Fidelity transaction history files."""
 
+from __future__ import annotations
+
 import csv
-from dataclasses import dataclass, field, fields
-from time import mktime, strptime
+import io
+import mmap
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import pairwise, takewhile
+from operator import itemgetter
+
+from fidelity.cache import FileCache
+from fidelity.dates import parse_date
+from fidelity.store import ALL_COLUMNS, RecordStore, RowValues
+
+__all__ = [
+    "HistoryRecord",
+    "find_data_block",
+    "iter_block_values",
+    "iter_history_file",
+    "iter_history_values",
+    "iter_input_files",
+    "iter_mapped_values",
+    "make_row_converter",
+    "read_history_file",
+    "read_history_parallel",
+    "split_data_block",
+]
+
+# Bytes of data rows decoded and parsed at a time by `iter_block_values`.
+BLOCK_BATCH_BYTES = 1 << 20
+
+# Smallest range of data rows `read_history_parallel` gives a worker.
+MIN_PART_BYTES = 4 << 20
 
-__all__ = ["HistoryRecord", "read_history_file"]
+# Buffers `find_data_block` and friends work on: a whole file's bytes.
+Buffer = bytes | mmap.mmap
+
+
+def _to_float(value: str | float) -> float:
+    """Convert a CSV cell to float; blank or malformed is 0.0."""
+
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
 
 
 @dataclass
@@ -38,44 +79,289 @@ class HistoryRecord:
         self.description = self.description.strip()
 
         # Convert strings to floats.
-        for f in fields(self):
-            if f.type is float:
-                value = getattr(self, f.name)
-                if isinstance(value, str):
-                    try:
-                        value = float(value)
-                    except ValueError:
-                        value = 0.0
-                    setattr(self, f.name, value)
+        self.quantity = _to_float(self.quantity)
+        self.price = _to_float(self.price)
+        self.commission = _to_float(self.commission)
+        self.fees = _to_float(self.fees)
+        self.accrued_interest = _to_float(self.accrued_interest)
+        self.amount = _to_float(self.amount)
+        self.cash_balance = _to_float(self.cash_balance)
 
         # Convert date-strings to unix time integer.
-        self.t_run_date = (
-            int(mktime(strptime(self.run_date, "%m/%d/%Y"))) if self.run_date else 0
-        )
+        self.t_run_date = parse_date(self.run_date)
+        self.t_settlement_date = parse_date(self.settlement_date)
+
+    @classmethod
+    def from_values(cls, values: RowValues) -> HistoryRecord:
+        """Return a record from already converted `values`.
+
+        Skips `__init__` (and the conversions in `__post_init__`).
+        """
+
+        rec = cls.__new__(cls)
+        rec.__dict__.update(zip(ALL_COLUMNS, values, strict=True))
+        return rec
+
+
+# Column heading (lower-cased, without any ` ($)` unit suffix) to field name.
+_HEADINGS = {
+    "run date": "run_date",
+    "action": "action",
+    "symbol": "symbol",
+    "description": "description",
+    "type": "type",
+    "quantity": "quantity",
+    "price": "price",
+    "commission": "commission",
+    "fees": "fees",
+    "accrued interest": "accrued_interest",
+    "amount": "amount",
+    "cash balance": "cash_balance",
+    "settlement date": "settlement_date",
+}
+
+# CSV fields in `HistoryRecord` order.
+_FIELDS = tuple(_HEADINGS.values())
+
+
+def make_row_converter(header: list[str] | None = None) -> Callable[[list[str]], RowValues]:
+    """Return a function that converts a raw CSV row to record values.
+
+    The column layout is resolved once from the `header` row; when the
+    header is missing or does not name every field, columns are taken in
+    `HistoryRecord` order.  The returned function does no lookups of its
+    own: it picks the cells, strips, converts and returns a `RowValues`
+    tuple ready for `RecordStore.append_values`/`extend_values`.
+    """
 
-        self.t_settlement_date = (
-            int(mktime(strptime(self.settlement_date, "%m/%d/%Y")))
-            if self.settlement_date
-            else 0
+    positions = {
+        _HEADINGS.get(heading.strip().lower().removesuffix(" ($)")): index
+        for index, heading in enumerate(header or [])
+    }
+    if all(name in positions for name in _FIELDS):
+        getter = itemgetter(*[positions[name] for name in _FIELDS])
+    else:
+        getter = itemgetter(*range(len(_FIELDS)))
+
+    to_float = _to_float
+    to_time = parse_date
+
+    def convert(row: list[str]) -> RowValues:
+        (
+            run_date,
+            action,
+            symbol,
+            description,
+            type_,
+            quantity,
+            price,
+            commission,
+            fees,
+            accrued_interest,
+            amount,
+            cash_balance,
+            settlement_date,
+        ) = getter(row)
+        run_date = run_date.strip()
+        return (
+            run_date,
+            action.strip(),
+            symbol.strip(),
+            description.strip(),
+            type_,
+            to_float(quantity),
+            to_float(price),
+            to_float(commission),
+            to_float(fees),
+            to_float(accrued_interest),
+            to_float(amount),
+            to_float(cash_balance),
+            settlement_date,
+            to_time(run_date),
+            to_time(settlement_date),
         )
 
+    return convert
+
 
-def read_history_file(filename: str) -> list[HistoryRecord]:
+def read_history_file(
+    filename: str, cache: FileCache | None = None, jobs: int = 1
+) -> RecordStore:
     """Read a Fidelity history CSV file and return transaction records.
 
-    Fidelity CSV files have 3 header lines before the data rows.
+    Fidelity CSV files have 3 header lines before the data rows; the
+    third names the columns.  The file is memory-mapped and parsed by
+    `iter_mapped_values`.  With `jobs` > 1, a large file is parsed by
+    `read_history_parallel` instead.
+
+    With a `cache`, an unchanged file is loaded from it instead of being
+    parsed, and a parsed file is saved to it.
+    """
+
+    if cache is not None and (records := cache.get(filename)) is not None:
+        return records
+
+    if jobs > 1:
+        records = read_history_parallel(filename, jobs)
+    else:
+        records = RecordStore()
+        records.extend_values(iter_mapped_values(filename))
+
+    if cache is not None:
+        cache.put(filename, records)
+    return records
+
+
+def read_history_parallel(filename: str, jobs: int) -> RecordStore:
+    """Read one history file in up to `jobs` worker processes.
+
+    The data block (see `find_data_block`) is split into line-aligned
+    byte ranges of at least `MIN_PART_BYTES`; each worker maps the file
+    and parses one range, and the parts are joined in file order.  The
+    records are exactly those a serial read returns.
+    """
+
+    records = RecordStore()
+    with open(filename, "rb") as fp:
+        try:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            data = None
+        if data is None:
+            records.extend_values(iter_history_values(filename))
+            return records
+        with data:
+            header, start, end = find_data_block(data)
+            parts = max(1, min(jobs, (end - start) // MIN_PART_BYTES))
+            ranges = split_data_block(data, start, end, parts)
+
+    if len(ranges) == 1:
+        records.extend_values(iter_mapped_values(filename))
+        return records
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    starts, ends = zip(*ranges, strict=True)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        for part in pool.map(partial(_read_range, filename, header), starts, ends):
+            records.extend(part)
+    return records
+
+
+def _read_range(filename: str, header: list[str] | None, start: int, end: int) -> RecordStore:
+    """Return the records of the rows in bytes `[start, end)` of `filename`."""
+
+    records = RecordStore()
+    with open(filename, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        records.extend_values(iter_block_values(data, start, end, make_row_converter(header)))
+    return records
+
+
+def iter_history_values(filename: str) -> Iterator[RowValues]:
+    """Yield the converted values of each row of a Fidelity history CSV file.
+
+    Rows are read, converted and yielded one at a time; nothing is kept.
     """
 
-    records: list[HistoryRecord] = []
     with open(filename, encoding="utf-8") as fp:
-        # Skip 3 header lines (Fidelity CSV format)
-        _ = fp.readline()
+        # Skip 2 preamble lines and take the column headings (Fidelity CSV format)
         _ = fp.readline()
         _ = fp.readline()
-        csv_reader = csv.reader(fp)
-        for row in csv_reader:
-            if not row:
-                break
-            rec = HistoryRecord(*row)  # type: ignore[arg-type]
-            records.append(rec)
-    return records
+        header = next(csv.reader([fp.readline()]), None)
+        convert = make_row_converter(header)
+        # Data ends at the first blank row; a disclaimer footer follows.
+        rows = takewhile(bool, csv.reader(fp))
+        yield from map(convert, rows)
+
+
+def _next_line(data: Buffer, pos: int, end: int | None = None) -> int:
+    """Return the offset of the line after the one at `pos`."""
+
+    end = len(data) if end is None else end
+    newline = data.find(b"\n", pos, end)
+    return end if newline < 0 else newline + 1
+
+
+def find_data_block(data: Buffer) -> tuple[list[str] | None, int, int]:
+    """Return the headings and the byte range `[start, end)` of the data rows.
+
+    `data` holds a whole history file, as `iter_history_values` reads it:
+    2 preamble lines, the headings (None if missing), then data rows up
+    to the first blank line or the end.  Only the headings are decoded;
+    the rest is found by searching the bytes for line ends.  As in the
+    Fidelity format, data rows must not have quoted line breaks.
+    """
+
+    pos = _next_line(data, _next_line(data, 0))
+    start = _next_line(data, pos)
+    header = next(csv.reader([bytes(data[pos:start]).decode("utf-8")]), None)
+
+    # A blank line is a line end followed by another, with or without CR.
+    end = len(data)
+    if start > 0:
+        for blank in (b"\n\n", b"\n\r\n"):
+            if (found := data.find(blank, start - 1)) >= 0:
+                end = min(end, found + 1)
+    return header, start, max(start, end)
+
+
+def split_data_block(data: Buffer, start: int, end: int, parts: int) -> list[tuple[int, int]]:
+    """Split `[start, end)` into up to `parts` ranges of whole lines, in order."""
+
+    bounds = [start]
+    for part in range(1, parts):
+        bound = _next_line(data, max(start + (end - start) * part // parts - 1, bounds[-1]), end)
+        if bound > bounds[-1] and bound < end:
+            bounds.append(bound)
+    bounds.append(end)
+    return list(pairwise(bounds))
+
+
+def iter_block_values(
+    data: Buffer, start: int, end: int, convert: Callable[[list[str]], RowValues]
+) -> Iterator[RowValues]:
+    """Yield the converted values of the rows in `data[start:end]`.
+
+    The range is decoded and parsed `BLOCK_BATCH_BYTES` (rounded up to a
+    whole line) at a time, not line by line.
+    """
+
+    pos = start
+    while pos < end:
+        stop = _next_line(data, min(pos + BLOCK_BATCH_BYTES, end) - 1, end)
+        text = data[pos:stop].decode("utf-8")
+        yield from map(convert, csv.reader(io.StringIO(text)))
+        pos = stop
+
+
+def iter_mapped_values(filename: str) -> Iterator[RowValues]:
+    """Yield the same values as `iter_history_values`, from a memory map.
+
+    Files that cannot be mapped (empty, or not regular files) are read
+    by `iter_history_values` instead.
+    """
+
+    with open(filename, "rb") as fp:
+        try:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            data = None
+        if data is None:
+            yield from iter_history_values(filename)
+            return
+        with data:
+            header, start, end = find_data_block(data)
+            yield from iter_block_values(data, start, end, make_row_converter(header))
+
+
+def iter_history_file(filename: str) -> Iterator[HistoryRecord]:
+    """Yield transaction records from a Fidelity history CSV file."""
+
+    return map(HistoryRecord.from_values, iter_history_values(filename))
+
+
+def iter_input_files(files: Iterable[str]) -> Iterator[HistoryRecord]:
+    """Yield transaction records from each of `files`, in order."""
+
+    for filename in files:
+        yield from iter_history_file(filename)
@@ -0,0 +1,139 @@
+"""Print long tables a chunk of rows at a time."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+
+from rich import get_console
+from rich.box import ROUNDED, Box
+from rich.console import Console
+from rich.text import Text
+
+__all__ = ["ChunkedTable"]
+
+
+class ChunkedTable:
+    """A bordered table printed as its rows arrive, `chunk_size` rows at a time.
+
+    `rich.table.Table` measures every cell before printing anything, so
+    a huge table prints nothing for a long time and holds all its cells.
+    Here the column widths are fixed up front; the title and heading are
+    printed at once, then every `chunk_size` rows, and the bottom border
+    by `close`.  Memory is one chunk, however many rows are added.  Rows
+    are formatted into strings with the escape codes for the console's
+    color system and written straight to its file, without going through
+    Rich's layout.
+
+    Cells wider than their column are truncated with an ellipsis.  The
+    methods match those of `Table` that the reports use, so either can
+    be filled by the same code.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        title: str,
+        columns: list[tuple[str, int, bool]],
+        chunk_size: int,
+        console: Console | None = None,
+        *,
+        box: Box = ROUNDED,
+        style: str = "",
+        header_style: str = "",
+        row_style: str = "",
+    ) -> None:
+        """Initialize table and print its title and heading.
+
+        Args:
+            title:          printed centered above the table.
+            columns:        `(heading, width, right_justify)` of each column;
+                            widths are widened to fit the headings.
+            chunk_size:     rows buffered between prints.
+            console:        where to print; default the global console.
+            box:            border characters.
+            style:          style of the title and borders.
+            header_style:   style of the headings.
+            row_style:      style of the cells.
+        """
+
+        self.console = console if console is not None else get_console()
+        self.chunk_size = max(chunk_size, 1)
+        self.widths = [max(width, len(heading)) for heading, width, _ in columns]
+        self._right = [right for _, _, right in columns]
+        self._lines: list[str] = []
+        self._section = False
+        self.row_count = 0
+
+        # Escape codes are made once, here; rows are plain string joins.
+        self._paint = self._painter(style)
+        self._row_paint = self._painter(style, row_style)
+        self._left = self._paint(box.head_left + " ")
+        self._middle = self._paint(" " + box.head_vertical + " ")
+        self._end = self._paint(" " + box.head_right)
+
+        padded = [width + 2 for width in self.widths]
+        self._separator = self._paint(box.get_row(padded, "row"))
+        self._bottom = self._paint(box.get_bottom(padded))
+        top = box.get_top(padded)
+        self._write(
+            [
+                self._paint(title.center(len(top)).rstrip()),
+                self._paint(top),
+                self._format(
+                    [heading for heading, _, _ in columns], self._painter(style, header_style)
+                ),
+                self._paint(box.get_row(padded, "head")),
+            ]
+        )
+
+    def _painter(self, *styles: str) -> Callable[[str], str]:
+        """Return a function that wraps text in the escape codes for `styles`."""
+
+        with self.console.capture() as capture:
+            self.console.print(Text("\0", style=" ".join(styles)), end="")
+        before, _, after = capture.get().partition("\0")
+        return lambda text: before + text + after
+
+    def _format(self, cells: Sequence[str], paint: Callable[[str], str]) -> str:
+        """Return a bordered line of `cells`, padded to the column widths."""
+
+        padded = []
+        for cell, width, right in zip(cells, self.widths, self._right, strict=True):
+            shown = cell if len(cell) <= width else cell[: width - 1] + "…"
+            padded.append(paint(shown.rjust(width) if right else shown.ljust(width)))
+        return self._left + self._middle.join(padded) + self._end
+
+    def _write(self, lines: list[str]) -> None:
+        """Write `lines` to the console's file, in one call."""
+
+        file = self.console.file
+        file.write("\n".join(lines) + "\n")
+        file.flush()
+
+    def add_row(self, *cells: str) -> None:
+        """Add a row; print the buffered rows once there are `chunk_size`."""
+
+        if self._section:
+            self._lines.append(self._separator)
+            self._section = False
+        self._lines.append(self._format(cells, self._row_paint))
+        self.row_count += 1
+        if len(self._lines) >= self.chunk_size:
+            self.flush()
+
+    def add_section(self) -> None:
+        """Draw a separator before the next row."""
+
+        self._section = bool(self.row_count)
+
+    def flush(self) -> None:
+        """Print the buffered rows."""
+
+        if self._lines:
+            self._write(self._lines)
+            self._lines = []
+
+    def close(self) -> None:
+        """Print the buffered rows and the bottom border."""
+
+        self._lines.append(self._bottom)
+        self.flush()
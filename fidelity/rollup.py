@@ -0,0 +1,175 @@
+"""Totals of records by calendar period, symbol and action."""
+
+from __future__ import annotations
+
+import json
+import struct
+from array import array
+from collections.abc import Collection, Iterable
+from time import localtime
+
+from fidelity.aggregate import FIXED_SCALE
+from fidelity.store import RecordStore
+
+__all__ = ["PERIODS", "ROLLUP_FIELDS", "Rollup", "period_of"]
+
+# `--by` choices, finest first.
+PERIODS = ("month", "quarter", "year")
+
+# Values of each row of a rollup report.
+ROLLUP_FIELDS = ("period", "symbol", "action", "count", "amount", "fees", "commission")
+
+# `(month, symbol, action)`, e.g. `("2024-01", "AAPL", "YOU BOUGHT ...")`.
+Key = tuple[str, str, str]
+
+# Length of the JSON header of `Rollup.to_bytes` output, and of its key codes.
+_PREFIX = struct.Struct("<QQ")
+
+
+def period_of(month: str, by: str) -> str:
+    """Return the `by` period of `month` (`YYYY-MM`): itself, `YYYY-Qn` or `YYYY`."""
+
+    if by == "month":
+        return month
+    if by == "quarter":
+        return f"{month[:4]}-Q{(int(month[5:]) + 2) // 3}"
+    if by == "year":
+        return month[:4]
+    raise ValueError(f"unknown period {by!r}")
+
+
+class Rollup:
+    """Row counts, and `amount`, `fees` and `commission` totals, by month, symbol and action.
+
+    Built in one pass over the records; quarters and years are merged
+    from the months when asked for, so one rollup answers every `--by`.
+    Money is summed in fixed point (see `aggregate.to_fixed`), so totals
+    are exact and survive `to_bytes` unchanged.
+
+    Attributes:
+        size:       number of records summed.
+        totals:     `Key` to `[count, amount, fees, commission]`.
+    """
+
+    def __init__(self, size: int = 0, totals: dict[Key, list[int]] | None = None) -> None:
+        """Initialize rollup of `size` records."""
+
+        self.size = size
+        self.totals = totals if totals is not None else {}
+
+    @classmethod
+    def from_store(cls, store: RecordStore, rows: Iterable[int] | None = None) -> Rollup:
+        """Return the rollup of `rows` (default: all) of `store`.
+
+        Rows are bucketed by month and by symbol and action codes, so
+        strings are looked up once per bucket, and months once per
+        distinct run date.
+        """
+
+        ints, strings = store.ints, store.strings
+        t_run_date = ints["t_run_date"]
+        symbols, actions = strings["symbol"], strings["action"]
+        symbol_codes, action_codes = symbols.codes, actions.codes
+        amount, fees = store.fixed("amount"), store.fixed("fees")
+        commission = store.fixed("commission")
+
+        months: dict[int, str] = {}
+        buckets: dict[tuple[str, int, int], list[int]] = {}
+        size = 0
+        for row in range(len(store)) if rows is None else rows:
+            size += 1
+            t = t_run_date[row]
+            if (month := months.get(t)) is None:
+                date = localtime(t)
+                month = months[t] = f"{date.tm_year:04d}-{date.tm_mon:02d}"
+            key = (month, symbol_codes[row], action_codes[row])
+            if (totals := buckets.get(key)) is None:
+                totals = buckets[key] = [0, 0, 0, 0]
+            totals[0] += 1
+            totals[1] += amount[row]
+            totals[2] += fees[row]
+            totals[3] += commission[row]
+
+        rollup = cls(size)
+        for (month, symbol, action), totals in buckets.items():
+            rollup.totals[month, symbols.values[symbol], actions.values[action]] = totals
+        return rollup
+
+    def select(
+        self, by: str, symbols: Collection[str] | None = None, exclude: Collection[str] = ()
+    ) -> list[tuple[str, str, str, int, float, float, float]]:
+        """Return the `ROLLUP_FIELDS` rows by `by` period, in period, symbol, action order.
+
+        Keeps `symbols` (default all) less `exclude`.
+        """
+
+        periods: dict[str, str] = {}
+        merged: dict[Key, list[int]] = {}
+        for (month, symbol, action), totals in self.totals.items():
+            if symbol in exclude or (symbols is not None and symbol not in symbols):
+                continue
+            if (period := periods.get(month)) is None:
+                period = periods[month] = period_of(month, by)
+            if (current := merged.get((period, symbol, action))) is None:
+                merged[period, symbol, action] = list(totals)
+            else:
+                for i, total in enumerate(totals):
+                    current[i] += total
+        return [
+            (
+                period,
+                symbol,
+                action,
+                count,
+                amount / FIXED_SCALE,
+                fees / FIXED_SCALE,
+                commission / FIXED_SCALE,
+            )
+            for (period, symbol, action), (count, amount, fees, commission) in sorted(
+                merged.items()
+            )
+        ]
+
+    def to_bytes(self) -> bytes:
+        """Return the rollup serialized; see `from_bytes`.
+
+        The distinct months, symbols and actions are written once, as JSON,
+        and the keys as codes into them, then the totals, as binary arrays.
+        """
+
+        lookups: tuple[dict[str, int], ...] = ({}, {}, {})
+        codes, values = array("I"), array("q")
+        for key, totals in self.totals.items():
+            codes.extend(
+                lookup.setdefault(part, len(lookup))
+                for lookup, part in zip(lookups, key, strict=True)
+            )
+            values.extend(totals)
+        header = json.dumps([self.size, *map(list, lookups)]).encode()
+        key_bytes = codes.tobytes()
+        return b"".join(
+            [_PREFIX.pack(len(header), len(key_bytes)), header, key_bytes, values.tobytes()]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Rollup:
+        """Return a rollup from `to_bytes` output."""
+
+        header_size, codes_size = _PREFIX.unpack_from(data)
+        offset = _PREFIX.size + header_size
+        size, months, symbols, actions = json.loads(data[_PREFIX.size : offset])
+        codes, values = array("I"), array("q")
+        codes.frombytes(data[offset : offset + codes_size])
+        values.frombytes(data[offset + codes_size :])
+        if len(values) != len(codes) // 3 * 4:
+            raise ValueError("truncated Rollup serialization")
+
+        keys = zip(
+            map(months.__getitem__, codes[0::3]),
+            map(symbols.__getitem__, codes[1::3]),
+            map(actions.__getitem__, codes[2::3]),
+            strict=True,
+        )
+        return cls(
+            size, dict(zip(keys, map(list, zip(*[iter(values)] * 4, strict=True)), strict=True))
+        )
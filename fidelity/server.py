@@ -0,0 +1,170 @@
+"""Answer report queries from records kept in memory, over a Unix socket.
+
+`fidelity --serve` reads the input files once, then polls them and
+reads them again (through the cache, so only changed files are parsed)
+whenever one is added, removed or changed.  Each `fidelity --client`
+connection sends one JSON line: the report options (see `QUERY_OPTIONS`)
+and the client's terminal width and color support.  The response is a
+JSON header line, then the reports exactly as the CLI would print them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import signal
+import threading
+from argparse import Namespace
+from collections.abc import Callable
+from contextlib import ExitStack, suppress
+from io import StringIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from rich.console import Console
+
+from fidelity.watch import POLL_SECONDS, Signatures, file_signatures
+from fidelity.writers import WRITERS
+
+if TYPE_CHECKING:
+    from fidelity.fidelity import Fidelity
+
+__all__ = ["ReportServer"]
+
+logger = logging.getLogger(__name__)
+
+
+class ReportServer:
+    """Serve reports on the records of `list_files()` at socket `path`.
+
+    `load(files)` reads `files` into a new `Fidelity`; it runs in a worker
+    thread, and queries are answered from the previous records until it
+    is done.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        list_files: Callable[[], list[str]],
+        load: Callable[[list[str]], Fidelity],
+        interval: float = POLL_SECONDS,
+    ) -> None:
+        """Initialize server; nothing is read until it runs."""
+
+        self.path = Path(path).expanduser()
+        self.list_files = list_files
+        self.load = load
+        self.interval = interval
+        self.fidelity: Fidelity | None = None
+        self.ready = threading.Event()
+        self._signatures: Signatures | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+
+    def refresh(self) -> bool:
+        """Read the input files again if any changed; return True if they did."""
+
+        files = self.list_files()
+        signatures = file_signatures(files)
+        if signatures == self._signatures:
+            return False
+        fidelity = self.load(files)
+        _ = fidelity.index  # sort here, in the loading thread, not in a query
+        self.fidelity, self._signatures = fidelity, signatures
+        logger.info("Serving %d records from %d files", len(fidelity.records), len(files))
+        return True
+
+    def answer(self, request: dict[str, Any]) -> tuple[dict[str, Any], str]:
+        """Return the response header, and the reports asked for by `request`.
+
+        The reports are exactly what the CLI would print with the same options.
+        """
+
+        if (fidelity := self.fidelity) is None:
+            raise RuntimeError("input files not read yet")
+        options = Namespace(**request["options"])
+        fidelity.options = options
+        output = StringIO()
+        with ExitStack() as stack:
+            if options.format == "table":
+                fidelity.console = Console(
+                    file=output,
+                    width=request.get("width", 80),
+                    force_terminal=request.get("color", False),
+                )
+                fidelity.writer = None
+            else:
+                fidelity.console = None
+                fidelity.writer = stack.enter_context(WRITERS[options.format](output))
+            fidelity.print_reports(
+                options.last,
+                options.top,
+                options.by_account,
+                options.lot_method if options.gains else None,
+                options.by,
+            )
+        return {"records": len(fidelity.records)}, output.getvalue()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer one query."""
+
+        try:
+            header, body = self.answer(json.loads(await reader.readline()))
+        except Exception as err:
+            logger.exception("Query failed")
+            header, body = {"error": str(err) or type(err).__name__}, ""
+        writer.write(json.dumps(header).encode() + b"\n" + body.encode())
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def _poll(self) -> None:
+        """Refresh the records every `interval` seconds."""
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("Reading input files failed")
+
+    async def serve_forever(self) -> None:
+        """Read the input files, then answer queries until `stop` is called.
+
+        In the main thread, SIGTERM stops it too, so the socket is removed.
+        """
+
+        self.refresh()
+        self._loop = loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        handle_signal = threading.current_thread() is threading.main_thread()
+        if handle_signal:
+            loop.add_signal_handler(signal.SIGTERM, self._stop.set)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        poll = asyncio.create_task(self._poll())
+        logger.info("Listening on %s", self.path)
+        self.ready.set()
+        try:
+            async with server:
+                await self._stop.wait()
+        finally:
+            poll.cancel()
+            if handle_signal:
+                loop.remove_signal_handler(signal.SIGTERM)
+            self._loop = self._stop = None
+            self.path.unlink(missing_ok=True)
+
+    def stop(self) -> None:
+        """Make `serve_forever` return; may be called from any thread."""
+
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def run(self) -> None:
+        """Serve until interrupted."""
+
+        with suppress(KeyboardInterrupt):
+            asyncio.run(self.serve_forever())
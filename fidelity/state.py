@@ -0,0 +1,115 @@
+"""Persistent, incrementally updated store of ingested history."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from fidelity.dedup import RowDeduplicator
+from fidelity.store import RecordStore, RowValues
+
+__all__ = ["StateStore"]
+
+logger = logging.getLogger(__name__)
+
+# File format: magic, then length-prefixed parts (see `StateStore.save`).
+_MAGIC = b"FST1"
+_PREFIX = struct.Struct("<Q")
+
+
+class StateStore:
+    """Deduplicated history plus running per-symbol position totals.
+
+    `ingest` appends only rows not seen before (by `row_key`) and adds
+    them to `positions`, so a monthly download that overlaps the last one
+    by a few weeks costs only its new rows; nothing is recomputed over
+    the full history.
+
+    Attributes:
+        records:    every ingested row, in ingestion order.
+        positions:  symbol to `[quantity, amount]` totals over `records`.
+        dedup:      counts of ingested row keys.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty state."""
+
+        self.records = RecordStore()
+        self.positions: dict[str, list[float]] = {}
+        self.dedup = RowDeduplicator()
+
+    def ingest(self, rows: Iterable[RowValues], scope: str = "") -> tuple[int, int]:
+        """Merge the rows of one source; return `(added, duplicates)`.
+
+        Rows duplicate only rows ingested with the same `scope` (account).
+        """
+
+        size = len(self.records)
+        self.records.extend_values(self._tally(self.dedup.new_rows(rows, scope)))
+        return len(self.records) - size, self.dedup.dropped
+
+    def _tally(self, rows: Iterable[RowValues]) -> Iterator[RowValues]:
+        """Add each of `rows` to `positions` as it passes through."""
+
+        positions = self.positions
+        for values in rows:
+            totals = positions.setdefault(values[2], [0.0, 0.0])  # symbol
+            totals[0] += values[5]  # quantity
+            totals[1] += values[10]  # amount
+            yield values
+
+    @classmethod
+    def load(cls, path: str | Path) -> StateStore:
+        """Return the state saved in `path`, or an empty state if none."""
+
+        state = cls()
+        try:
+            data = Path(path).expanduser().read_bytes()
+        except FileNotFoundError:
+            return state
+
+        view = memoryview(data)
+        if bytes(view[:4]) != _MAGIC:
+            raise ValueError(f"{path}: not a fidelity state file")
+        parts = []
+        offset = len(_MAGIC)
+        while offset < len(view):
+            (size,) = _PREFIX.unpack_from(view, offset)
+            offset += _PREFIX.size
+            parts.append(view[offset : offset + size])
+            offset += size
+
+        records, keys, counts, positions = parts
+        state.records = RecordStore.from_bytes(bytes(records))
+        key_array, count_array = array("Q"), array("I")
+        key_array.frombytes(keys)
+        count_array.frombytes(counts)
+        state.dedup.seen = dict(zip(key_array, count_array, strict=True))
+        state.positions = json.loads(bytes(positions))
+        logger.debug("Loaded %d records from %r", len(state.records), str(path))
+        return state
+
+    def save(self, path: str | Path) -> None:
+        """Write the state to `path`, atomically."""
+
+        seen = self.dedup.seen
+        parts = [
+            self.records.to_bytes(),
+            array("Q", seen.keys()).tobytes(),
+            array("I", seen.values()).tobytes(),
+            json.dumps(self.positions).encode(),
+        ]
+        data = [_MAGIC]
+        for part in parts:
+            data += [_PREFIX.pack(len(part)), part]
+
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(b"".join(data))
+        tmp.replace(path)
@@ -0,0 +1,397 @@
+"""Columnar storage for Fidelity transaction history records."""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
+
+from fidelity.aggregate import to_fixed
+
+if TYPE_CHECKING:
+    from fidelity.reader import HistoryRecord
+
+__all__ = ["RecordStore", "RecordView", "RowValues"]
+
+# One record's converted values, in `HistoryRecord` field order.
+RowValues = tuple[
+    str, str, str, str, str, float, float, float, float, float, float, float, str, int, int
+]
+
+
+class StringColumn:
+    """Dictionary-encoded column of strings.
+
+    Each distinct value is stored once in `values`; rows hold an index
+    into it.  Fidelity exports repeat the same few hundred dates, actions
+    and symbols across every row, so this is much smaller than a list of
+    `str` objects.
+    """
+
+    __slots__ = ("codes", "lookup", "values")
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+
+        self.values: list[str] = []
+        self.lookup: dict[str, int] = {}
+        self.codes = array("I")
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> str:
+        return self.values[self.codes[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.values.__getitem__, self.codes)
+
+    def encode(self, value: str) -> int:
+        """Return the code for `value`, adding it to the dictionary if new."""
+
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        """Append `value` to the column."""
+
+        self.codes.append(self.encode(value))
+
+    def extend_values(self, values: Iterable[str]) -> None:
+        """Append each of `values` to the column."""
+
+        lookup = self.lookup
+        encode = self.encode
+        self.codes.extend([lookup[v] if v in lookup else encode(v) for v in values])
+
+    def extend(self, other: StringColumn) -> None:
+        """Append all rows of `other`, re-encoding into this dictionary."""
+
+        remap = [self.encode(value) for value in other.values]
+        self.codes.extend(remap[code] for code in other.codes)
+
+
+# Column names, in `HistoryRecord` field order.
+STRING_COLUMNS = (
+    "run_date",
+    "action",
+    "symbol",
+    "description",
+    "type",
+    "settlement_date",
+)
+FLOAT_COLUMNS = (
+    "quantity",
+    "price",
+    "commission",
+    "fees",
+    "accrued_interest",
+    "amount",
+    "cash_balance",
+)
+INT_COLUMNS = (
+    "t_run_date",
+    "t_settlement_date",
+)
+
+# Rows buffered per column-wise flush by `RecordStore.extend_values`.
+BATCH_SIZE = 4096
+
+# `RecordStore.to_bytes` format: magic, byte order, then length-prefixed parts.
+_MAGIC = b"FRS1"
+_PREFIX = struct.Struct("<Q")
+
+# All columns, in `HistoryRecord` field order (matches `RowValues`).
+ALL_COLUMNS = STRING_COLUMNS[:5] + FLOAT_COLUMNS + STRING_COLUMNS[5:] + INT_COLUMNS
+_get_values = attrgetter(*ALL_COLUMNS)
+
+
+class RecordStore:
+    """Array-backed, column-oriented container of history records.
+
+    Numeric fields are kept in typed `array` objects (`float64` for money
+    and quantities, `int64` for timestamps) and string fields are
+    dictionary-encoded.  Indexing and iteration return `RecordView`
+    objects that expose the same attributes as `HistoryRecord`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+
+        self.strings = {name: StringColumn() for name in STRING_COLUMNS}
+        self.floats = {name: array("d") for name in FLOAT_COLUMNS}
+        self.ints = {name: array("q") for name in INT_COLUMNS}
+        self._fixed: dict[str, array[int]] = {}
+        self._bind_appenders()
+
+    def _columns(self) -> list[Any]:
+        """Return every column, in `ALL_COLUMNS` order."""
+
+        columns: dict[str, Any] = {**self.strings, **self.floats, **self.ints}
+        return [columns[name] for name in ALL_COLUMNS]
+
+    def _bind_appenders(self) -> None:
+        """Cache each column's `append`, in `ALL_COLUMNS` order."""
+
+        self._appenders: list[Callable[[Any], None]] = [
+            column.append for column in self._columns()
+        ]
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_appenders"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._bind_appenders()
+
+    def _arrays(self) -> list[array[Any]]:
+        """Return every underlying array: string codes, floats, then ints."""
+
+        arrays: list[array[Any]] = [self.strings[name].codes for name in STRING_COLUMNS]
+        arrays += self.floats.values()
+        arrays += self.ints.values()
+        return arrays
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact binary form; see `from_bytes`.
+
+        The string dictionaries are stored once as JSON, followed by the
+        raw machine bytes of every array (codes, floats, ints).
+        """
+
+        dictionaries = json.dumps([self.strings[name].values for name in STRING_COLUMNS])
+        parts = [_MAGIC, sys.byteorder[0].encode()]
+        for part in [dictionaries.encode(), *(x.tobytes() for x in self._arrays())]:
+            parts += [_PREFIX.pack(len(part)), part]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> RecordStore:
+        """Return a store deserialized from `to_bytes` output.
+
+        Raises `ValueError` if `data` is not in this format, or was written
+        on a machine with a different byte order.
+        """
+
+        view = memoryview(data)
+        if bytes(view[:4]) != _MAGIC or bytes(view[4:5]) != sys.byteorder[0].encode():
+            raise ValueError("not a RecordStore serialization")
+
+        parts = []
+        offset = 5
+        while offset < len(view):
+            (size,) = _PREFIX.unpack_from(view, offset)
+            offset += _PREFIX.size
+            parts.append(view[offset : offset + size])
+            offset += size
+
+        store = cls()
+        arrays = store._arrays()
+        if len(parts) != len(arrays) + 1:
+            raise ValueError("truncated RecordStore serialization")
+
+        for name, values in zip(STRING_COLUMNS, json.loads(bytes(parts[0])), strict=True):
+            column = store.strings[name]
+            column.values = values
+            column.lookup = {value: code for code, value in enumerate(values)}
+        for data_array, part in zip(arrays, parts[1:], strict=True):
+            data_array.frombytes(part)
+        return store
+
+    @classmethod
+    def from_records(cls, records: Iterable[HistoryRecord | RecordView]) -> RecordStore:
+        """Return a new store holding `records`."""
+
+        store = cls()
+        for rec in records:
+            store.append(rec)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.ints["t_run_date"])
+
+    def fixed(self, name: str) -> array[int]:
+        """Return float column `name` in fixed point; see `aggregate.to_fixed`.
+
+        Converted on first use, and only the rows appended since on later
+        uses.
+        """
+
+        column = self.floats[name]
+        fixed = self._fixed.setdefault(name, array("q"))
+        if len(fixed) < len(column):
+            fixed.extend(to_fixed(column[len(fixed) :]))
+        return fixed
+
+    def __getitem__(self, index: int) -> RecordView:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("record index out of range")
+        return RecordView(self, index)
+
+    def __iter__(self) -> Iterator[RecordView]:
+        for index in range(len(self)):
+            yield RecordView(self, index)
+
+    def iter_values(self) -> Iterator[RowValues]:
+        """Yield each record as a `RowValues` tuple."""
+
+        return zip(*self._columns(), strict=True)
+
+    def append(self, rec: HistoryRecord | RecordView) -> None:
+        """Append a single record."""
+
+        self.append_values(_get_values(rec))
+
+    def append_values(self, values: RowValues) -> None:
+        """Append a single record given as a `RowValues` tuple."""
+
+        for append, value in zip(self._appenders, values, strict=True):
+            append(value)
+
+    def extend_values(self, rows: Iterable[RowValues]) -> None:
+        """Append many records given as `RowValues` tuples.
+
+        Rows are transposed in batches of `BATCH_SIZE` and each column is
+        extended in one call, which is much cheaper than appending every
+        cell of every row.
+        """
+
+        columns = self._columns()
+        rows = iter(rows)
+        while batch := list(islice(rows, BATCH_SIZE)):
+            for column, values in zip(columns, zip(*batch, strict=True), strict=True):
+                if isinstance(column, StringColumn):
+                    column.extend_values(values)
+                else:
+                    column.extend(values)
+
+    def extend(self, records: RecordStore | Iterable[HistoryRecord | RecordView]) -> None:
+        """Append many records; another `RecordStore` is copied column-wise."""
+
+        if not isinstance(records, RecordStore):
+            for rec in records:
+                self.append(rec)
+            return
+
+        for name, column in self.strings.items():
+            column.extend(records.strings[name])
+        for name, values in self.floats.items():
+            values.extend(records.floats[name])
+        for name, ints in self.ints.items():
+            ints.extend(records.ints[name])
+
+
+class RecordView:
+    """Read-only, per-row view into a `RecordStore`.
+
+    Has the same attributes as `HistoryRecord`, so code written against
+    records keeps working, but holds only a store reference and a row
+    number.
+    """
+
+    __slots__ = ("_index", "_store")
+
+    def __init__(self, store: RecordStore, index: int) -> None:
+        """Initialize view of row `index` in `store`."""
+
+        self._store = store
+        self._index = index
+
+    def __repr__(self) -> str:
+        return (
+            f"RecordView({self._index}, run_date={self.run_date!r}, "
+            f"action={self.action!r}, symbol={self.symbol!r}, amount={self.amount!r})"
+        )
+
+    @property
+    def index(self) -> int:
+        """Row number within the store."""
+        return self._index
+
+    @property
+    def run_date(self) -> str:
+        """Run date, `MM/DD/YYYY`."""
+        return self._store.strings["run_date"][self._index]
+
+    @property
+    def action(self) -> str:
+        """Transaction action."""
+        return self._store.strings["action"][self._index]
+
+    @property
+    def symbol(self) -> str:
+        """Ticker symbol."""
+        return self._store.strings["symbol"][self._index]
+
+    @property
+    def description(self) -> str:
+        """Security description."""
+        return self._store.strings["description"][self._index]
+
+    @property
+    def type(self) -> str:
+        """Account type."""
+        return self._store.strings["type"][self._index]
+
+    @property
+    def quantity(self) -> float:
+        """Number of shares."""
+        return self._store.floats["quantity"][self._index]
+
+    @property
+    def price(self) -> float:
+        """Price per share."""
+        return self._store.floats["price"][self._index]
+
+    @property
+    def commission(self) -> float:
+        """Commission charged."""
+        return self._store.floats["commission"][self._index]
+
+    @property
+    def fees(self) -> float:
+        """Fees charged."""
+        return self._store.floats["fees"][self._index]
+
+    @property
+    def accrued_interest(self) -> float:
+        """Accrued interest."""
+        return self._store.floats["accrued_interest"][self._index]
+
+    @property
+    def amount(self) -> float:
+        """Transaction amount."""
+        return self._store.floats["amount"][self._index]
+
+    @property
+    def cash_balance(self) -> float:
+        """Cash balance after the transaction."""
+        return self._store.floats["cash_balance"][self._index]
+
+    @property
+    def settlement_date(self) -> str:
+        """Settlement date, `MM/DD/YYYY`."""
+        return self._store.strings["settlement_date"][self._index]
+
+    @property
+    def t_run_date(self) -> int:
+        """Run date as unix time."""
+        return self._store.ints["t_run_date"][self._index]
+
+    @property
+    def t_settlement_date(self) -> int:
+        """Settlement date as unix time."""
+        return self._store.ints["t_settlement_date"][self._index]
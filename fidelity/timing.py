@@ -0,0 +1,119 @@
+"""Wall time, throughput and peak memory of the phases of a run."""
+
+from __future__ import annotations
+
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+__all__ = ["Phase", "PhaseTimer"]
+
+
+class Phase:
+    """Measurements of one phase; the timed code may set `rows`."""
+
+    __slots__ = ("depth", "name", "peak", "rows", "seconds")
+
+    def __init__(self, name: str, depth: int = 0) -> None:
+        """Initialize phase `name`, nested `depth` phases deep."""
+
+        self.name = name
+        self.depth = depth
+        self.rows = 0
+        self.seconds = 0.0
+        self.peak = 0
+
+    @property
+    def rate(self) -> float:
+        """Rows per second."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class PhaseTimer:
+    """Time named, possibly nested, phases of a run.
+
+    With `memory`, allocations are traced with `tracemalloc` and each
+    phase records the peak traced memory while it ran; tracing slows
+    everything down, so wall times are then only comparable with each
+    other.  A disabled timer measures nothing and costs next to nothing.
+    """
+
+    def __init__(self, enabled: bool = True, memory: bool = True) -> None:
+        """Initialize timer."""
+
+        self.enabled = enabled
+        self.memory = enabled and memory
+        self.phases: list[Phase] = []
+        self._stack: list[Phase] = []
+        self._tracing = False  # tracemalloc started by this timer
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Phase]:
+        """Measure the body of the `with` statement as phase `name`."""
+
+        phase = Phase(name, len(self._stack))
+        if not self.enabled:
+            yield phase
+            return
+
+        self.phases.append(phase)
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+            self._note_peak()
+            tracemalloc.reset_peak()
+        self._stack.append(phase)
+        start = perf_counter()
+        try:
+            yield phase
+        finally:
+            phase.seconds = perf_counter() - start
+            if self.memory:
+                self._note_peak()
+            self._stack.pop()
+
+    def _note_peak(self) -> None:
+        """Raise the peak of every running phase to the traced peak so far."""
+
+        _, peak = tracemalloc.get_traced_memory()
+        for phase in self._stack:
+            phase.peak = max(phase.peak, peak)
+
+    def stop(self) -> None:
+        """Stop tracing memory, if this timer started it."""
+
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def print(self, console: Console | None = None) -> None:
+        """Print a table of the phases, in the order they started, to stderr."""
+
+        from rich.box import ROUNDED
+        from rich.console import Console
+        from rich.table import Column, Table
+
+        table = Table(
+            Column("Phase"),
+            Column("Seconds", justify="right"),
+            Column("Rows", justify="right"),
+            Column("Rows/s", justify="right"),
+            Column("Peak MiB", justify="right"),
+            title="Timings",
+            box=ROUNDED,
+        )
+        for phase in self.phases:
+            table.add_row(
+                "  " * phase.depth + phase.name,
+                f"{phase.seconds:.3f}",
+                f"{phase.rows:,}" if phase.rows else "",
+                f"{phase.rate:,.0f}" if phase.rows else "",
+                f"{phase.peak / 2**20:,.1f}" if self.memory else "",
+            )
+        (console or Console(stderr=True)).print(table)
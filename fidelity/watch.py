@@ -0,0 +1,100 @@
+"""Poll input files for changes, waiting for them to settle."""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable
+from contextlib import suppress
+from typing import NamedTuple
+
+__all__ = ["Changes", "FileWatcher", "file_signatures"]
+
+# Seconds between checks of the input files.
+POLL_SECONDS = 2.0
+
+# Seconds a change must stay unchanged before it is reported, so a file
+# still being downloaded is not read half-written.
+DEBOUNCE_SECONDS = 1.0
+
+# `(st_mtime_ns, st_size)` of each file that exists.
+Signatures = dict[str, tuple[int, int]]
+
+
+def file_signatures(files: list[str]) -> Signatures:
+    """Return the modification time and size of each of `files`."""
+
+    signatures = {}
+    for filename in files:
+        with suppress(OSError):
+            stat = os.stat(filename)
+            signatures[filename] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+
+class Changes(NamedTuple):
+    """Input files added, changed and removed since the last check."""
+
+    added: list[str]
+    changed: list[str]
+    removed: list[str]
+
+
+class FileWatcher:
+    """Report changes to the files listed by `list_files()`.
+
+    Files are compared by modification time and size every `interval`
+    seconds; inotify is Linux-only and misses network filesystems, while
+    a `stat` per input file is cheap.  A change is reported once the
+    files have stayed as they are for `debounce` seconds.
+    """
+
+    def __init__(
+        self,
+        list_files: Callable[[], list[str]],
+        interval: float = POLL_SECONDS,
+        debounce: float = DEBOUNCE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize watcher; the files as they are now are not a change."""
+
+        self.list_files = list_files
+        self.interval = interval
+        self.debounce = debounce
+        self.clock = clock
+        self.sleep = sleep
+        self.signatures = file_signatures(list_files())
+        self._pending: Signatures | None = None
+        self._pending_since = 0.0
+
+    def poll(self) -> Changes | None:
+        """Check the files once; return their changes if they have settled."""
+
+        signatures = file_signatures(self.list_files())
+        if signatures == self.signatures:
+            self._pending = None
+            return None
+
+        now = self.clock()
+        if signatures != self._pending:
+            self._pending, self._pending_since = signatures, now
+            return None
+        if now - self._pending_since < self.debounce:
+            return None
+
+        old, self.signatures, self._pending = self.signatures, signatures, None
+        return Changes(
+            added=[name for name in signatures if name not in old],
+            changed=[
+                name for name in signatures if name in old and signatures[name] != old[name]
+            ],
+            removed=[name for name in old if name not in signatures],
+        )
+
+    def wait(self) -> Changes:
+        """Return the next settled changes, polling every `interval` seconds."""
+
+        while (changes := self.poll()) is None:
+            self.sleep(self.interval)
+        return changes
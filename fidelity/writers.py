@@ -0,0 +1,133 @@
+"""Machine-readable report output."""
+
+from __future__ import annotations
+
+import csv
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from types import TracebackType
+from typing import IO, Any
+
+__all__ = ["WRITERS", "CsvWriter", "JsonlWriter", "ReportWriter"]
+
+# Number of rows collected before they are written out in one call.
+CHUNK_ROWS = 4096
+
+
+class ReportWriter(ABC):
+    """Write report rows, as plain values, to a text file.
+
+    Rows are formatted into a list and written to `file` with a single
+    `write` call every `chunk_rows` rows, so even a line-buffered stdout
+    sees a few large writes.  Use as a context manager, or call `flush`
+    when done.
+    """
+
+    def __init__(self, file: IO[str], chunk_rows: int = CHUNK_ROWS) -> None:
+        """Initialize writer to `file`."""
+
+        self.file = file
+        self.chunk_rows = chunk_rows
+        self._parts: list[str] = []
+
+    def __enter__(self) -> ReportWriter:
+        """Return this writer."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write any buffered rows."""
+        self.flush()
+
+    def write(self, text: str) -> None:
+        """Buffer `text`; write the buffer out once it is `chunk_rows` long."""
+
+        self._parts.append(text)
+        if len(self._parts) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out the buffered text."""
+
+        if self._parts:
+            self.file.write("".join(self._parts))
+            self._parts = []
+        self.file.flush()
+
+    @abstractmethod
+    def write_report(
+        self, name: str, fields: Sequence[str], rows: Iterable[Sequence[Any]]
+    ) -> int:
+        """Write the `rows` of report `name`; return how many.
+
+        Each row has values for `fields`.
+        """
+
+
+class CsvWriter(ReportWriter):
+    """Write each report as a block of CSV: a heading line, then its rows.
+
+    The first column names the report; a blank line separates reports.
+    """
+
+    def __init__(self, file: IO[str], chunk_rows: int = CHUNK_ROWS) -> None:
+        """Initialize writer to `file`."""
+
+        super().__init__(file, chunk_rows)
+        self._csv = csv.writer(self, lineterminator="\n")
+        self._reports = 0
+
+    def write_report(
+        self, name: str, fields: Sequence[str], rows: Iterable[Sequence[Any]]
+    ) -> int:
+        """Write the `rows` of report `name`; return how many.
+
+        Each row has values for `fields`.
+        """
+
+        if self._reports:
+            self.write("\n")
+        self._reports += 1
+        self._csv.writerow(["report", *fields])
+        writerow = self._csv.writerow
+        count = 0
+        for row in rows:
+            writerow((name, *row))
+            count += 1
+        return count
+
+
+class JsonlWriter(ReportWriter):
+    """Write every row as a JSON object on a line of its own.
+
+    Each object has a `report` key naming its report, then `fields`.
+    """
+
+    def write_report(
+        self, name: str, fields: Sequence[str], rows: Iterable[Sequence[Any]]
+    ) -> int:
+        """Write the `rows` of report `name`; return how many.
+
+        Each row has values for `fields`.
+        """
+
+        keys = ["report", *fields]
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        write = self.write
+        count = 0
+        for row in rows:
+            write(dumps(dict(zip(keys, (name, *row), strict=True))) + "\n")
+            count += 1
+        return count
+
+
+# `--format` choices, other than `table`.
+WRITERS: dict[str, type[ReportWriter]] = {
+    "csv": CsvWriter,
+    "jsonl": JsonlWriter,
+}
@@ -0,0 +1,69 @@
+"""Shared test fixtures."""
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Protocol
+
+import pytest
+
+# Fidelity CSV header (split for line length)
+CSV_HEADER = (
+    "Run Date,Action,Symbol,Description,Type,Quantity,Price,"
+    "Commission,Fees,Accrued Interest,Amount,Cash Balance,Settlement Date"
+)
+
+# A small history: buys, a sale and a money market dividend.
+HISTORY = [
+    "01/15/2024, BUY, AAPL, APPLE INC,Cash,10,150.00,0,0.02,0,-1500.02,8499.98,01/17/2024",
+    "01/16/2024, SELL, MSFT, MICROSOFT,Cash,5,400.00,0,0.01,0,1999.99,10499.97,01/18/2024",
+    "02/01/2024, DIVIDEND, SPAXX, MONEY MARKET,Cash,,,,,,12.34,10512.31,",
+    "03/05/2024, BUY, AAPL, APPLE INC,Cash,2,170.00,0,0,0,-340.00,10172.31,03/07/2024",
+]
+
+
+def history_text(rows: Iterable[str], account: str = "X12345678") -> str:
+    """Return the contents of a history file holding CSV `rows`."""
+    return f"Brokerage Account\nAccount: {account}\n{CSV_HEADER}\n" + "".join(
+        f"{row}\n" for row in rows
+    )
+
+
+class HistoryWriter(Protocol):
+    """Signature of the `write_history` fixture."""
+
+    def __call__(
+        self, rows: Iterable[str], name: str = "history.csv", account: str = "X12345678"
+    ) -> Path: ...
+
+
+@pytest.fixture
+def write_history(tmp_path: Path) -> HistoryWriter:
+    """Return a function that writes history file `name`, of CSV `rows`, in `tmp_path`."""
+
+    def write(
+        rows: Iterable[str], name: str = "history.csv", account: str = "X12345678"
+    ) -> Path:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(history_text(rows, account), encoding="utf-8")
+        return path
+
+    return write
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Give each test a `HOME` of its own, so caches and state stay out of the real one.
+
+    Its `~/.fidelity.toml` points `datafiles` at a copy of `HISTORY`, for `--use-datafiles`.
+    """
+
+    home = tmp_path_factory.mktemp("home")
+    data = home / "data"
+    data.mkdir()
+    (data / "history.csv").write_text(
+        history_text(HISTORY) + '\n"footer text"\n', encoding="utf-8"
+    )
+    (home / ".fidelity.toml").write_text(f'datafiles = "{data}/*.csv"\n', encoding="utf-8")
+    monkeypatch.setenv("HOME", str(home))
+    return home
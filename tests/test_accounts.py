@@ -0,0 +1,35 @@
+"""Tests for the accounts module."""
+
+from pathlib import Path
+
+from fidelity.accounts import DEFAULT_ACCOUNT, account_for, partition_files
+
+
+def test_account_from_file_name() -> None:
+    assert account_for("History_for_Account_Z12345678.csv") == "Z12345678"
+    assert account_for("/tmp/123456789-2024.csv") == "123456789"
+    assert account_for("Accounts_History.csv") == DEFAULT_ACCOUNT
+    assert account_for("History_1234567890.csv") == DEFAULT_ACCOUNT
+    assert account_for("history_20240131.csv") == DEFAULT_ACCOUNT
+    assert account_for("Z20240131_2024.csv") == "Z20240131"
+
+
+def test_account_from_config() -> None:
+    accounts: dict[str, str | list[str]] = {
+        "ira": "*Z12345678*",
+        "joint": ["~/joint/*.csv", "/data/j-*.csv"],
+    }
+    assert account_for("History_for_Account_Z12345678.csv", accounts) == "ira"
+    assert account_for(str(Path.home() / "joint/2024.csv"), accounts) == "joint"
+    assert account_for("~/joint/2024.csv", accounts) == "joint"
+    assert account_for("/data/j-2024.csv", accounts) == "joint"
+    assert account_for("History_for_Account_X00000001.csv", accounts) == "X00000001"
+
+
+def test_partition_files_keeps_order() -> None:
+    files = ["b-X00000002.csv", "a-X00000001.csv", "c-X00000002.csv", "misc.csv"]
+    assert partition_files(files) == {
+        "X00000002": ["b-X00000002.csv", "c-X00000002.csv"],
+        "X00000001": ["a-X00000001.csv"],
+        DEFAULT_ACCOUNT: ["misc.csv"],
+    }
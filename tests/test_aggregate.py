@@ -0,0 +1,83 @@
+"""Tests for column sums."""
+
+from __future__ import annotations
+
+import random
+from array import array
+from decimal import Decimal
+
+import pytest
+
+from fidelity.aggregate import (
+    FIXED_SCALE,
+    numpy_fixed_group_sums,
+    numpy_fixed_running_sums,
+    numpy_group_sums,
+    numpy_running_sums,
+    numpy_to_fixed,
+    python_fixed_group_sums,
+    python_fixed_running_sums,
+    python_group_sums,
+    python_running_sums,
+    python_to_fixed,
+)
+
+
+def make_column(size: int) -> array[float]:
+    """Return `size` amounts, with cancellations and negative zeros."""
+    rng = random.Random(size)
+    column = array("d", (round(rng.uniform(-1e4, 1e4), 2) for _ in range(size)))
+    for row in range(0, size, 7):
+        column[row] = -0.0
+    for row in range(1, size, 11):
+        column[row] = -column[row - 1]
+    return column
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 1000])
+def test_running_sums_identical(size: int) -> None:
+    column = make_column(size)
+    rows = array("q", random.Random(1).sample(range(size), size))
+    expected = list(python_running_sums(column, rows))
+    assert numpy_running_sums(column, rows) == expected
+    assert [str(x) for x in numpy_running_sums(column, rows)] == [str(x) for x in expected]
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 1000])
+def test_group_sums_identical(size: int) -> None:
+    column = make_column(size)
+    rows = random.Random(2).sample(range(size), size)
+    groups = [array("q", rows[i : i + 37]) for i in range(0, size, 37)]
+    expected = python_group_sums(column, groups)
+    assert numpy_group_sums(column, groups) == expected
+    assert [str(x) for x in numpy_group_sums(column, groups)] == [str(x) for x in expected]
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 1000])
+def test_to_fixed_is_exact(size: int) -> None:
+    rng = random.Random(size)
+    texts = [f"{rng.uniform(-1e9, 1e9):.{rng.randint(0, 6)}f}" for _ in range(size)]
+    column = array("d", map(float, texts))
+    expected = [int(Decimal(text) * FIXED_SCALE) for text in texts]
+    assert list(python_to_fixed(column)) == expected
+    assert list(numpy_to_fixed(column)) == expected
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 1000])
+def test_fixed_sums_identical(size: int) -> None:
+    column = python_to_fixed(make_column(size))
+    rows = array("q", random.Random(3).sample(range(size), size))
+    expected = list(python_fixed_running_sums(column, rows))
+    assert numpy_fixed_running_sums(column, rows) == expected
+
+    groups = [array("q"), *(array("q", rows[i : i + 37]) for i in range(0, size, 37))]
+    expected = python_fixed_group_sums(column, groups)
+    assert numpy_fixed_group_sums(column, groups) == expected
+    assert numpy_fixed_group_sums(column, []) == []
+
+
+def test_fixed_sums_do_not_drift() -> None:
+    column = array("d", [0.1] * 10)
+    rows = array("q", range(10))
+    assert list(python_running_sums(column, rows))[-1] != 1.0
+    assert numpy_fixed_running_sums(python_to_fixed(column), rows)[-1] == FIXED_SCALE
@@ -0,0 +1,176 @@
+"""Tests for the cache module."""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from fidelity.cache import FileCache
+from fidelity.reader import read_history_file
+from fidelity.rollup import Rollup
+from fidelity.store import RecordStore
+from tests.conftest import HistoryWriter, history_text
+
+ROWS = [
+    "01/15/2024, BUY, AAPL, APPLE INC,Cash,10,150.00,0,0.02,0,-1500.02,8499.98,01/17/2024",
+    "01/16/2024, SELL, MSFT, MICROSOFT,Cash,5,400.00,0,0.01,0,1999.99,10499.97,01/18/2024",
+]
+
+CSV_CONTENT = history_text(ROWS)
+
+
+@pytest.fixture
+def csv_file(write_history: HistoryWriter) -> Path:
+    return write_history(ROWS)
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> FileCache:
+    return FileCache(tmp_path / "cache")
+
+
+def records_of(store: RecordStore) -> list[tuple[str, str, float, int]]:
+    return [(r.symbol, r.action, r.amount, r.t_settlement_date) for r in store]
+
+
+class TestRecordStoreBytes:
+    def test_round_trip(self, csv_file: Path) -> None:
+        store = read_history_file(str(csv_file))
+        copy = RecordStore.from_bytes(store.to_bytes())
+        assert records_of(copy) == records_of(store)
+        copy.append(store[0])
+        assert copy.strings["symbol"].values == ["AAPL", "MSFT"]
+
+    def test_rejects_other_data(self) -> None:
+        with pytest.raises(ValueError, match="not a RecordStore"):
+            RecordStore.from_bytes(b"bogus")
+
+    def test_rejects_truncated_data(self, csv_file: Path) -> None:
+        data = read_history_file(str(csv_file)).to_bytes()
+        with pytest.raises(ValueError, match="truncated"):
+            RecordStore.from_bytes(data[:40])
+
+
+class TestFileCache:
+    def test_miss_then_hit(self, csv_file: Path, cache: FileCache) -> None:
+        assert cache.get(str(csv_file)) is None
+        parsed = read_history_file(str(csv_file), cache)
+
+        with patch("fidelity.reader.make_row_converter") as convert:
+            cached = read_history_file(str(csv_file), cache)
+        convert.assert_not_called()
+        assert records_of(cached) == records_of(parsed)
+
+    def test_changed_file_is_reparsed(self, csv_file: Path, cache: FileCache) -> None:
+        read_history_file(str(csv_file), cache)
+        csv_file.write_text(CSV_CONTENT.replace("AAPL", "AAPM"), encoding="utf-8")
+        assert cache.get(str(csv_file)) is None
+        assert read_history_file(str(csv_file), cache)[0].symbol == "AAPM"
+
+    def test_same_size_and_mtime_checks_content(self, csv_file: Path, cache: FileCache) -> None:
+        read_history_file(str(csv_file), cache)
+        st = csv_file.stat()
+        csv_file.write_text(CSV_CONTENT.replace("AAPL", "AAPM"), encoding="utf-8")
+        os.utime(csv_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert cache.get(str(csv_file)) is None
+
+    def test_corrupt_entry_is_a_miss(self, csv_file: Path, cache: FileCache) -> None:
+        read_history_file(str(csv_file), cache)
+        for entry in cache.directory.glob("*.bin"):
+            entry.write_bytes(b"junk")
+        assert cache.get(str(csv_file)) is None
+
+    def test_non_regular_files_are_not_cached(self, cache: FileCache) -> None:
+        read_history_file("/dev/null", cache)
+        assert cache.get("/dev/null") is None
+        assert not cache.directory.exists()
+
+    def test_unwritable_directory_is_uncached(
+        self, tmp_path: Path, csv_file: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        (tmp_path / "cache").write_bytes(b"")  # not a directory
+        cache = FileCache(tmp_path / "cache")
+        assert len(read_history_file(str(csv_file), cache)) == 2
+        assert cache.get(str(csv_file)) is None
+        assert "Cannot write cache entry" in caplog.text
+
+    def test_clear(self, csv_file: Path, cache: FileCache) -> None:
+        read_history_file(str(csv_file), cache)
+        cache.clear()
+        assert cache.get(str(csv_file)) is None
+
+    def test_evict_by_age(self, tmp_path: Path, csv_file: Path) -> None:
+        cache = FileCache(tmp_path / "cache", max_age=3600)
+        read_history_file(str(csv_file), cache)
+        assert cache.evict() == 0
+        old = time.time() - 7200
+        for entry in cache.directory.glob("*.bin"):
+            os.utime(entry, (old, old))
+        assert cache.evict() == 1
+        assert cache.get(str(csv_file)) is None
+
+    def test_evict_by_size_drops_least_recently_used(
+        self, tmp_path: Path, write_history: HistoryWriter
+    ) -> None:
+        files = [str(write_history(ROWS, f"history{i}.csv")) for i in range(3)]
+
+        cache = FileCache(tmp_path / "cache")
+        for i, filename in enumerate(files):
+            read_history_file(filename, cache)
+            old = time.time() - 100 + i
+            for entry in cache.directory.glob("*.bin"):
+                if entry.stat().st_mtime > old:
+                    os.utime(entry, (old, old))
+        assert cache.get(files[0]) is not None  # now most recently used
+
+        size = next(cache.directory.glob("*.bin")).stat().st_size
+        cache.max_bytes = size * 2
+        assert cache.evict() == 1
+        assert cache.get(files[1]) is None
+        assert cache.get(files[0]) is not None
+        assert cache.get(files[2]) is not None
+
+
+class TestRollupCache:
+    def test_miss_then_hit(self, csv_file: Path, cache: FileCache) -> None:
+        files = [str(csv_file)]
+        assert cache.get_rollup(files) is None
+        rollup = Rollup.from_store(read_history_file(str(csv_file)))
+        cache.put_rollup(files, rollup, "tag")
+        assert cache.get_rollup(files) is None
+        cached = cache.get_rollup(files, "tag")
+        assert cached is not None
+        assert cached.totals == rollup.totals
+
+    def test_changed_file_is_a_miss(self, csv_file: Path, cache: FileCache) -> None:
+        files = [str(csv_file)]
+        cache.put_rollup(files, Rollup.from_store(read_history_file(str(csv_file))))
+        csv_file.write_text(CSV_CONTENT.replace("AAPL", "AAPM"), encoding="utf-8")
+        assert cache.get_rollup(files) is None
+
+    def test_corrupt_entry_is_a_miss(self, csv_file: Path, cache: FileCache) -> None:
+        files = [str(csv_file)]
+        rollup = Rollup.from_store(read_history_file(str(csv_file)))
+        for data in [b"junk", b"FCR1junk", b"FCR1" + rollup.to_bytes()[:-1]]:
+            cache.put_rollup(files, rollup)
+            for entry in cache.directory.glob("rollup-*.bin"):
+                entry.write_bytes(data)
+            assert cache.get_rollup(files) is None
+
+    def test_non_regular_files_are_not_cached(self, csv_file: Path, cache: FileCache) -> None:
+        files = [str(csv_file), "/dev/null"]
+        cache.put_rollup(files, Rollup())
+        assert cache.get_rollup(files) is None
+        assert not cache.directory.exists()
+
+    def test_unwritable_directory_is_uncached(
+        self, tmp_path: Path, csv_file: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        (tmp_path / "cache").write_bytes(b"")  # not a directory
+        cache = FileCache(tmp_path / "cache")
+        files = [str(csv_file)]
+        cache.put_rollup(files, Rollup.from_store(read_history_file(str(csv_file))))
+        assert cache.get_rollup(files) is None
+        assert "Cannot write cache entry" in caplog.text
@@ -0,0 +1,65 @@
+"""Tests for the dates module."""
+
+import time
+from collections.abc import Iterator
+from datetime import date, timedelta
+from time import mktime, strptime
+
+import pytest
+
+from fidelity.dates import parse_date
+
+
+def slow_parse_date(text: str) -> int:
+    """Reference implementation: what `HistoryRecord` used to do."""
+    return int(mktime(strptime(text, "%m/%d/%Y"))) if text else 0
+
+
+@pytest.fixture(params=["UTC", "America/New_York", "Australia/Sydney"])
+def timezone(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Run under several local timezones (DST rules differ)."""
+    monkeypatch.setenv("TZ", request.param)
+    time.tzset()
+    parse_date.cache_clear()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+    parse_date.cache_clear()
+
+
+@pytest.mark.usefixtures("timezone")
+def test_matches_strptime_for_every_day() -> None:
+    day = date(1971, 1, 1)
+    end = date(2037, 12, 31)
+    while day <= end:
+        text = day.strftime("%m/%d/%Y")
+        assert parse_date(text) == slow_parse_date(text), text
+        day += timedelta(days=1)
+
+
+def test_empty_is_zero() -> None:
+    assert parse_date("") == 0
+
+
+def test_memoizes() -> None:
+    parse_date.cache_clear()
+    parse_date("01/15/2024")
+    parse_date("01/15/2024")
+    info = parse_date.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+
+
+@pytest.mark.parametrize("text", ["1/5/2024", "01/5/2024"])
+def test_non_fixed_width_falls_back(text: str) -> None:
+    assert parse_date(text) == slow_parse_date(text)
+
+
+@pytest.mark.parametrize(
+    "text", ["02/30/2024", "13/01/2024", " 1/15/2024", "01-15-2024", "bogus"]
+)
+def test_invalid_raises_like_strptime(text: str) -> None:
+    with pytest.raises(ValueError):  # noqa: PT011
+        slow_parse_date(text)
+    with pytest.raises(ValueError):  # noqa: PT011
+        parse_date(text)
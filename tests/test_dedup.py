@@ -0,0 +1,63 @@
+"""Tests for the dedup module."""
+
+from fidelity.dedup import RowDeduplicator, row_key
+from fidelity.reader import make_row_converter
+
+convert = make_row_converter()
+
+
+def row(symbol: str = "AAPL", amount: str = "-1500.00", balance: str = "8500.00") -> list[str]:
+    return [
+        "01/15/2024",
+        " BUY",
+        f" {symbol}",
+        " DESCRIPTION",
+        "Cash",
+        "10",
+        "150.00",
+        "",
+        "",
+        "",
+        amount,
+        balance,
+        "01/17/2024",
+    ]
+
+
+def test_row_key_is_stable_and_content_based() -> None:
+    assert row_key(convert(row())) == row_key(convert(row()))
+    assert row_key(convert(row())) != row_key(convert(row(balance="8499.99")))
+    assert row_key(convert(row())) == 15362653484603559282  # persisted in state files
+    assert row_key(convert(row()), "Z12345678") != row_key(convert(row()))
+
+
+def test_drops_rows_from_earlier_sources() -> None:
+    dedup = RowDeduplicator()
+    first = [convert(row("AAPL")), convert(row("MSFT"))]
+    second = [convert(row("MSFT")), convert(row("VTI"))]
+
+    assert list(dedup.new_rows(first)) == first
+    assert dedup.dropped == 0
+    assert list(dedup.new_rows(second)) == second[1:]
+    assert dedup.dropped == 1
+
+
+def test_repeats_within_a_source_are_kept() -> None:
+    dedup = RowDeduplicator()
+    twice = [convert(row()), convert(row())]
+    thrice = [convert(row()), convert(row()), convert(row())]
+
+    assert len(list(dedup.new_rows(twice))) == 2
+    assert len(list(dedup.new_rows(thrice))) == 1
+    assert dedup.dropped == 2
+    assert len(list(dedup.new_rows(twice))) == 0
+    assert len(list(dedup.new_rows(twice, "Z12345678"))) == 2
+
+
+def test_scales_linearly() -> None:
+    rows = [convert(row(amount=str(i))) for i in range(20000)]
+    dedup = RowDeduplicator()
+    assert sum(1 for _ in dedup.new_rows(rows)) == 20000
+    assert sum(1 for _ in dedup.new_rows(rows[::-1])) == 0
+    assert dedup.dropped == 20000
+    assert len(dedup.seen) == 20000
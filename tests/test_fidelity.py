@@ -1,6 +1,14 @@
+import json
+import os
 import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 from fidelity.cli import main
+from tests.conftest import HISTORY, HistoryWriter
 
 
 def run_cli(options: list[str]) -> None:
@@ -23,3 +31,187 @@ def test_use_datafiles() -> None:
 
 def test_use_datafiles_no_exclude() -> None:
     run_cli(["--use-datafiles", "--no-exclude"])
+
+
+def test_use_datafiles_no_cache() -> None:
+    run_cli(["--use-datafiles", "--no-cache"])
+
+
+def test_use_datafiles_rebuild_cache() -> None:
+    run_cli(["--use-datafiles", "--rebuild-cache"])
+
+
+def test_use_datafiles_chunk_size() -> None:
+    run_cli(["--use-datafiles", "--chunk-size", "2"])
+
+
+def test_use_datafiles_stream() -> None:
+    run_cli(["--use-datafiles", "--stream"])
+
+
+def test_use_datafiles_filters() -> None:
+    run_cli(
+        ["--use-datafiles", "--symbol", "aapl", "--since", "01/01/2024", "--until", "12/31/2024"]
+    )
+
+
+def test_bad_date() -> None:
+    with pytest.raises(SystemExit) as err:
+        run_cli(["--since", "2024-01-01"])
+    assert err.value.code == 2
+
+
+@pytest.mark.parametrize("option", ["--last", "--top"])
+@pytest.mark.parametrize("count", ["0", "-3", "x"])
+def test_bad_count(option: str, count: str) -> None:
+    with pytest.raises(SystemExit) as err:
+        run_cli([option, count])
+    assert err.value.code == 2
+
+
+def test_use_datafiles_ingest() -> None:
+    run_cli(["--use-datafiles", "--ingest"])
+    run_cli(["--use-datafiles", "--ingest"])
+
+
+@pytest.mark.parametrize("option", ["--by-account", "--keep-duplicates"])
+def test_ingest_rejects_option(option: str) -> None:
+    with pytest.raises(SystemExit) as exc:
+        run_cli(["--use-datafiles", "--ingest", option])
+    assert exc.value.code == 2
+
+
+def test_use_datafiles_format_jsonl() -> None:
+    run_cli(["--use-datafiles", "--format", "jsonl"])
+
+
+def test_use_datafiles_format_csv_output(tmp_path: Path) -> None:
+    output = tmp_path / "reports.csv"
+    run_cli(["--use-datafiles", "--format", "csv", "--output", str(output)])
+    assert output.read_text(encoding="utf-8").startswith("report,run_date,")
+
+
+def test_use_datafiles_timings_profile(tmp_path: Path) -> None:
+    profile = tmp_path / "fidelity.prof"
+    run_cli(["--use-datafiles", "--timings", "--profile", str(profile), "--ingest"])
+    assert profile.stat().st_size > 0
+
+
+def test_use_datafiles_by_account() -> None:
+    run_cli(["--use-datafiles", "--by-account", "--format", "jsonl"])
+
+
+def test_by_account_keeps_merged_totals(
+    write_history: HistoryWriter, capsys: pytest.CaptureFixture[str]
+) -> None:
+    row = "01/15/2024, BUY, AAPL, APPLE INC,Cash,10,100.00,0,0,0,-1000.00,1.00,"
+    files = [
+        str(write_history([row], f"History_{account}.csv", account))
+        for account in ["Z11111111", "Z22222222"]
+    ]
+    totals = []
+    for mode in [[], ["--by-account"]]:
+        run_cli(["--no-cache", "--format", "jsonl", *mode, *files])
+        lines = capsys.readouterr().out.splitlines()
+        rows = [json.loads(line) for line in lines if line.startswith("{")]
+        totals.append(
+            [(row["quantity"], row["amount"]) for row in rows if row["report"] == "position"]
+        )
+    # The same trade in two accounts is two trades, whether or not reported apart.
+    assert totals == [[(20.0, -2000.0)], [(20.0, -2000.0)]]
+
+
+def test_use_datafiles_last_top() -> None:
+    run_cli(["--use-datafiles", "--last", "5", "--top", "3"])
+    run_cli(["--use-datafiles", "--top", "3"])
+
+
+def test_by(
+    tmp_path: Path, write_history: HistoryWriter, capsys: pytest.CaptureFixture[str]
+) -> None:
+    history = write_history(HISTORY)
+    config = tmp_path / "fidelity.toml"
+    config.write_text(f'cache-dir = "{tmp_path / "cache"}"\n', encoding="utf-8")
+    options = ["--config", str(config), "--by", "month", "--format", "jsonl", str(history)]
+
+    run_cli(options)
+    assert len(list((tmp_path / "cache").glob("rollup-*.bin"))) == 1
+    first = capsys.readouterr().out
+    with patch("fidelity.fidelity.Fidelity.read_partitions") as read:
+        run_cli(options)
+    read.assert_not_called()
+    assert capsys.readouterr().out == first
+
+
+def test_use_datafiles_by() -> None:
+    run_cli(["--use-datafiles", "--by", "year", "--since", "01/01/2024", "--top", "1"])
+    run_cli(["--use-datafiles", "--by", "quarter", "--no-cache"])
+
+
+def test_use_datafiles_gains() -> None:
+    run_cli(["--use-datafiles", "--gains"])
+    run_cli(["--use-datafiles", "--gains", "--lot-method", "hifo", "--format", "jsonl"])
+    run_cli(["--use-datafiles", "--by-account", "--gains", "--lot-method", "lifo"])
+
+
+def test_gains_before_file(
+    write_history: HistoryWriter, capsys: pytest.CaptureFixture[str]
+) -> None:
+    history = write_history(HISTORY)
+    run_cli(["--no-cache", "--format", "jsonl", "--gains", str(history)])
+    lines = capsys.readouterr().out.splitlines()
+    rows = [json.loads(line) for line in lines if line.startswith("{")]
+    assert [(row["report"], row["symbol"], row["quantity"]) for row in rows] == [
+        ("gains", "AAPL", 10.0),
+        ("gains", "AAPL", 2.0),
+        ("gains", "MSFT", 5.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("option", "expected"),
+    [
+        (None, [12.0, 12.0, 10.0, 10.0, 10.0]),
+        ("--by-account", [12.0, 12.0, 10.0, 10.0, 10.0]),
+        ("--keep-duplicates", [12.0, 22.0, 20.0, 20.0, 10.0]),
+    ],
+)
+def test_watch(
+    write_history: HistoryWriter,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    option: str | None,
+    expected: list[float],
+) -> None:
+    from fidelity.watch import Changes, FileWatcher
+
+    first = write_history(HISTORY, "first.csv")
+    second = first.with_name("second.csv")
+    steps: Iterator[Callable[[], object]] = iter(
+        [
+            lambda: write_history(HISTORY[:1], second.name),  # already read
+            lambda: write_history(HISTORY[:1], first.name),  # drops the later AAPL buy
+            lambda: os.utime(first, ns=(0, 0)),
+            first.unlink,
+        ]
+    )
+    real_wait = FileWatcher.wait
+
+    def wait(watcher: FileWatcher) -> Changes:
+        if (step := next(steps, None)) is None:
+            raise KeyboardInterrupt
+        step()
+        watcher.interval = watcher.debounce = 0
+        return real_wait(watcher)
+
+    monkeypatch.setattr(FileWatcher, "wait", wait)
+    options = ["--watch", "--symbol", "AAPL", "--top", "1", "--format", "jsonl"]
+    if option is not None:
+        options.append(option)
+    run_cli([*options, str(first), str(second)])
+    lines = capsys.readouterr().out.splitlines()
+    rows = [json.loads(line) for line in lines if line.startswith("{")]
+    positions = [row["quantity"] for row in rows if row["report"] == "position"]
+    assert positions == expected
+    reports = {row["report"] for row in rows}
+    assert ("position:default" in reports) == (option == "--by-account")
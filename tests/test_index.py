@@ -0,0 +1,131 @@
+"""Tests for the index module."""
+
+import random
+
+from fidelity.dates import parse_date
+from fidelity.index import ReportIndex
+from fidelity.reader import HistoryRecord
+from fidelity.store import RecordStore
+
+SYMBOLS = ["AAPL", "MSFT", "SPAXX", "VTI", "KO", "T"]
+DATES = ["", "12/31/1969", "01/15/2024", "01/16/2024", "02/29/2024", "11/03/2024"]
+
+
+def make_store(count: int = 500, seed: int = 1, symbols: list[str] = SYMBOLS) -> RecordStore:
+    rng = random.Random(seed)
+    store = RecordStore()
+    for i in range(count):
+        store.append(
+            HistoryRecord(
+                rng.choice(DATES),
+                "BUY",
+                rng.choice(symbols),
+                str(i),  # description: remembers input order
+                "Cash",
+                "1",  # type: ignore[arg-type]
+                "1",  # type: ignore[arg-type]
+                "",  # type: ignore[arg-type]
+                "",  # type: ignore[arg-type]
+                "",  # type: ignore[arg-type]
+                str(rng.randint(-100, 100)),  # type: ignore[arg-type]
+                "",  # type: ignore[arg-type]
+                "",
+            )
+        )
+    return store
+
+
+class TestReportIndex:
+    def test_by_date_matches_sorted(self) -> None:
+        store = make_store()
+        index = ReportIndex(store)
+        expected = sorted(
+            range(len(store)), key=lambda i: (store[i].t_run_date, store[i].symbol)
+        )
+        assert list(index.by_date) == expected
+        assert index.select_history() is index.by_date
+
+    def test_groups_match_sorted_by_symbol(self) -> None:
+        store = make_store()
+        index = ReportIndex(store)
+        expected = sorted(
+            range(len(store)), key=lambda i: (store[i].symbol, store[i].t_run_date)
+        )
+        assert [row for _, rows in index.groups for row in rows] == expected
+        assert [symbol for symbol, _ in index.groups] == sorted(SYMBOLS)
+        for symbol, rows in index.groups:
+            assert all(store[row].symbol == symbol for row in rows)
+            assert index.symbols[symbol] is rows
+
+    def test_exclude(self) -> None:
+        store = make_store()
+        index = ReportIndex(store)
+        history = index.select_history(exclude=["SPAXX", "BOGUS"])
+        assert [r for r in index.by_date if store[r].symbol != "SPAXX"] == list(history)
+        groups = index.select_groups(exclude=["SPAXX"])
+        assert [s for s, _ in groups] == sorted(set(SYMBOLS) - {"SPAXX"})
+
+    def test_select_matches_linear_filter(self) -> None:
+        store = make_store()
+        index = ReportIndex(store)
+        since = parse_date("01/15/2024")
+        until = parse_date("02/29/2024")
+        for symbols in [None, ["KO"], ["MSFT", "AAPL", "BOGUS"], ["SPAXX"]]:
+            for lo, hi in [(None, None), (since, None), (None, until), (since, until)]:
+
+                def wanted(row: int) -> bool:
+                    rec = store[row]
+                    return (
+                        (symbols is None or rec.symbol in symbols)  # noqa: B023
+                        and rec.symbol != "SPAXX"
+                        and (lo is None or rec.t_run_date >= lo)  # noqa: B023
+                        and (hi is None or rec.t_run_date <= hi)  # noqa: B023
+                    )
+
+                history = index.select_history(symbols, lo, hi, exclude=["SPAXX"])
+                assert list(history) == [r for r in index.by_date if wanted(r)]
+
+                groups = index.select_groups(symbols, lo, hi, exclude=["SPAXX"])
+                expected = [
+                    (s, [r for r in rows if wanted(r)])
+                    for s, rows in index.groups
+                    if any(wanted(r) for r in rows)
+                ]
+                assert [(s, list(rows)) for s, rows in groups] == expected
+
+    def test_empty_store(self) -> None:
+        index = ReportIndex(RecordStore())
+        assert list(index.by_date) == []
+        assert index.groups == []
+        assert list(index.select_history(["AAPL"], exclude=["SPAXX"])) == []
+
+    def test_is_current(self) -> None:
+        store = make_store(10)
+        index = ReportIndex(store)
+        assert index.is_current(store)
+        assert not index.is_current(make_store(10))
+        store.append(store[0])
+        assert not index.is_current(store)
+
+    def test_update_matches_full_build(self) -> None:
+        store = make_store(0)
+        index = ReportIndex(store)
+        for count, seed, symbols in [
+            (200, 2, SYMBOLS),
+            (1, 3, SYMBOLS),
+            (300, 4, [*SYMBOLS, "AA", "ZZZ"]),  # new symbols shift the ranks
+        ]:
+            store.extend(make_store(count, seed, symbols))
+            assert index.can_update(store)
+            index.update()
+            assert index.is_current(store)
+            full = ReportIndex(store)
+            assert list(index.by_date) == list(full.by_date)
+            assert [(s, list(rows)) for s, rows in index.groups] == [
+                (s, list(rows)) for s, rows in full.groups
+            ]
+            assert list(index.select_history(["AA", "VTI"])) == list(
+                full.select_history(["AA", "VTI"])
+            )
+        assert not index.can_update(store)
+        assert not index.can_update(make_store(1000))
@@ -0,0 +1,79 @@
+"""Tests for lot matching."""
+
+from __future__ import annotations
+
+import pytest
+
+from fidelity.lots import Gain, LotBook, match_lots
+
+# `(t_run_date, quantity, amount)` of one symbol's rows, in date order.
+ROWS = [
+    (1, 10.0, -100.0),  # 0: buy 10 @ 10
+    (2, 10.0, -300.0),  # 1: buy 10 @ 30
+    (3, 10.0, -200.0),  # 2: buy 10 @ 20
+    (4, 0.0, 5.0),  # 3: dividend
+    (5, -15.0, 600.0),  # 4: sell 15 @ 40
+]
+
+
+def match(
+    rows: list[tuple[int, float, float]], method: str = "fifo", exact: bool = False
+) -> tuple[list[Gain], list[tuple[int, float, float]]]:
+    t_run_date, quantity, amount = (list(column) for column in zip(*rows, strict=True))
+    book = LotBook(method, exact)
+    gains = match_lots(book, range(len(rows)), t_run_date, quantity, amount)
+    return gains, [(lot.row, lot.quantity, lot.cost) for lot in book.lots]
+
+
+@pytest.mark.parametrize(
+    ("method", "gains", "lots"),
+    [
+        (
+            "fifo",
+            [Gain(0, 4, 10.0, 100.0, 400.0), Gain(1, 4, 5.0, 150.0, 200.0)],
+            [(1, 5.0, 150.0), (2, 10.0, 200.0)],
+        ),
+        (
+            "lifo",
+            [Gain(2, 4, 10.0, 200.0, 400.0), Gain(1, 4, 5.0, 150.0, 200.0)],
+            [(0, 10.0, 100.0), (1, 5.0, 150.0)],
+        ),
+        (
+            "hifo",
+            [Gain(1, 4, 10.0, 300.0, 400.0), Gain(2, 4, 5.0, 100.0, 200.0)],
+            [(0, 10.0, 100.0), (2, 5.0, 100.0)],
+        ),
+    ],
+)
+def test_methods(method: str, gains: list[Gain], lots: list[tuple[int, float, float]]) -> None:
+    assert match(ROWS, method) == (gains, lots)
+
+
+def test_same_day_sale_matches_that_days_buy() -> None:
+    gains, lots = match([(1, -4.0, 48.0), (1, 4.0, -40.0)])
+    assert gains == [Gain(1, 0, 4.0, 40.0, 48.0)]
+    assert lots == []
+
+
+def test_sale_without_lots_has_unknown_cost() -> None:
+    gains, lots = match([(1, 2.0, -20.0), (2, -3.0, 60.0)])
+    assert gains == [Gain(0, 1, 2.0, 20.0, 40.0), Gain(-1, 1, 1.0, 0.0, 20.0)]
+    assert lots == []
+
+
+def test_float_residue_closes_lot() -> None:
+    gains, lots = match([(1, 0.1, -1.0), (1, 0.2, -2.0), (2, -0.30000000000000004, 3.0)])
+    assert [gain.opened for gain in gains] == [0, 1]
+    assert lots == []
+
+
+def test_exact_parts_add_up() -> None:
+    gains, lots = match([(1, 3, -100), (2, -1, 50), (3, -1, 50)], exact=True)
+    assert gains == [Gain(0, 1, 1, 33, 50), Gain(0, 2, 1, 34, 50)]
+    assert lots == [(0, 1, 33)]
+    assert sum(gain.cost for gain in gains) + lots[0][2] == 100
+
+
+def test_unknown_method() -> None:
+    with pytest.raises(ValueError, match="unknown lot method"):
+        LotBook("random")
@@ -1,16 +1,32 @@
 """Tests for the reader module."""
 
 import tempfile
+from dataclasses import fields
+from itertools import pairwise
 from pathlib import Path
 from typing import Any
 
-from fidelity.reader import HistoryRecord, read_history_file
+import pytest
 
-# Fidelity CSV header (split for line length)
-CSV_HEADER = (
-    "Run Date,Action,Symbol,Description,Type,Quantity,Price,"
-    "Commission,Fees,Accrued Interest,Amount,Cash Balance,Settlement Date"
+from fidelity import reader
+from fidelity.reader import (
+    HistoryRecord,
+    find_data_block,
+    iter_block_values,
+    iter_history_file,
+    iter_history_values,
+    iter_input_files,
+    iter_mapped_values,
+    make_row_converter,
+    read_history_file,
+    split_data_block,
 )
+from tests.conftest import CSV_HEADER, HistoryWriter
+
+ROWS = [
+    "01/15/2024, BUY, AAPL, APPLE INC,Cash,10,150.00,0,0.02,0,-1500.02,8499.98,01/17/2024",
+    "01/16/2024, SELL, MSFT, MICROSOFT,Cash,5,400.00,0,0.01,0,1999.99,10499.97,01/18/2024",
+]
 
 
 def make_record(**kwargs: Any) -> HistoryRecord:
@@ -91,6 +107,68 @@ class TestHistoryRecord:
         assert rec.t_settlement_date == 0
 
 
+class TestRowConverter:
+    """Tests for make_row_converter."""
+
+    ROW = [
+        "01/15/2024",
+        " BUY",
+        " AAPL",
+        " APPLE INC",
+        "Cash",
+        "10",
+        "150.00",
+        "",
+        "n/a",
+        "0",
+        "-1500.02",
+        "8499.98",
+        "01/17/2024",
+    ]
+
+    def test_matches_history_record(self) -> None:
+        rec = HistoryRecord(*self.ROW)  # type: ignore[arg-type]
+        values = make_row_converter(CSV_HEADER.split(","))(self.ROW)
+        assert values == (
+            rec.run_date,
+            rec.action,
+            rec.symbol,
+            rec.description,
+            rec.type,
+            rec.quantity,
+            rec.price,
+            rec.commission,
+            rec.fees,
+            rec.accrued_interest,
+            rec.amount,
+            rec.cash_balance,
+            rec.settlement_date,
+            rec.t_run_date,
+            rec.t_settlement_date,
+        )
+
+    def test_blank_and_malformed_numbers_are_zero(self) -> None:
+        values = make_row_converter()(self.ROW)
+        assert values[7] == 0.0
+        assert values[8] == 0.0
+
+    def test_columns_resolved_from_header(self) -> None:
+        header = CSV_HEADER.split(",")
+        header = [f"{x} ($)" if x in ("Price", "Amount") else x for x in header]
+        header[1], header[2] = header[2], header[1]
+        row = list(self.ROW)
+        row[1], row[2] = row[2], row[1]
+        values = make_row_converter(header)(row)
+        assert values[1] == "BUY"
+        assert values[2] == "AAPL"
+        assert values[6] == 150.0
+        assert values[10] == -1500.02
+
+    def test_unknown_header_is_positional(self) -> None:
+        values = make_row_converter(["a", "b", "c"])(self.ROW)
+        assert values[2] == "AAPL"
+
+
 class TestReadHistoryFile:
     """Tests for read_history_file function."""
 
@@ -159,3 +237,123 @@ Account: X12345678
             assert len(records) == 0
         finally:
             temp_path.unlink()
+
+
+class TestIterHistoryFile:
+    """Tests for the streaming readers."""
+
+    def test_yields_same_records_as_read(self, write_history: HistoryWriter) -> None:
+        path = write_history([*ROWS, "", "Footer"])
+
+        streamed = list(iter_history_file(str(path)))
+        loaded = read_history_file(str(path))
+        assert len(streamed) == 2
+        for rec, view in zip(streamed, loaded, strict=True):
+            assert isinstance(rec, HistoryRecord)
+            for f in fields(HistoryRecord):
+                assert getattr(rec, f.name) == getattr(view, f.name), f.name
+
+    def test_input_files_are_chained_in_order(self, write_history: HistoryWriter) -> None:
+        files = [str(write_history([*ROWS, "", "Footer"], name)) for name in ["a.csv", "b.csv"]]
+
+        symbols = [rec.symbol for rec in iter_input_files(files)]
+        assert symbols == ["AAPL", "MSFT", "AAPL", "MSFT"]
+
+    def test_is_lazy(self, tmp_path: Path) -> None:
+        records = iter_input_files([str(tmp_path / "missing.csv")])
+        with pytest.raises(FileNotFoundError):
+            next(records)
+
+
+# Files `iter_mapped_values` must read exactly as `iter_history_values` does.
+ROW = "01/15/2024, BUY, AAPL, APPLE INC,Cash,10,150.00,0,0,0,-1500.00,8500.00,01/17/2024"
+SHAPES = {
+    "footer": f'Brokerage\nAccount: X\n{CSV_HEADER}\n{ROW}\n{ROW}\n\n"footer"\n{ROW}\n',
+    "crlf": f"Brokerage\r\nAccount: X\r\n{CSV_HEADER}\r\n{ROW}\r\n\r\n{ROW}\r\n",
+    "no_newline": f"Brokerage\nAccount: X\n{CSV_HEADER}\n{ROW}\n{ROW}",
+    "no_rows": f"Brokerage\nAccount: X\n{CSV_HEADER}\n\n{ROW}\n",
+    "headings_only": f"Brokerage\nAccount: X\n{CSV_HEADER}",
+    "preamble_only": "Brokerage\n",
+    "blank_header": f"Brokerage\nAccount: X\n\n{ROW}\n",
+    "quoted": (
+        f'Brokerage\nAccount: X\n{CSV_HEADER}\n01/15/2024,"BUY, ""X""",AAPL,Ä,Cash,1,,,,,2,3,\n'
+    ),
+    "empty": "",
+}
+
+
+class TestMappedReader:
+    """Tests for the memory-mapped reader."""
+
+    @pytest.mark.parametrize("shape", SHAPES)
+    def test_same_values_as_text_reader(self, tmp_path: Path, shape: str) -> None:
+        path = tmp_path / "history.csv"
+        path.write_bytes(SHAPES[shape].encode())
+        assert list(iter_mapped_values(str(path))) == list(iter_history_values(str(path)))
+
+    def test_unmappable_file(self) -> None:
+        assert list(iter_mapped_values("/dev/null")) == []
+
+    def test_data_block(self) -> None:
+        data = SHAPES["footer"].encode()
+        header, start, end = find_data_block(data)
+        assert header == CSV_HEADER.split(",")
+        assert data[start:end] == f"{ROW}\n{ROW}\n".encode()
+
+    def test_small_batches(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(reader, "BLOCK_BATCH_BYTES", 100)
+        path = tmp_path / "history.csv"
+        rows = [ROW.replace("-1500.00", f"-{i}.00") for i in range(50)]
+        path.write_text(f"a\nb\n{CSV_HEADER}\n" + "\n".join(rows) + "\n", encoding="utf-8")
+        assert list(iter_mapped_values(str(path))) == list(iter_history_values(str(path)))
+
+    @pytest.mark.parametrize("parts", [1, 2, 3, 7, 100])
+    def test_split_covers_block_at_line_ends(self, parts: int) -> None:
+        rows = [ROW.replace("-1500.00", f"-{i}.00") for i in range(20)]
+        data = f"a\nb\n{CSV_HEADER}\n".encode() + "\n".join(rows).encode() + b"\n\nfooter\n"
+        header, start, end = find_data_block(data)
+        ranges = split_data_block(data, start, end, parts)
+
+        assert len(ranges) == min(parts, len(rows))
+        assert ranges[0][0] == start
+        assert ranges[-1][1] == end
+        assert all(a < b for a, b in ranges)
+        assert all(b == c for (_, b), (c, _) in pairwise(ranges))
+        convert = make_row_converter(header)
+        values = [v for a, b in ranges for v in iter_block_values(data, a, b, convert)]
+        assert values == list(iter_block_values(data, start, end, convert))
+        assert len(values) == len(rows)
+
+
+class TestParallelReader:
+    """Tests for reading one file in parallel parts."""
+
+    def test_same_records_as_serial(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(reader, "MIN_PART_BYTES", 1000)
+        rows = [ROW.replace("AAPL", f"S{i % 13}").replace("-1500", f"-{i}") for i in range(500)]
+        path = tmp_path / "history.csv"
+        path.write_text(
+            f"Brokerage\nAccount: X\n{CSV_HEADER}\n" + "\n".join(rows) + f"\n\nfooter\n{ROW}\n",
+            encoding="utf-8",
+        )
+        serial = read_history_file(str(path))
+        parallel = read_history_file(str(path), jobs=3)
+        assert len(parallel) == 500
+        assert list(parallel.iter_values()) == list(serial.iter_values())
+
+    @pytest.mark.parametrize("shape", ["footer", "empty"])
+    def test_small_files_read_serially(self, tmp_path: Path, shape: str) -> None:
+        path = tmp_path / "history.csv"
+        path.write_bytes(SHAPES[shape].encode())
+        assert list(read_history_file(str(path), jobs=4).iter_values()) == list(
+            iter_history_values(str(path))
+        )
+
+    def test_read_range(self, tmp_path: Path) -> None:
+        path = tmp_path / "history.csv"
+        path.write_bytes(SHAPES["footer"].encode())
+        header, start, end = find_data_block(path.read_bytes())
+        part = reader._read_range(str(path), header, start, end)
+        assert list(part.iter_values()) == list(iter_history_values(str(path)))
@@ -0,0 +1,58 @@
+"""Tests for chunked table output."""
+
+from io import StringIO
+
+from rich.console import Console
+
+from fidelity.render import ChunkedTable
+
+
+def make_table(chunk_size: int) -> tuple[ChunkedTable, StringIO]:
+    """Return a two-column table printing to a string buffer."""
+    file = StringIO()
+    console = Console(file=file, width=20, color_system=None)
+    table = ChunkedTable(
+        "Title", [("Date", 10, False), ("Amount", 6, True)], chunk_size, console
+    )
+    return table, file
+
+
+class TestChunkedTable:
+    """Tests for ChunkedTable."""
+
+    def test_heading_printed_at_once(self) -> None:
+        _, file = make_table(10)
+        assert file.getvalue().splitlines() == [
+            "         Title",
+            "╭────────────┬────────╮",
+            "│ Date       │ Amount │",
+            "├────────────┼────────┤",
+        ]
+
+    def test_rows_printed_in_chunks(self) -> None:
+        table, file = make_table(2)
+        heading = len(file.getvalue().splitlines())
+
+        table.add_row("01/15/2024", "1.0")
+        assert len(file.getvalue().splitlines()) == heading
+        table.add_row("01/16/2024", "-2.0")
+        assert len(file.getvalue().splitlines()) == heading + 2
+
+        table.add_section()
+        table.add_row("01/17/2024", "1234567.0")
+        table.close()
+        assert file.getvalue().splitlines()[heading:] == [
+            "│ 01/15/2024 │    1.0 │",
+            "│ 01/16/2024 │   -2.0 │",
+            "├────────────┼────────┤",
+            "│ 01/17/2024 │ 12345… │",
+            "╰────────────┴────────╯",
+        ]
+
+    def test_no_separator_before_first_row(self) -> None:
+        table, file = make_table(1)
+        table.add_section()
+        table.add_row("01/15/2024", "1.0")
+        table.close()
+        assert "├" not in file.getvalue().splitlines()[4]
+        assert table.row_count == 1
@@ -1,23 +1,45 @@
 """Tests for the Fidelity report generator."""
 
+import json
+import logging
 import tempfile
 from argparse import Namespace
+from io import StringIO
 from pathlib import Path
+from typing import Any
 from unittest.mock import patch
 
-from fidelity.fidelity import Fidelity
-from fidelity.reader import HistoryRecord
+import pytest
 
-# Fidelity CSV header (split for line length)
-CSV_HEADER = (
-    "Run Date,Action,Symbol,Description,Type,Quantity,Price,"
-    "Commission,Fees,Accrued Interest,Amount,Cash Balance,Settlement Date"
-)
+from fidelity import reader
+from fidelity.accounts import DEFAULT_ACCOUNT, partition_files
+from fidelity.cache import FileCache
+from fidelity.dates import parse_date
+from fidelity.fidelity import Fidelity
+from fidelity.reader import HistoryRecord, iter_input_files
+from fidelity.state import StateStore
+from fidelity.writers import JsonlWriter
+from tests.conftest import CSV_HEADER, HistoryWriter
 
 
-def make_options(no_exclude: bool = False) -> Namespace:
+def make_options(  # noqa: PLR0913
+    no_exclude: bool = False,
+    symbol: list[str] | None = None,
+    since: int | None = None,
+    until: int | None = None,
+    *,
+    chunk_size: int = 0,
+    exact: bool = False,
+) -> Namespace:
     """Create a mock options namespace."""
-    return Namespace(no_exclude=no_exclude)
+    return Namespace(
+        no_exclude=no_exclude,
+        symbol=symbol,
+        since=since,
+        until=until,
+        chunk_size=chunk_size,
+        exact=exact,
+    )
 
 
 def make_record(
@@ -46,6 +68,12 @@ def make_record(
     )
 
 
+def table_cells(mock: Any) -> list[list[str]]:
+    """Return the cells, by column, of the table passed to a mocked `rich.print`."""
+    table = mock.call_args.args[0]
+    return [list(column.cells) for column in table.columns]
+
+
 class TestFidelityFiltering:
     """Tests for record filtering."""
 
@@ -79,6 +107,20 @@ class TestFidelityFiltering:
         symbols = [r.symbol for r in filtered]
         assert "SPAXX" in symbols
 
+    def test_index_follows_records_changes(self) -> None:
+        fidelity = Fidelity(make_options())
+        fidelity.records = [make_record("AAPL")]
+        index = fidelity.index
+        assert fidelity.index is index
+
+        fidelity.records.append(make_record("MSFT"))
+        assert fidelity.index is index  # updated in place
+        assert len(fidelity._get_history_records()) == 2
+
+        fidelity.records = [make_record("VTI")]
+        assert fidelity.index is not index
+        assert len(fidelity._get_history_records()) == 1
+
 
 class TestFidelityReadFiles:
     """Tests for reading input files."""
@@ -106,6 +148,119 @@ Account: X12345678
             for p in files:
                 p.unlink()
 
+    def test_parallel_read_matches_serial_order(
+        self, write_history: HistoryWriter, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        files = []
+        for i, symbol in enumerate(["AAPL", "MSFT", "VTI", "KO"]):
+            day = f"01/1{i}/2024"
+            rows = [
+                f"{day}, BUY, {symbol}, X,Cash,1,1.00,0,0,0,-1.00,1.00,{day}",
+                f"{day}, SELL, {symbol}, X,Cash,1,1.00,0,0,0,1.00,2.00,{day}",
+            ]
+            files.append(str(write_history(rows, f"history{i}.csv")))
+
+        serial = Fidelity(make_options())
+        serial.read_input_files(files)
+
+        parallel = Fidelity(make_options())
+        with caplog.at_level(logging.INFO, logger="fidelity.fidelity"):
+            parallel.read_input_files(files, jobs=3)
+
+        assert [(r.symbol, r.action) for r in parallel.records] == [
+            (r.symbol, r.action) for r in serial.records
+        ]
+        assert len(parallel.records) == 8
+        for filename in files:
+            assert filename in caplog.text
+
+    @pytest.mark.parametrize("mode", ["stream", "cache", "jobs"])
+    def test_dedup_overlapping_files(
+        self,
+        tmp_path: Path,
+        write_history: HistoryWriter,
+        caplog: pytest.LogCaptureFixture,
+        mode: str,
+    ) -> None:
+        rows = [
+            f"01/{day:02d}/2024, BUY, AAPL, X,Cash,1,1.00,0,0,0,-{day}.00,1.00,01/{day:02d}/2024"
+            for day in range(1, 29)
+        ]
+        files = [
+            str(write_history(part, f"{name}.csv"))
+            for name, part in [
+                ("year", rows),
+                ("month", rows[20:]),
+                ("more", rows[25:] + rows[:1]),
+            ]
+        ]
+
+        fidelity = Fidelity(make_options())
+        with caplog.at_level(logging.INFO, logger="fidelity.fidelity"):
+            fidelity.read_input_files(
+                files,
+                jobs=2 if mode == "jobs" else 1,
+                cache=FileCache(tmp_path / "cache") if mode == "cache" else None,
+                dedup=True,
+            )
+        assert len(fidelity.records) == 28
+        assert [r.amount for r in fidelity.records] == [-float(day) for day in range(1, 29)]
+        assert "removed 0 duplicates" in caplog.records[0].getMessage()
+        assert "removed 8 duplicates" in caplog.records[1].getMessage()
+        assert "removed 4 duplicates" in caplog.records[2].getMessage()
+
+    def test_single_file_split_across_jobs(
+        self, write_history: HistoryWriter, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(reader, "MIN_PART_BYTES", 100)
+        path = write_history(
+            f"01/{day:02d}/2024, BUY, S{day % 5}, X,Cash,1,1.00,0,0,0,-{day}.00,1.00,"
+            for day in range(1, 29)
+        )
+        serial = Fidelity(make_options())
+        serial.read_input_files([str(path)])
+        parallel = Fidelity(make_options())
+        parallel.read_input_files([str(path)], jobs=3, dedup=True)
+        assert list(parallel.records.iter_values()) == list(serial.records.iter_values())
+
+    def test_ingest_uses_state_totals(self, write_history: HistoryWriter) -> None:
+        path = write_history(
+            ["01/15/2024, BUY, AAPL, X,Cash,10,1.00,0,0,0,-10.00,1.00,01/17/2024"]
+        )
+        state = StateStore()
+        fidelity = Fidelity(make_options())
+        fidelity.ingest_input_files([str(path), str(path)], state)
+        assert len(fidelity.records) == 1
+
+        state.positions["AAPL"] = [99.0, -99.0]  # prove the totals are used
+        with patch("rich.print") as mock:
+            fidelity.print_position_report()
+        assert table_cells(mock)[1] == ["99.000"]
+
+        fidelity.options.symbol = ["AAPL"]  # filtered: recomputed
+        with patch("rich.print") as mock:
+            fidelity.print_position_report()
+        assert table_cells(mock)[1] == ["10.000"]
+
+        fidelity.options.symbol = None
+        fidelity.read_input_files([str(path)])  # records changed: recomputed
+        with patch("rich.print") as mock:
+            fidelity.print_position_report()
+        assert table_cells(mock)[1] == ["20.000"]
+
+    def test_ingest_deduplicates_per_account(self, write_history: HistoryWriter) -> None:
+        rows = ["01/15/2024, BUY, AAPL, X,Cash,10,1.00,0,0,0,-10.00,1.00,01/17/2024"]
+        files = [
+            str(write_history(rows, name))
+            for name in ["History_Z11111111.csv", "History_Z22222222.csv", "history.csv"]
+        ]
+        state = StateStore()
+        fidelity = Fidelity(make_options())
+        fidelity.ingest_input_files(files, state)
+        fidelity.ingest_input_files(files, state)
+        assert len(fidelity.records) == 3
+        assert state.positions == {"AAPL": [30.0, -30.0]}
+
     def test_handles_empty_file_list(self) -> None:
         fidelity = Fidelity(make_options())
         fidelity.read_input_files([])
@@ -155,3 +310,456 @@ class TestFidelityReports:
             fidelity.print_history_report()
             fidelity.print_symbol_report()
             fidelity.print_position_report()
+
+    def test_position_report_from_stream_matches_loaded(
+        self, write_history: HistoryWriter
+    ) -> None:
+        path = write_history(
+            [
+                "01/15/2024, BUY, MSFT, MICROSOFT,Cash,10,100.00,0,0,0,-1000.00,0,01/17/2024",
+                "01/16/2024, BUY, AAPL, APPLE INC,Cash,5,100.00,0,0,0,-500.00,0,01/18/2024",
+                "01/17/2024, SELL, MSFT, MICROSOFT,Cash,-4,110.00,0,0,0,440.00,0,01/19/2024",
+            ]
+        )
+
+        loaded = Fidelity(make_options())
+        loaded.read_input_files([str(path)])
+        with patch("rich.print") as mock:
+            loaded.print_position_report()
+        expected = table_cells(mock)
+
+        streamed = Fidelity(make_options())
+        with patch("rich.print") as mock:
+            streamed.print_position_report(iter_input_files([str(path)]))
+        assert table_cells(mock) == expected
+        assert expected == [
+            ["AAPL", "MSFT"],
+            ["5.000", "6.000"],
+            ["-500.000", "-560.000"],
+            ["-500.000", "-1,060.000"],
+        ]
+
+    def test_filters(self) -> None:
+        records = [
+            make_record("AAPL", run_date="01/15/2024"),
+            make_record("MSFT", run_date="01/16/2024"),
+            make_record("AAPL", run_date="02/15/2024", quantity=-2),
+            make_record("AAPL", run_date="03/15/2024", quantity=4),
+        ]
+        options = make_options(
+            symbol=["AAPL"], since=parse_date("01/16/2024"), until=parse_date("02/15/2024")
+        )
+
+        fidelity = Fidelity(options)
+        fidelity.records = records
+        with patch("rich.print") as mock:
+            fidelity.print_history_report()
+        assert table_cells(mock)[0] == ["02/15/2024"]
+        with patch("rich.print") as mock:
+            fidelity.print_symbol_report()
+        assert table_cells(mock)[0] == ["02/15/2024"]
+        with patch("rich.print") as mock:
+            fidelity.print_position_report()
+        assert table_cells(mock)[:2] == [["AAPL"], ["-2.000"]]
+        with patch("rich.print") as mock:
+            fidelity.print_position_report(records)
+        assert table_cells(mock)[:2] == [["AAPL"], ["-2.000"]]
+
+
+class TestChunkedReports:
+    """Tests for `--chunk-size` report output."""
+
+    @staticmethod
+    def chunked_rows(output: str) -> list[list[str]]:
+        """Return the cells of each row of printed table `output`; `[]` for separators."""
+        lines = output.splitlines()[4:-1]
+        return [[cell.strip() for cell in line.split("│")[1:-1]] for line in lines]
+
+    def test_matches_table_output(self, capsys: pytest.CaptureFixture[str]) -> None:
+        records = [
+            make_record("MSFT", run_date="01/16/2024", amount=-123456.789),
+            make_record("AAPL", run_date="01/15/2024"),
+            make_record("AAPL", action="SELL", quantity=-10, amount=1100.0),
+            make_record("SPAXX"),
+        ]
+        for report, sections in [("print_history_report", 0), ("print_symbol_report", 1)]:
+            fidelity = Fidelity(make_options())
+            fidelity.records = records
+            with patch("rich.print") as mock:
+                getattr(fidelity, report)()
+            expected = [list(row) for row in zip(*table_cells(mock), strict=True)]
+
+            fidelity.options.chunk_size = 2
+            capsys.readouterr()
+            getattr(fidelity, report)()
+            rows = self.chunked_rows(capsys.readouterr().out)
+            assert [row for row in rows if row] == expected
+            assert len(rows) == len(expected) + sections
+
+    def test_empty_records(self, capsys: pytest.CaptureFixture[str]) -> None:
+        fidelity = Fidelity(make_options(chunk_size=100))
+        fidelity.print_history_report()
+        assert self.chunked_rows(capsys.readouterr().out) == []
+
+
+class TestWriterReports:
+    """Tests for `--format csv|jsonl` report output."""
+
+    @staticmethod
+    def formatted(key: str, value: Any) -> str:
+        """Return a written value as its table cell."""
+        if isinstance(value, float):
+            return f"{value:,.3f}"
+        return str(value).lower() if key == "action" else str(value)
+
+    def test_jsonl_matches_tables(self) -> None:
+        fidelity = Fidelity(make_options())
+        fidelity.records = [
+            make_record("MSFT", run_date="01/16/2024", amount=-123456.789),
+            make_record("AAPL", run_date="01/15/2024"),
+            make_record("AAPL", action="SELL", quantity=-10, amount=1100.0),
+            make_record("SPAXX"),
+        ]
+        file = StringIO()
+        with JsonlWriter(file) as fidelity.writer:
+            fidelity.print_history_report()
+            fidelity.print_symbol_report()
+            fidelity.print_position_report()
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+
+        fidelity.writer = None
+        for name, report in [
+            ("history", fidelity.print_history_report),
+            ("symbol", fidelity.print_symbol_report),
+            ("position", fidelity.print_position_report),
+        ]:
+            with patch("rich.print") as mock:
+                report()
+            columns = table_cells(mock)
+            rows = [
+                [self.formatted(key, value) for key, value in line.items() if key != "report"]
+                for line in lines
+                if line["report"] == name
+            ]
+            assert [list(row) for row in zip(*columns, strict=True)] == rows
+
+
+class TestSummaryReports:
+    """Tests for `--last` and `--top` report output."""
+
+    RECORDS = [
+        make_record("MSFT", run_date="01/16/2024", amount=-300.0),
+        make_record("AAPL", run_date="01/15/2024", amount=-100.0),
+        make_record("VTI", run_date="01/16/2024", amount=-50.0),
+        make_record("AAPL", action="SELL", quantity=-10, amount=1100.0, run_date="01/17/2024"),
+        make_record("SPAXX", run_date="01/18/2024", amount=7.0),
+        make_record("MSFT", run_date="01/16/2024", amount=-25.0),
+        make_record("VTI", run_date="01/14/2024", amount=-2000.0),
+    ]
+
+    @staticmethod
+    def written(fidelity: Fidelity, report: str, **kwargs: Any) -> list[dict[str, Any]]:
+        """Return the rows of a report, as written by a `JsonlWriter`."""
+        file = StringIO()
+        with JsonlWriter(file) as fidelity.writer:
+            getattr(fidelity, f"print_{report}_report")(**kwargs)
+        fidelity.writer = None
+        return [json.loads(line) for line in file.getvalue().splitlines()]
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            make_options(),
+            make_options(no_exclude=True),
+            make_options(symbol=["MSFT", "VTI", "NONE"]),
+            make_options(since=parse_date("01/15/2024"), until=parse_date("01/16/2024")),
+        ],
+    )
+    def test_last_is_history_tail(self, options: Namespace) -> None:
+        indexed = Fidelity(options)
+        indexed.records = self.RECORDS
+        full = self.written(indexed, "history")
+        for count in [0, 1, 3, 8, 100]:
+            tail = full[-count:] if count else []
+            fidelity = Fidelity(options)
+            fidelity.records = self.RECORDS
+            assert self.written(fidelity, "history", last=count) == tail
+            assert fidelity._index is None  # no full sort
+            assert self.written(indexed, "history", last=count) == tail
+
+    def test_last_table(self) -> None:
+        fidelity = Fidelity(make_options())
+        fidelity.records = self.RECORDS
+        with patch("rich.print") as mock:
+            fidelity.print_history_report(last=2)
+        assert table_cells(mock)[2] == ["VTI", "AAPL"]
+
+    def test_top_positions(self) -> None:
+        fidelity = Fidelity(make_options(symbol=["AAPL", "MSFT", "VTI"]))
+        fidelity.records = self.RECORDS
+        full = {row["symbol"]: row for row in self.written(fidelity, "position")}
+        fidelity = Fidelity(fidelity.options)
+        fidelity.records = self.RECORDS
+        top = self.written(fidelity, "position", top=2)
+        assert [row["symbol"] for row in top] == ["VTI", "AAPL"]
+        assert top == [full["VTI"], full["AAPL"]]
+        assert fidelity._index is None
+
+
+class TestExactReports:
+    """Tests for `--exact` report output."""
+
+    # Ten 0.1s sum to 0.9999999999999999 in floats.
+    RECORDS = [
+        make_record(symbol, amount=0.1, quantity=0.1, run_date=f"01/{day:02d}/2024")
+        for day in range(1, 11)
+        for symbol in ["AAPL", "MSFT"]
+    ]
+
+    @staticmethod
+    def written(fidelity: Fidelity, report: str, **kwargs: Any) -> list[dict[str, Any]]:
+        return TestSummaryReports.written(fidelity, report, **kwargs)
+
+    def test_balances_are_exact(self) -> None:
+        drifting = Fidelity(make_options())
+        drifting.records = self.RECORDS
+        assert self.written(drifting, "history")[9]["balance"] != 1.0
+
+        fidelity = Fidelity(make_options(exact=True))
+        fidelity.records = self.RECORDS
+        history = self.written(fidelity, "history")
+        assert [row["balance"] for row in history] == [(i + 1) / 10 for i in range(20)]
+        symbol = self.written(fidelity, "symbol")
+        assert [row["balance"] for row in symbol] == [(i % 10 + 1) / 10 for i in range(20)]
+        assert self.written(fidelity, "history", last=2) == history[-2:]
+        # `--last` backs the balances out in fixed point, with or without `--exact`.
+        assert self.written(drifting, "history", last=2) == history[-2:]
+        drifting = Fidelity(make_options())
+        drifting.records = self.RECORDS
+        assert self.written(drifting, "history", last=2) == history[-2:]
+
+        expected = [
+            {
+                "report": "position",
+                "symbol": "AAPL",
+                "quantity": 1.0,
+                "amount": 1.0,
+                "balance": 1.0,
+            },
+            {
+                "report": "position",
+                "symbol": "MSFT",
+                "quantity": 1.0,
+                "amount": 1.0,
+                "balance": 2.0,
+            },
+        ]
+        assert self.written(fidelity, "position") == expected
+        assert self.written(fidelity, "position", top=2) == expected
+
+        fidelity = Fidelity(make_options(exact=True))
+        fidelity.records = self.RECORDS
+        assert self.written(fidelity, "history", last=1) == history[-1:]
+        assert self.written(fidelity, "position", top=2) == expected
+        assert self.written(fidelity, "position", records=iter(self.RECORDS)) == expected
+
+    def test_ingested_totals_are_summed_again(self, tmp_path: Path) -> None:
+        state = StateStore()
+        state.records.extend(self.RECORDS)
+        state.positions["AAPL"] = [0.0, 99.0]
+        fidelity = Fidelity(make_options(exact=True))
+        fidelity.ingest_input_files([], state)
+        assert self.written(fidelity, "position")[0]["amount"] == 1.0
+
+
+class TestAccountReports:
+    """Tests for reports per account partition."""
+
+    @staticmethod
+    def write_accounts(write_history: HistoryWriter) -> list[str]:
+        """Write overlapping downloads of two accounts; return their paths."""
+        rows = {
+            "a-X00000001": ["AAPL,10,-10.00", "MSFT,5,-5.00"],
+            "b-X00000001": ["MSFT,5,-5.00"],
+            "c-X00000002": ["AAPL,10,-10.00", "VTI,1,-1.00"],
+        }
+        return [
+            str(
+                write_history(
+                    (
+                        f"01/15/2024, BUY, {symbol}, X,Cash,{quantity},1.00,0,0,0,{amount},1.00,"
+                        for symbol, quantity, amount in (line.split(",") for line in lines)
+                    ),
+                    f"{name}.csv",
+                    account="X",
+                )
+            )
+            for name, lines in rows.items()
+        ]
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_partitions_deduplicate_independently(
+        self, tmp_path: Path, write_history: HistoryWriter, jobs: int
+    ) -> None:
+        files = self.write_accounts(write_history)
+        fidelity = Fidelity(make_options())
+        fidelity.read_partitions(
+            partition_files(files), jobs=jobs, cache=FileCache(tmp_path / "cache"), dedup=True
+        )
+        assert {account: len(store) for account, store in fidelity.partitions.items()} == {
+            "X00000001": 2,
+            "X00000002": 2,
+        }
+        # Both accounts bought the same AAPL; the merged view keeps both.
+        assert [rec.symbol for rec in fidelity.records] == ["AAPL", "MSFT", "AAPL", "VTI"]
+
+    def test_date_stamped_files_share_one_partition(self, write_history: HistoryWriter) -> None:
+        rows = ["01/15/2024, BUY, AAPL, X,Cash,10,1.00,0,0,0,-10.00,1.00,"]
+        files = [
+            str(write_history(rows, name))
+            for name in ["history_20240131.csv", "history_20240229.csv"]
+        ]
+        fidelity = Fidelity(make_options())
+        fidelity.read_partitions(partition_files(files), dedup=True)
+        assert list(fidelity.partitions) == [DEFAULT_ACCOUNT]
+        assert fidelity.records is fidelity.partitions[DEFAULT_ACCOUNT]
+        assert len(fidelity.records) == 1
+
+    def test_reports_per_account(self, write_history: HistoryWriter) -> None:
+        fidelity = Fidelity(make_options())
+        fidelity.read_partitions(partition_files(self.write_accounts(write_history)), dedup=True)
+        file = StringIO()
+        with JsonlWriter(file) as fidelity.writer:
+            fidelity.for_account("X00000002").print_position_report()
+            fidelity.print_position_report()
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        assert [(line["report"], line["symbol"], line["balance"]) for line in lines] == [
+            ("position:X00000002", "AAPL", -10.0),
+            ("position:X00000002", "VTI", -11.0),
+            ("position", "AAPL", -20.0),
+            ("position", "MSFT", -25.0),
+            ("position", "VTI", -26.0),
+        ]
+
+        fidelity.writer = None
+        with patch("rich.print") as mock:
+            fidelity.for_account("X00000001").print_history_report()
+        assert mock.call_args.args[0].title == "History Report: X00000001"
+
+
+class TestGainsReport:
+    """Tests for the realized and unrealized gains report."""
+
+    RECORDS = [
+        make_record("AAPL", quantity=10, amount=-100.0, run_date="01/02/2024"),
+        make_record("AAPL", quantity=10, amount=-200.0, run_date="02/01/2024"),
+        make_record("AAPL", action="SELL", quantity=-15, amount=450.0, run_date="03/01/2024"),
+        make_record("MSFT", quantity=4, amount=-40.0, run_date="01/02/2024"),
+        make_record("MSFT", action="DIVIDEND", quantity=0, amount=1.0, run_date="02/01/2024"),
+        make_record("SPAXX", quantity=5, amount=-5.0, run_date="01/02/2024"),
+    ]
+
+    @staticmethod
+    def written(fidelity: Fidelity, **kwargs: Any) -> list[tuple[Any, ...]]:
+        rows = TestSummaryReports.written(fidelity, "gains", **kwargs)
+        return [tuple(row.values())[1:] for row in rows]
+
+    def test_fifo(self) -> None:
+        fidelity = Fidelity(make_options())
+        fidelity.records = self.RECORDS
+        assert self.written(fidelity) == [
+            ("AAPL", "01/02/2024", "03/01/2024", 59, 10.0, 100.0, 300.0, 200.0),
+            ("AAPL", "02/01/2024", "03/01/2024", 29, 5.0, 100.0, 150.0, 50.0),
+            ("AAPL", "02/01/2024", "", 29, 5.0, 100.0, 500.0, 400.0),
+            ("MSFT", "01/02/2024", "", 59, 4.0, 40.0, 400.0, 360.0),
+        ]
+
+    def test_since_limits_sales_only(self) -> None:
+        fidelity = Fidelity(make_options(since=parse_date("03/01/2024"), exact=True))
+        fidelity.records = self.RECORDS
+        assert [row[:3] for row in self.written(fidelity, method="lifo")] == [
+            ("AAPL", "02/01/2024", "03/01/2024"),
+            ("AAPL", "01/02/2024", "03/01/2024"),
+            ("AAPL", "01/02/2024", ""),
+            ("MSFT", "01/02/2024", ""),
+        ]
+
+        fidelity = Fidelity(make_options(since=parse_date("03/02/2024")))
+        fidelity.records = self.RECORDS
+        assert [row[2] for row in self.written(fidelity)] == ["", ""]
+
+    def test_table(self) -> None:
+        fidelity = Fidelity(make_options())
+        fidelity.records = [
+            *self.RECORDS,
+            make_record("VTI", action="SELL", quantity=-1, amount=9.0),
+        ]
+        with patch("rich.print") as mock:
+            fidelity.print_reports(gains="fifo")
+        assert mock.call_count == 1
+        table = mock.call_args.args[0]
+        assert table.title == "Gains Report"
+        assert table_cells(mock)[1] == [
+            "01/02/2024",
+            "02/01/2024",
+            "02/01/2024",
+            "01/02/2024",
+            "",
+        ]
+        assert table_cells(mock)[3][-1] == ""
+
+
+class TestRollupReport:
+    """Tests for the rollup report by period."""
+
+    RECORDS = [
+        make_record("AAPL", amount=-100.0, run_date="01/02/2024"),
+        make_record("AAPL", amount=-200.0, run_date="02/01/2024"),
+        make_record("MSFT", amount=-40.0, run_date="04/02/2024"),
+        make_record("SPAXX", amount=5.0, run_date="01/02/2024"),
+    ]
+
+    @staticmethod
+    def written(fidelity: Fidelity, by: str) -> list[tuple[Any, ...]]:
+        rows = TestSummaryReports.written(fidelity, "rollup", by=by)
+        return [tuple(row.values())[1:5] for row in rows]
+
+    def test_rollup_is_kept(self) -> None:
+        fidelity = Fidelity(make_options())
+        fidelity.records = self.RECORDS
+        assert self.written(fidelity, "quarter") == [
+            ("2024-Q1", "AAPL", "BUY", 2),
+            ("2024-Q2", "MSFT", "BUY", 1),
+        ]
+        rollup = fidelity.rollup
+        assert self.written(fidelity, "year") == [
+            ("2024", "AAPL", "BUY", 2),
+            ("2024", "MSFT", "BUY", 1),
+        ]
+        assert fidelity.rollup is rollup
+
+        fidelity.records.append(make_record("VTI", run_date="05/01/2024"))
+        assert fidelity.rollup is not rollup
+        assert fidelity.rollup.size == len(self.RECORDS) + 1
+
+    def test_dates_sum_selected_rows(self) -> None:
+        fidelity = Fidelity(make_options(since=parse_date("02/01/2024"), no_exclude=True))
+        fidelity.records = self.RECORDS
+        assert self.written(fidelity, "year") == [
+            ("2024", "AAPL", "BUY", 1),
+            ("2024", "MSFT", "BUY", 1),
+        ]
+        assert fidelity._rollup is None
+
+    def test_table(self) -> None:
+        fidelity = Fidelity(make_options(symbol=["AAPL", "MSFT"]))
+        fidelity.records = self.RECORDS
+        with patch("rich.print") as mock:
+            fidelity.print_reports(by="month")
+        assert mock.call_count == 1
+        assert mock.call_args.args[0].title == "Rollup Report by Month"
+        assert table_cells(mock)[:3] == [
+            ["2024-01", "2024-02", "2024-04"],
+            ["AAPL", "AAPL", "MSFT"],
+            ["buy", "buy", "buy"],
+        ]
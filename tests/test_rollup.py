@@ -0,0 +1,98 @@
+"""Tests for period rollups."""
+
+from __future__ import annotations
+
+import pytest
+
+from fidelity.reader import HistoryRecord
+from fidelity.rollup import Rollup, period_of
+from fidelity.store import RecordStore
+
+
+def make_store(*rows: tuple[str, str, str, str, str]) -> RecordStore:
+    """Return a store of `(run_date, action, symbol, amount, fees)` rows."""
+
+    return RecordStore.from_records(
+        HistoryRecord(
+            run_date,
+            action,
+            symbol,
+            "",
+            "Cash",
+            "1",  # type: ignore[arg-type]
+            "1.00",  # type: ignore[arg-type]
+            "0.01",  # type: ignore[arg-type]
+            fees,  # type: ignore[arg-type]
+            "",  # type: ignore[arg-type]
+            amount,  # type: ignore[arg-type]
+            "",  # type: ignore[arg-type]
+            "",
+        )
+        for run_date, action, symbol, amount, fees in rows
+    )
+
+
+STORE = make_store(
+    ("01/15/2024", "BUY", "AAPL", "-100.10", "0.10"),
+    ("01/20/2024", "BUY", "AAPL", "-200.20", ""),
+    ("02/01/2024", "SELL", "AAPL", "50.05", "0.05"),
+    ("04/01/2024", "BUY", "MSFT", "-0.1", ""),
+    ("04/02/2024", "BUY", "MSFT", "-0.2", ""),
+    ("12/31/2023", "DIVIDEND", "SPAXX", "1.00", ""),
+)
+
+
+@pytest.mark.parametrize(
+    ("by", "period"),
+    [("month", "2024-11"), ("quarter", "2024-Q4"), ("year", "2024")],
+)
+def test_period_of(by: str, period: str) -> None:
+    assert period_of("2024-11", by) == period
+
+
+def test_unknown_period() -> None:
+    with pytest.raises(ValueError, match="unknown period"):
+        period_of("2024-11", "week")
+
+
+def test_months() -> None:
+    rollup = Rollup.from_store(STORE)
+    assert rollup.size == len(STORE)
+    assert rollup.select("month") == [
+        ("2023-12", "SPAXX", "DIVIDEND", 1, 1.0, 0.0, 0.01),
+        ("2024-01", "AAPL", "BUY", 2, -300.3, 0.1, 0.02),
+        ("2024-02", "AAPL", "SELL", 1, 50.05, 0.05, 0.01),
+        ("2024-04", "MSFT", "BUY", 2, -0.3, 0.0, 0.02),
+    ]
+
+
+def test_quarters_and_years_merge_months() -> None:
+    rollup = Rollup.from_store(STORE)
+    assert rollup.select("quarter", exclude=["SPAXX"]) == [
+        ("2024-Q1", "AAPL", "BUY", 2, -300.3, 0.1, 0.02),
+        ("2024-Q1", "AAPL", "SELL", 1, 50.05, 0.05, 0.01),
+        ("2024-Q2", "MSFT", "BUY", 2, -0.3, 0.0, 0.02),
+    ]
+    assert rollup.select("year", symbols=["AAPL", "SPAXX"]) == [
+        ("2023", "SPAXX", "DIVIDEND", 1, 1.0, 0.0, 0.01),
+        ("2024", "AAPL", "BUY", 2, -300.3, 0.1, 0.02),
+        ("2024", "AAPL", "SELL", 1, 50.05, 0.05, 0.01),
+    ]
+
+
+def test_selected_rows() -> None:
+    rollup = Rollup.from_store(STORE, [0, 3])
+    assert rollup.size == 2
+    assert [row[:4] for row in rollup.select("year")] == [
+        ("2024", "AAPL", "BUY", 1),
+        ("2024", "MSFT", "BUY", 1),
+    ]
+
+
+def test_bytes_round_trip() -> None:
+    rollup = Rollup.from_store(STORE)
+    copy = Rollup.from_bytes(rollup.to_bytes())
+    assert copy.size == rollup.size
+    assert copy.totals == rollup.totals
+    with pytest.raises(ValueError, match="truncated"):
+        Rollup.from_bytes(rollup.to_bytes()[:-8])
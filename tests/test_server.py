@@ -0,0 +1,186 @@
+"""Tests for the server and client modules."""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from argparse import Namespace
+from collections.abc import Iterator
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+import rich
+
+from fidelity.cli import main
+from fidelity.client import QUERY_OPTIONS, query
+from fidelity.fidelity import Fidelity
+from fidelity.server import ReportServer
+from tests.conftest import HistoryWriter
+
+OPTIONS = dict.fromkeys(QUERY_OPTIONS) | {"no_exclude": False, "chunk_size": 0}
+
+
+def buys(symbols: list[str]) -> list[str]:
+    return [
+        f"01/{day:02d}/2024, BUY, {symbol}, X,Cash,1,1.00,0,0,0,-{day}.00,1.00,"
+        for day, symbol in enumerate(symbols, 1)
+    ]
+
+
+def load(files: list[str]) -> Fidelity:
+    fidelity = Fidelity(Namespace(**OPTIONS))
+    fidelity.read_input_files(files)
+    return fidelity
+
+
+@pytest.fixture
+def history(write_history: HistoryWriter) -> Path:
+    return write_history(buys(["AAPL", "MSFT", "AAPL"]))
+
+
+@pytest.fixture
+def server(tmp_path: Path, history: Path) -> Iterator[ReportServer]:
+    server = ReportServer(tmp_path / "s.sock", lambda: [str(history)], load, interval=0.01)
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    assert server.ready.wait(10)
+    yield server
+    server.stop()
+    thread.join(10)
+    assert not server.path.exists()
+
+
+def ask(server: ReportServer, **options: object) -> tuple[dict[str, object], str]:
+    output = BytesIO()
+    header = query(server.path, {"options": OPTIONS | options}, output)
+    return header, output.getvalue().decode()
+
+
+def test_answers_as_the_cli(server: ReportServer, history: Path) -> None:
+    header, body = ask(server, format="jsonl", symbol=["AAPL"])
+    assert header == {"records": 3}
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert [(row["report"], row["symbol"]) for row in rows] == [
+        ("history", "AAPL"),
+        ("history", "AAPL"),
+        ("symbol", "AAPL"),
+        ("symbol", "AAPL"),
+        ("position", "AAPL"),
+    ]
+
+    _, body = ask(server, format="table", top=1)
+    assert "Position Report" in body
+    assert "History Report" not in body
+    assert "\x1b[" not in body
+
+    _, body = ask(server, format="table", chunk_size=2, color=True)
+    assert "History Report" in body
+    assert rich.get_console().file is sys.stdout  # not redirected to the response
+
+
+def test_reads_changed_files(server: ReportServer, write_history: HistoryWriter) -> None:
+    write_history(buys(["AAPL", "MSFT", "AAPL", "VTI"]))
+    deadline = time.monotonic() + 10
+    while ask(server, format="csv")[0] != {"records": 4}:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert not server.refresh()
+
+
+def test_reports_errors(
+    server: ReportServer, history: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    header, body = ask(server, format="xml")
+    assert header == {"error": "'xml'"}
+    assert body == ""
+
+    history.unlink()
+    server.load = lambda files: (_ for _ in ()).throw(OSError("unreadable"))
+    history.write_text("", encoding="utf-8")
+    deadline = time.monotonic() + 10
+    while "Reading input files failed" not in caplog.text:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert ask(server, format="csv")[0] == {"records": 3}  # still the old records
+
+
+def test_not_read_yet(tmp_path: Path) -> None:
+    server = ReportServer(tmp_path / "s.sock", list, load)
+    server.stop()  # not running: no-op
+    with pytest.raises(RuntimeError, match="not read yet"):
+        server.answer({"options": OPTIONS})
+
+
+def test_cli_client(
+    tmp_path: Path, server: ReportServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config = tmp_path / "fidelity.toml"
+    config.write_text(f'socket-file = "{server.path}"\n', encoding="utf-8")
+    output = tmp_path / "reports.jsonl"
+    main(["--config", str(config), "--client", "--format", "jsonl", "--output", str(output)])
+    assert len(output.read_text(encoding="utf-8").splitlines()) == 3 + 3 + 2
+
+    def fail(request: dict[str, object]) -> tuple[dict[str, object], str]:
+        raise ValueError("bad query")
+
+    monkeypatch.setattr(server, "answer", fail)
+    with pytest.raises(SystemExit) as err:
+        main(["--config", str(config), "--client"])
+    assert err.value.code == 1
+
+    server.stop()
+    deadline = time.monotonic() + 10
+    while server.path.exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    with pytest.raises(SystemExit) as err:
+        main(["--config", str(config), "--client"])
+    assert err.value.code == 1
+
+
+def test_cli_client_empty_response(tmp_path: Path) -> None:
+    path = tmp_path / "s.sock"
+    config = tmp_path / "fidelity.toml"
+    config.write_text(f'socket-file = "{path}"\n', encoding="utf-8")
+
+    def hang_up() -> None:
+        connection = listener.accept()[0]
+        connection.recv(65536)
+        connection.close()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(path))
+        listener.listen()
+        thread = threading.Thread(target=hang_up)
+        thread.start()
+        with pytest.raises(SystemExit) as err:
+            main(["--config", str(config), "--client"])
+        thread.join(10)
+    assert err.value.code == 1
+
+
+def test_stops_on_sigterm(tmp_path: Path, history: Path) -> None:
+    server = ReportServer(tmp_path / "s.sock", lambda: [str(history)], load)
+
+    async def serve_until_terminated() -> None:
+        task = asyncio.create_task(server.serve_forever())
+        while not server.ready.is_set():
+            await asyncio.sleep(0.01)
+        assert server.path.exists()
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(task, 10)
+
+    asyncio.run(serve_until_terminated())
+    assert not server.path.exists()
+
+
+def test_cli_serve(tmp_path: Path, history: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    served = []
+    monkeypatch.setattr(ReportServer, "run", lambda self: served.append(self.refresh()))
+    main(["--no-cache", "--serve", str(history)])
+    assert served == [True]
@@ -0,0 +1,59 @@
+"""Startup benchmark: the CLI must not load report modules to parse its command line."""
+
+import subprocess
+import sys
+import time
+
+# Modules that only rendering or reading reports may need.
+HEAVY = ("rich", "numpy", "concurrent.futures.process")
+
+# The only `fidelity` modules needed to parse the command line.
+STARTUP = {"fidelity", "fidelity.__main__", "fidelity.cli", "fidelity.dates"}
+
+# Allowance for `fidelity --help` over importing `libcli` alone, in seconds.
+MAX_OVERHEAD = 0.25
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess[str]:
+    """Run a python subprocess; return its result."""
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True, timeout=60
+    )
+
+
+def imported_modules(*args: str) -> dict[str, int]:
+    """Return the modules imported by `python -X importtime args`, with cumulative us."""
+    modules = {}
+    for line in run_python("-X", "importtime", *args).stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            modules[fields[2].strip()] = int(fields[1])
+    return modules
+
+
+def wall_time(*args: str) -> float:
+    """Return the best of three wall-clock times of `python args`."""
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        run_python(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_help_skips_report_modules() -> None:
+    modules = imported_modules("-m", "fidelity", "--help")
+    assert "fidelity.cli" in modules
+    assert {name for name in modules if name.startswith("fidelity")} <= STARTUP
+    assert not [name for name in modules if name.startswith(HEAVY)]
+
+
+def test_reports_load_report_modules() -> None:
+    modules = imported_modules("-m", "fidelity", "/dev/null")
+    assert "fidelity.fidelity" in modules
+    assert "rich.table" in modules
+
+
+def test_help_wall_time() -> None:
+    baseline = wall_time("-c", "import libcli")
+    assert wall_time("-m", "fidelity", "--help") < baseline + MAX_OVERHEAD
@@ -0,0 +1,57 @@
+"""Tests for the state module."""
+
+from pathlib import Path
+
+import pytest
+
+from fidelity.reader import iter_history_values, read_history_file
+from fidelity.state import StateStore
+from tests.conftest import HistoryWriter
+
+ROWS = [
+    "01/15/2024, BUY, AAPL, APPLE INC,Cash,10,150.00,0,0,0,-1500.00,8500.00,01/17/2024",
+    "01/16/2024, BUY, MSFT, MICROSOFT,Cash,5,400.00,0,0,0,-2000.00,6500.00,01/18/2024",
+    "01/16/2024, BUY, MSFT, MICROSOFT,Cash,5,400.00,0,0,0,-2000.00,6500.00,01/18/2024",
+    "02/01/2024, SELL, AAPL, APPLE INC,Cash,-4,160.00,0,0,0,640.00,7140.00,02/05/2024",
+    "02/15/2024, DIVIDEND, MSFT, MICROSOFT,Cash,,,,,,12.00,7152.00,",
+]
+
+
+class TestStateStore:
+    def test_ingest_overlapping_downloads(self, write_history: HistoryWriter) -> None:
+        january = str(write_history(ROWS[:3], "jan.csv"))
+        february = str(write_history(ROWS[1:], "feb.csv"))
+
+        state = StateStore()
+        assert state.ingest(iter_history_values(january)) == (3, 0)
+        # Both identical MSFT trades were already ingested; the rest is new.
+        assert state.ingest(iter_history_values(february)) == (2, 2)
+        assert state.ingest(iter_history_values(february)) == (0, 4)
+
+        full = read_history_file(str(write_history(ROWS, "all.csv")))
+        assert len(state.records) == len(full)
+        assert state.positions == {"AAPL": [6.0, -860.0], "MSFT": [10.0, -3988.0]}
+
+    def test_save_and_load(self, tmp_path: Path, write_history: HistoryWriter) -> None:
+        path = tmp_path / "state" / "state.bin"
+        state = StateStore()
+        state.ingest(iter_history_values(str(write_history(ROWS[:3], "jan.csv"))))
+        state.save(path)
+
+        loaded = StateStore.load(path)
+        assert [r.symbol for r in loaded.records] == ["AAPL", "MSFT", "MSFT"]
+        assert loaded.positions == state.positions
+        assert loaded.dedup.seen == state.dedup.seen
+        february = str(write_history(ROWS[1:], "feb.csv"))
+        assert loaded.ingest(iter_history_values(february)) == (2, 2)
+
+    def test_load_missing_is_empty(self, tmp_path: Path) -> None:
+        state = StateStore.load(tmp_path / "missing.bin")
+        assert len(state.records) == 0
+        assert state.positions == {}
+
+    def test_load_rejects_other_files(self, tmp_path: Path) -> None:
+        path = tmp_path / "bogus.bin"
+        path.write_bytes(b"bogus")
+        with pytest.raises(ValueError, match="not a fidelity state file"):
+            StateStore.load(path)
@@ -0,0 +1,112 @@
+"""Tests for the columnar record store."""
+
+import pickle
+from dataclasses import fields
+from typing import Any
+
+import pytest
+
+from fidelity.reader import HistoryRecord
+from fidelity.store import RecordStore, RecordView
+
+
+def make_record(**kwargs: Any) -> HistoryRecord:
+    """Create a HistoryRecord from string values (as CSV reader does)."""
+    defaults: dict[str, str] = {
+        "run_date": "01/15/2024",
+        "action": "BUY",
+        "symbol": "AAPL",
+        "description": "Apple Inc",
+        "type": "Cash",
+        "quantity": "10",
+        "price": "150.00",
+        "commission": "1.5",
+        "fees": "0.02",
+        "accrued_interest": "0.5",
+        "amount": "-1500.00",
+        "cash_balance": "5000.00",
+        "settlement_date": "01/17/2024",
+    }
+    defaults.update(kwargs)
+    return HistoryRecord(**defaults)  # type: ignore[arg-type]
+
+
+class TestRecordStore:
+    """Tests for RecordStore."""
+
+    def test_round_trips_every_field(self) -> None:
+        rec = make_record()
+        store = RecordStore.from_records([rec])
+        view = store[0]
+        for f in fields(HistoryRecord):
+            assert getattr(view, f.name) == getattr(rec, f.name), f.name
+
+    def test_len_iter_and_negative_index(self) -> None:
+        store = RecordStore.from_records(
+            [make_record(symbol="AAPL"), make_record(symbol="MSFT")]
+        )
+        assert len(store) == 2
+        assert [r.symbol for r in store] == ["AAPL", "MSFT"]
+        assert store[-1].symbol == "MSFT"
+        assert store[-1].index == 1
+
+    def test_index_out_of_range(self) -> None:
+        store = RecordStore.from_records([make_record()])
+        with pytest.raises(IndexError):
+            _ = store[1]
+        with pytest.raises(IndexError):
+            _ = store[-2]
+
+    def test_strings_are_dictionary_encoded(self) -> None:
+        store = RecordStore.from_records([make_record() for _ in range(100)])
+        column = store.strings["symbol"]
+        assert len(column) == 100
+        assert column.values == ["AAPL"]
+
+    def test_extend_with_store_remaps_codes(self) -> None:
+        first = RecordStore.from_records([make_record(symbol="AAPL")])
+        second = RecordStore.from_records(
+            [make_record(symbol="MSFT"), make_record(symbol="AAPL")]
+        )
+        first.extend(second)
+        assert [r.symbol for r in first] == ["AAPL", "MSFT", "AAPL"]
+        assert first.strings["symbol"].values == ["AAPL", "MSFT"]
+
+    def test_extend_with_records(self) -> None:
+        store = RecordStore()
+        store.extend(make_record(symbol=s) for s in ["AAPL", "MSFT"])
+        assert [r.symbol for r in store] == ["AAPL", "MSFT"]
+
+    def test_view_copies_into_another_store(self) -> None:
+        source = RecordStore.from_records([make_record()])
+        copy = RecordStore.from_records(source)
+        assert copy[0].amount == source[0].amount
+        assert copy[0].t_settlement_date == source[0].t_settlement_date
+
+    def test_view_repr(self) -> None:
+        view = RecordStore.from_records([make_record()])[0]
+        assert isinstance(view, RecordView)
+        assert "AAPL" in repr(view)
+
+    def test_pickle_round_trip(self) -> None:
+        store = RecordStore.from_records([make_record(symbol="AAPL")])
+        copy = pickle.loads(pickle.dumps(store))
+        copy.append(make_record(symbol="MSFT"))
+        assert [r.symbol for r in copy] == ["AAPL", "MSFT"]
+        assert len(store) == 1
+
+    def test_iter_values(self) -> None:
+        rec = make_record()
+        store = RecordStore.from_records([rec, rec])
+        values = list(store.iter_values())
+        assert len(values) == 2
+        assert values[0] == tuple(getattr(rec, f.name) for f in fields(HistoryRecord))
+
+    def test_fixed_follows_appends(self) -> None:
+        store = RecordStore.from_records([make_record(amount="-1500.01")])
+        fixed = store.fixed("amount")
+        assert list(fixed) == [-1_500_010_000]
+        store.append(make_record(amount="0.000001"))
+        assert store.fixed("amount") is fixed
+        assert list(fixed) == [-1_500_010_000, 1]
+        assert list(store.fixed("quantity")) == [10_000_000, 10_000_000]
@@ -0,0 +1,66 @@
+"""Tests for phase timing."""
+
+import tracemalloc
+from io import StringIO
+
+from rich.console import Console
+
+from fidelity.timing import PhaseTimer
+
+
+def test_nested_phases() -> None:
+    timer = PhaseTimer()
+    with timer.phase("outer") as outer:
+        outer.rows = 10
+        with timer.phase("inner") as inner:
+            block = bytearray(4 * 2**20)
+            inner.rows = 5
+        del block
+    timer.stop()
+
+    assert [(p.name, p.depth, p.rows) for p in timer.phases] == [
+        ("outer", 0, 10),
+        ("inner", 1, 5),
+    ]
+    assert outer.seconds >= inner.seconds > 0
+    assert outer.rate > 0
+    assert inner.peak >= 4 * 2**20
+    assert outer.peak >= inner.peak
+    assert not tracemalloc.is_tracing()
+
+
+def test_stop_leaves_tracing_started_elsewhere() -> None:
+    tracemalloc.start()
+    try:
+        timer = PhaseTimer()
+        with timer.phase("read"):
+            pass
+        timer.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_disabled_timer_measures_nothing() -> None:
+    timer = PhaseTimer(enabled=False)
+    with timer.phase("outer") as phase:
+        phase.rows = 10
+    assert timer.phases == []
+    assert phase.seconds == 0
+    assert phase.rate == 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_print() -> None:
+    timer = PhaseTimer(memory=False)
+    with timer.phase("read") as phase:
+        phase.rows = 1000
+    with timer.phase("render"):
+        pass
+
+    file = StringIO()
+    timer.print(Console(file=file, width=100))
+    output = file.getvalue()
+    assert "read" in output
+    assert "1,000" in output
+    assert "render" in output
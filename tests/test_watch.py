@@ -0,0 +1,63 @@
+"""Tests for the watch module."""
+
+from pathlib import Path
+
+from fidelity.watch import Changes, FileWatcher, file_signatures
+
+
+class Clock:
+    """A clock that `sleep` advances."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_file_signatures(tmp_path: Path) -> None:
+    path = tmp_path / "history.csv"
+    path.write_text("one\n", encoding="utf-8")
+    signatures = file_signatures([str(path), str(tmp_path / "missing.csv")])
+    assert list(signatures) == [str(path)]
+    path.write_text("one\ntwo\n", encoding="utf-8")
+    assert file_signatures([str(path)]) != signatures
+
+
+def test_changes_settle_before_reported(tmp_path: Path) -> None:
+    old, new, gone = (tmp_path / name for name in ("old.csv", "new.csv", "gone.csv"))
+    old.write_text("1\n", encoding="utf-8")
+    gone.write_text("1\n", encoding="utf-8")
+    clock = Clock()
+    watcher = FileWatcher(
+        lambda: sorted(map(str, tmp_path.glob("*.csv"))),
+        interval=0.5,
+        debounce=1.0,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    assert watcher.poll() is None
+
+    new.write_text("1\n", encoding="utf-8")
+    assert watcher.poll() is None  # first seen
+    clock.sleep(0.5)
+    new.write_text("1\n2\n", encoding="utf-8")  # still downloading
+    assert watcher.poll() is None
+    clock.sleep(0.5)
+    assert watcher.poll() is None  # not settled for long enough
+    old.write_text("1\n2\n", encoding="utf-8")
+    gone.unlink()
+
+    assert watcher.wait() == Changes(added=[str(new)], changed=[str(old)], removed=[str(gone)])
+    assert clock.now == 2.0
+    assert watcher.poll() is None
+
+    partial = tmp_path / "partial.csv"
+    partial.write_text("1\n", encoding="utf-8")
+    assert watcher.poll() is None
+    partial.unlink()  # gone again before it settled: no change
+    assert watcher.poll() is None
+    assert watcher._pending is None
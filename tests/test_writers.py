@@ -0,0 +1,64 @@
+"""Tests for machine-readable report writers."""
+
+import csv
+import json
+from io import StringIO
+
+import pytest
+
+from fidelity.writers import CsvWriter, JsonlWriter, ReportWriter
+
+FIELDS = ("symbol", "amount")
+ROWS = [("AAPL", -1.5), ("MSFT", 2.0), ("ÄB,C", 0.0)]
+
+
+class CountingIO(StringIO):
+    """StringIO that counts calls to `write`."""
+
+    writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+def test_csv_blocks() -> None:
+    file = StringIO()
+    with CsvWriter(file) as writer:
+        writer.write_report("one", FIELDS, ROWS)
+        writer.write_report("two", FIELDS, ROWS[:1])
+
+    one, two = file.getvalue().split("\n\n")
+    assert list(csv.reader(StringIO(one))) == [
+        ["report", "symbol", "amount"],
+        ["one", "AAPL", "-1.5"],
+        ["one", "MSFT", "2.0"],
+        ["one", "ÄB,C", "0.0"],
+    ]
+    assert list(csv.reader(StringIO(two))) == [
+        ["report", "symbol", "amount"],
+        ["two", "AAPL", "-1.5"],
+    ]
+
+
+def test_jsonl_lines() -> None:
+    file = StringIO()
+    with JsonlWriter(file) as writer:
+        writer.write_report("one", FIELDS, ROWS)
+
+    lines = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert lines == [{"report": "one", "symbol": s, "amount": a} for s, a in ROWS]
+
+
+def test_rows_written_in_chunks() -> None:
+    file = CountingIO()
+    with JsonlWriter(file, chunk_rows=2) as writer:
+        writer.write_report("one", FIELDS, ROWS * 2)
+        assert file.writes == 3
+    assert file.writes == 3
+    assert len(file.getvalue().splitlines()) == 6
+
+
+def test_base_writer_is_abstract() -> None:
+    with pytest.raises(TypeError, match="abstract"):
+        ReportWriter(StringIO())  # type: ignore[abstract]